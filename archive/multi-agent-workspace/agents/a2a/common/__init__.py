@@ -0,0 +1,3 @@
+"""
+Shared building blocks for the A2A agent services.
+"""
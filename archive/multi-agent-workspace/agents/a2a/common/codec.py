@@ -0,0 +1,273 @@
+"""
+Wire encoding of A2A task messages.
+
+Task input and output travel as structured data parts
+(``{"type": "data", "data": {...}}``) instead of JSON serialized into a
+text part, so each hop encodes the payload once. Bodies are encoded with
+
+- ``application/json``: ``orjson`` when installed, else the stdlib encoder
+- ``application/msgpack``: ``msgpack`` (optional; smaller and faster for
+  large research payloads)
+
+Responses use the content type from the caller's ``Accept`` header and are
+gzip-compressed when the caller accepts it and the body is large enough.
+Request bodies may be sent gzip-compressed (``Content-Encoding: gzip``).
+Text parts holding JSON are still accepted from older callers.
+
+Tuning (environment variables):
+- A2A_GZIP_MIN_BYTES: Smallest body that is compressed (default 4096)
+- A2A_GZIP_LEVEL: gzip level, 1 (fastest) - 9 (default 5)
+- A2A_MAX_BODY_BYTES: Largest request body accepted, before and after
+  decompression (default 32 MiB); larger bodies get 413
+"""
+import gzip
+import json
+import os
+import zlib
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+
+from src.agents.company_research.metrics import PAYLOAD_BYTES
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_ALIASES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+
+M = TypeVar("M", bound=BaseModel)
+
+GZIP_MIN_BYTES = int(os.getenv("A2A_GZIP_MIN_BYTES", "4096"))
+GZIP_LEVEL = int(os.getenv("A2A_GZIP_LEVEL", "5"))
+MAX_BODY_BYTES = int(os.getenv("A2A_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+
+
+class UnsupportedEncoding(ValueError):
+    """Raised for content types or encodings this process cannot handle."""
+
+
+class BodyTooLarge(ValueError):
+    """Raised when a body exceeds ``MAX_BODY_BYTES`` (compressed or not)."""
+
+
+def _media_type(header: Optional[str]) -> str:
+    return (header or "").split(";", 1)[0].strip().lower()
+
+
+def format_label(content_type: Optional[str]) -> str:
+    """Metric label (json/msgpack) for a content type."""
+    return "msgpack" if _media_type(content_type) in _MSGPACK_ALIASES else "json"
+
+
+def dumps_json(payload: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def encode(payload: Any, content_type: str = JSON) -> bytes:
+    """
+    Serialize a payload (pydantic models are dumped first).
+
+    Raises:
+        UnsupportedEncoding: If the content type is unsupported or unavailable
+    """
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump(exclude_none=True)
+    media_type = _media_type(content_type)
+    if media_type in _MSGPACK_ALIASES:
+        if not MSGPACK_AVAILABLE:
+            raise UnsupportedEncoding("msgpack is not installed")
+        return msgpack.packb(payload, use_bin_type=True, default=str)
+    if media_type in ("", JSON):
+        return dumps_json(payload)
+    raise UnsupportedEncoding(f"Unsupported content type: {content_type}")
+
+
+def decompress(body: bytes, max_bytes: int = MAX_BODY_BYTES) -> bytes:
+    """
+    Inflate a gzip body without producing more than ``max_bytes``.
+
+    Output is inflated incrementally, so a small "gzip bomb" is rejected
+    before it is expanded in memory.
+
+    Raises:
+        BodyTooLarge: If the inflated body would exceed ``max_bytes``
+        ValueError: If the body is not valid gzip
+    """
+    inflater = zlib.decompressobj(wbits=31)  # gzip container
+    try:
+        output = inflater.decompress(body, max_bytes + 1)
+        if len(output) > max_bytes or inflater.unconsumed_tail:
+            raise BodyTooLarge(f"Decompressed body exceeds {max_bytes} bytes")
+        output += inflater.flush()
+    except zlib.error as e:
+        raise ValueError(f"Invalid gzip body: {e}") from e
+    if not inflater.eof:
+        raise ValueError("Invalid gzip body: truncated stream")
+    return output
+
+
+def decode(body: bytes, content_type: Optional[str] = JSON, content_encoding: Optional[str] = None) -> Any:
+    """
+    Parse a (possibly gzip-compressed) body.
+
+    Raises:
+        UnsupportedEncoding: If the encoding or content type is unsupported
+        BodyTooLarge: If the body or its decompressed form is too large
+        ValueError: If the body is malformed
+    """
+    if len(body) > MAX_BODY_BYTES:
+        raise BodyTooLarge(f"Body exceeds {MAX_BODY_BYTES} bytes")
+    encoding = (content_encoding or "").strip().lower()
+    if encoding == "gzip":
+        body = decompress(body)
+    elif encoding not in ("", "identity"):
+        raise UnsupportedEncoding(f"Unsupported content encoding: {content_encoding}")
+
+    media_type = _media_type(content_type)
+    if media_type in _MSGPACK_ALIASES:
+        if not MSGPACK_AVAILABLE:
+            raise UnsupportedEncoding("msgpack is not installed")
+        try:
+            return msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack body: {e}") from e
+    if media_type in ("", JSON) or media_type.endswith("+json"):
+        try:
+            return orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON body: {e}") from e
+    raise UnsupportedEncoding(f"Unsupported content type: {content_type}")
+
+
+def content_types() -> List[str]:
+    """Content types this process can read and write (for agent cards)."""
+    return [JSON, MSGPACK] if MSGPACK_AVAILABLE else [JSON]
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick the response content type for an ``Accept`` header (JSON by default)."""
+    if MSGPACK_AVAILABLE and accept:
+        if any(_media_type(item) in _MSGPACK_ALIASES for item in accept.split(",")):
+            return MSGPACK
+    return JSON
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().lower().partition(";")
+        if coding.strip() in ("gzip", "*"):
+            return params.replace(" ", "") != "q=0"
+    return False
+
+
+def compress(body: bytes, min_bytes: int = GZIP_MIN_BYTES) -> Tuple[bytes, Optional[str]]:
+    """gzip ``body`` when it is at least ``min_bytes`` long; returns (body, Content-Encoding)."""
+    if len(body) < min_bytes:
+        return body, None
+    return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+
+
+def data_part(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "data", "data": payload}
+
+
+def part_payload(part: Any) -> Dict[str, Any]:
+    """
+    Structured payload of a message part (dict or ``MessagePart``).
+
+    Data parts are returned as is; text parts are parsed as JSON (callers
+    that predate data parts).
+
+    Raises:
+        ValueError: If the part carries no JSON object
+    """
+    if isinstance(part, dict):
+        data, text = part.get("data"), part.get("text")
+    else:
+        data, text = getattr(part, "data", None), getattr(part, "text", None)
+    if data is None:
+        if text is None:
+            raise ValueError("Message part has neither data nor text")
+        data = orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Message part payload must be an object")
+    return data
+
+
+async def read_body(request: Request, service: str) -> Any:
+    """
+    Decode a request body by its ``Content-Type`` and ``Content-Encoding``.
+
+    Raises:
+        HTTPException: 415 for unsupported encodings, 413 for oversized
+            bodies, 400 for malformed bodies
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type")
+    PAYLOAD_BYTES.labels(service=service, direction="in", format=format_label(content_type)).inc(len(body))
+    try:
+        return decode(body, content_type, request.headers.get("content-encoding"))
+    except UnsupportedEncoding as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except BodyTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def read_model(request: Request, model: Type[M], service: str) -> M:
+    """
+    Decode a request body into a pydantic model.
+
+    Raises:
+        HTTPException: 415/413/400 as in ``read_body``, 422 if validation fails
+    """
+    payload = await read_body(request, service)
+    try:
+        return model.model_validate(payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+
+
+def encoded_response(request: Request, payload: Any, service: str, status_code: int = 200) -> Response:
+    """Encode a response in the negotiated content type, gzip-compressed if accepted."""
+    content_type = negotiate(request.headers.get("accept"))
+    body = encode(payload, content_type)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        body, encoding = compress(body)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    PAYLOAD_BYTES.labels(service=service, direction="out", format=format_label(content_type)).inc(len(body))
+    return Response(content=body, status_code=status_code, media_type=content_type, headers=headers)
+
+
+def encode_request(payload: Any, content_type: str = JSON) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Body and headers for an outgoing request.
+
+    Returns:
+        (body, headers) with Content-Type, Accept and, for large bodies,
+        Content-Encoding set
+    """
+    body, encoding = compress(encode(payload, content_type))
+    headers = {"Content-Type": content_type, "Accept": content_type}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return body, headers
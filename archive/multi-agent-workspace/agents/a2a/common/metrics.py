@@ -0,0 +1,74 @@
+"""
+``/metrics`` endpoint and request instrumentation for the A2A services.
+"""
+import time
+from typing import Callable, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+
+from src.agents.company_research.metrics import (
+    QUEUE_DEPTH,
+    REQUEST_LATENCY,
+    TASKS_IN_FLIGHT,
+    MetricsUnavailable,
+    render_metrics,
+)
+
+# Paths polled by infrastructure; not worth a latency series
+_UNTRACKED_PATHS = {"/metrics", "/health"}
+
+
+def install_metrics(
+    app: FastAPI,
+    service: str,
+    background_in_flight: Optional[Callable[[], int]] = None,
+    queue_depth: Optional[Callable[[], int]] = None
+) -> None:
+    """
+    Add request latency tracking and a Prometheus ``GET /metrics`` endpoint.
+
+    ``a2a_tasks_in_flight`` counts requests being handled plus
+    ``background_in_flight()`` (e.g. streaming tasks or job workers).
+
+    Args:
+        app: FastAPI application
+        service: Service label for the metrics
+        background_in_flight: Optional count of running background work
+        queue_depth: Optional count of queued work items
+    """
+    active = {"requests": 0}
+
+    @app.middleware("http")
+    async def record_request(request: Request, call_next):
+        if request.url.path in _UNTRACKED_PATHS:
+            return await call_next(request)
+
+        active["requests"] += 1
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            active["requests"] -= 1
+            # Route template keeps label cardinality bounded (/jobs/{job_id})
+            path = getattr(request.scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.labels(service=service, path=path, status=str(status)).observe(
+                time.perf_counter() - started
+            )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics (requires prometheus_client)."""
+        in_flight = active["requests"] + (background_in_flight() if background_in_flight else 0)
+        TASKS_IN_FLIGHT.labels(service=service).set(in_flight)
+        if queue_depth is not None:
+            QUEUE_DEPTH.labels(service=service).set(queue_depth())
+
+        try:
+            body, content_type = render_metrics()
+        except MetricsUnavailable as e:
+            raise HTTPException(status_code=501, detail=str(e))
+        return Response(content=body, media_type=content_type)
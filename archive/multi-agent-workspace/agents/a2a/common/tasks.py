@@ -0,0 +1,195 @@
+"""
+In-memory A2A task table.
+
+Backs the non-blocking part of the A2A task lifecycle on the agents:
+
+- ``tasks/sendSubscribe``: start a task and stream its progress events (SSE)
+- ``tasks/get``: poll a task's status and result
+- ``tasks/cancel``: cancel a running task
+
+Tasks run as asyncio tasks in the agent process. Progress events emitted by
+the research/extraction nodes are captured through
+``company_research.progress`` and fanned out to subscribers.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.agents.company_research.progress import progress_reporter
+from src.agents.a2a.common.codec import data_part, dumps_json
+
+logger = logging.getLogger(__name__)
+
+# Task states (same vocabulary as TaskStatus.state)
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELED = "canceled"
+
+TERMINAL_STATES = {COMPLETED, FAILED, CANCELED}
+
+
+def _is_terminal(payload: Dict[str, Any]) -> bool:
+    return payload["event"] == "status" and payload["state"] in TERMINAL_STATES
+
+
+class TaskRecord:
+    """State of one A2A task, its event log and live subscribers."""
+
+    def __init__(self, task_id: str):
+        self.id = task_id
+        self.state = PENDING
+        self.message: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.events: List[Dict[str, Any]] = []
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    def publish(self, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Append an event to the log and push it to live subscribers."""
+        payload = {
+            "id": self.id,
+            "event": event,
+            "state": self.state,
+            "timestamp": time.time(),
+            "data": data or {}
+        }
+        self.events.append(payload)
+        for queue in self._subscribers:
+            queue.put_nowait(payload)
+
+    def set_state(self, state: str, message: Optional[str] = None) -> None:
+        self.state = state
+        self.message = message
+        if state in TERMINAL_STATES:
+            self.finished_at = time.time()
+        data: Dict[str, Any] = {"message": message} if message else {}
+        if state == COMPLETED and self.result is not None:
+            data["result"] = self.result
+        self.publish("status", data)
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield past events, then live ones until the task finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        # Events published from here on land in the queue, not the backlog
+        backlog = list(self.events)
+        try:
+            for payload in backlog:
+                yield payload
+                if _is_terminal(payload):
+                    return
+            while True:
+                payload = await queue.get()
+                yield payload
+                if _is_terminal(payload):
+                    return
+        finally:
+            self._subscribers.remove(queue)
+
+
+class TaskTable:
+    """
+    Registry of tasks for one agent process.
+
+    Finished tasks are kept for polling and evicted oldest-first once
+    ``max_finished`` is exceeded.
+    """
+
+    def __init__(self, max_finished: int = 1000):
+        self.max_finished = max_finished
+        self._tasks: "OrderedDict[str, TaskRecord]" = OrderedDict()
+
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        return self._tasks.get(task_id)
+
+    def in_flight(self) -> int:
+        return sum(1 for record in self._tasks.values() if record.state not in TERMINAL_STATES)
+
+    def start(
+        self,
+        task_id: str,
+        run: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> TaskRecord:
+        """
+        Register a task and start running it in the background.
+
+        Args:
+            task_id: A2A task id (must be unique among live tasks)
+            run: Coroutine factory producing the task's output dict
+
+        Returns:
+            The task record
+
+        Raises:
+            ValueError: If a live task with the same id exists
+        """
+        existing = self._tasks.get(task_id)
+        if existing is not None and existing.state not in TERMINAL_STATES:
+            raise ValueError(f"Task already running: {task_id}")
+
+        record = TaskRecord(task_id)
+        self._tasks[task_id] = record
+        self._tasks.move_to_end(task_id)
+        self._evict()
+
+        async def runner() -> None:
+            record.set_state(IN_PROGRESS)
+            try:
+                with progress_reporter(record.publish):
+                    record.result = await run()
+                record.set_state(COMPLETED)
+            except asyncio.CancelledError:
+                record.set_state(CANCELED, "Task canceled")
+            except Exception as e:
+                logger.error(f"Task {task_id} failed: {e}", exc_info=True)
+                record.set_state(FAILED, str(e))
+
+        record.task = asyncio.get_running_loop().create_task(runner())
+        return record
+
+    async def cancel(self, task_id: str, wait: float = 1.0) -> Optional[TaskRecord]:
+        """Cancel a live task, waiting up to ``wait`` seconds for it to stop."""
+        record = self._tasks.get(task_id)
+        if record is not None and record.task is not None and record.state not in TERMINAL_STATES:
+            record.task.cancel()
+            if record.state == PENDING:
+                # Cancelled before its first step the runner never runs, so
+                # it would never publish the terminal event itself
+                record.set_state(CANCELED, "Task canceled")
+                return record
+            await asyncio.wait({record.task}, timeout=wait)
+        return record
+
+    def _evict(self) -> None:
+        finished = [tid for tid, rec in self._tasks.items() if rec.state in TERMINAL_STATES]
+        for task_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._tasks[task_id]
+
+
+class TaskIdRequest(BaseModel):
+    """A2A task lookup (tasks/get, tasks/cancel)."""
+    id: str = Field(description="Task identifier")
+
+
+def task_response(record: TaskRecord) -> Dict[str, Any]:
+    """A2A task response (``TaskResponse`` shape) for a task table record."""
+    status: Dict[str, Any] = {"state": record.state}
+    if record.message is not None:
+        status["message"] = record.message
+    messages = []
+    if record.state == COMPLETED and record.result is not None:
+        messages.append({"role": "assistant", "parts": [data_part(record.result)]})
+    return {"id": record.id, "status": status, "messages": messages}
+
+
+def sse_format(payload: Dict[str, Any]) -> str:
+    """Encode an event as a Server-Sent Events frame."""
+    return f"event: {payload['event']}\ndata: {dumps_json(payload).decode('utf-8')}\n\n"
@@ -6,24 +6,48 @@ Orchestrates the multi-agent workflow:
 2. Extraction Agent → extracts structured data
 3. Reflection (local) → evaluates quality and decides to continue/end
 
+Agent calls share one pooled HTTP client per replica for the app lifetime
+and are balanced across replicas with circuit breakers and a retry budget
+(see balancer.py). Task input/output travel as data parts, encoded once as
+JSON or msgpack with gzip for large bodies (see common/codec.py).
+
 This is a simplified Phase 1 implementation. Future enhancements:
-- Load balancing across multiple agent instances
-- Circuit breaker pattern for fault tolerance
 - Reflection as Lambda function
-- Redis task queue for async processing
+- Redis-backed job store/queue (in-memory/SQLite stand-ins in jobs.py)
 """
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 import httpx
 import logging
-import json
+import os
 import uuid
 
 # Import reflection logic (local for Phase 1)
 from src.agents.company_research.reflection import reflection_node
 from src.agents.company_research.configuration import Configuration
 from src.agents.company_research.state import ResearchState
+from src.agents.a2a.coordinator.clients import AgentClientPool, default_timeout
+from src.agents.a2a.coordinator.balancer import AgentEndpointGroup, AgentUnavailable, agent_endpoints
+from src.agents.a2a.common.metrics import install_metrics
+from src.agents.a2a.common.codec import (
+    JSON,
+    MSGPACK,
+    data_part,
+    decode,
+    encode_request,
+    format_label,
+    part_payload,
+)
+from src.agents.company_research.metrics import PAYLOAD_BYTES
+from src.agents.a2a.coordinator.jobs import (
+    JobStore,
+    InMemoryJobStore,
+    SQLiteJobStore,
+    InMemoryJobQueue,
+    JobWorkerPool,
+    QueueFull,
+)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -35,13 +59,45 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Configuration
-RESEARCH_AGENT_URL = "http://research-agent:5001"
-EXTRACTION_AGENT_URL = "http://extraction-agent:5002"
+# Configuration: RESEARCH_AGENT_URLS / EXTRACTION_AGENT_URLS list replicas
+# (comma-separated, or dns+http://host:port); the single *_URL still works
+RESEARCH_AGENT_ENDPOINTS = agent_endpoints("RESEARCH_AGENT", "http://research-agent:5001")
+EXTRACTION_AGENT_ENDPOINTS = agent_endpoints("EXTRACTION_AGENT", "http://extraction-agent:5002")
 
 # For local development
-# RESEARCH_AGENT_URL = "http://localhost:5001"
-# EXTRACTION_AGENT_URL = "http://localhost:5002"
+# RESEARCH_AGENT_URLS=http://localhost:5001
+# EXTRACTION_AGENT_URLS=http://localhost:5002
+
+# Wire format for agent calls: "json" or "msgpack" (msgpack needs the
+# package installed in the coordinator and the agents)
+AGENT_WIRE_FORMAT = MSGPACK if os.getenv("AGENT_WIRE_FORMAT", "json") == "msgpack" else JSON
+
+# Job execution (POST /jobs)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "8"))
+JOB_QUEUE_MAXSIZE = int(os.getenv("JOB_QUEUE_MAXSIZE", "1000"))
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH")  # SQLite file; in-memory when unset
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "1000"))  # in-memory store retention
+
+# Shared connection pools to downstream agent replicas
+agent_clients = AgentClientPool()
+research_agents = AgentEndpointGroup("research", RESEARCH_AGENT_ENDPOINTS, agent_clients)
+extraction_agents = AgentEndpointGroup("extraction", EXTRACTION_AGENT_ENDPOINTS, agent_clients)
+
+
+@app.on_event("startup")
+async def open_agent_clients():
+    """Resolve agent replicas, open pooled clients and start health checks."""
+    for agents in (research_agents, extraction_agents):
+        await agents.start()
+    await agent_clients.start(*research_agents.urls, *extraction_agents.urls)
+
+
+@app.on_event("shutdown")
+async def close_agent_clients():
+    """Stop health checks and close pooled clients."""
+    for agents in (research_agents, extraction_agents):
+        await agents.stop()
+    await agent_clients.close()
 
 
 class CompanyResearchRequest(BaseModel):
@@ -62,14 +118,26 @@ class CompanyResearchResponse(BaseModel):
     status: str
 
 
-async def call_agent(agent_url: str, task_id: str, task_input: Dict[str, Any]) -> Dict[str, Any]:
+class JobSubmitResponse(BaseModel):
+    """Response from job submission."""
+    job_id: str
+    status: str
+
+
+async def call_agent(
+    agents: AgentEndpointGroup,
+    task_id: str,
+    task_input: Dict[str, Any],
+    read_timeout: Optional[float] = None
+) -> Dict[str, Any]:
     """
-    Call an A2A agent service.
+    Call an A2A agent service on its least loaded replica.
 
     Args:
-        agent_url: Agent service URL
+        agents: Replicas of the agent
         task_id: Unique task identifier
         task_input: Task input data
+        read_timeout: Override for the read timeout in seconds
 
     Returns:
         Agent response data
@@ -78,39 +146,53 @@ async def call_agent(agent_url: str, task_id: str, task_input: Dict[str, Any]) -
         HTTPException: If agent call fails
     """
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            # Format A2A request
-            request_data = {
-                "id": task_id,
-                "message": {
-                    "role": "user",
-                    "parts": [{"text": json.dumps(task_input)}]
-                }
+        # Format A2A request
+        request_data = {
+            "id": task_id,
+            "message": {
+                "role": "user",
+                "parts": [data_part(task_input)]
             }
+        }
+        body, headers = encode_request(request_data, AGENT_WIRE_FORMAT)
+
+        logger.info(f"Calling {agents.name} agent /tasks/send")
+        response = await agents.request(
+            "POST",
+            "/tasks/send",
+            content=body,
+            headers=headers,
+            timeout=default_timeout(read_timeout) if read_timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+        response.raise_for_status()
 
-            logger.info(f"Calling agent at {agent_url}/tasks/send")
-            response = await client.post(
-                f"{agent_url}/tasks/send",
-                json=request_data
-            )
-            response.raise_for_status()
+        wire_format = format_label(AGENT_WIRE_FORMAT)
+        PAYLOAD_BYTES.labels(service="coordinator", direction="out", format=wire_format).inc(len(body))
+        PAYLOAD_BYTES.labels(service="coordinator", direction="in", format=wire_format).inc(
+            response.num_bytes_downloaded
+        )
 
-            result = response.json()
+        # httpx has already undone any Content-Encoding
+        result = decode(response.content, response.headers.get("content-type"))
 
-            # Check task status
-            if result["status"]["state"] != "completed":
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Agent task failed: {result['status'].get('message', 'Unknown error')}"
-                )
+        # Check task status
+        if result["status"]["state"] != "completed":
+            raise HTTPException(
+                status_code=500,
+                detail=f"Agent task failed: {result['status'].get('message', 'Unknown error')}"
+            )
 
-            # Parse response
-            output_text = result["messages"][0]["parts"][0]["text"]
-            return json.loads(output_text)
+        # Data part (text part with JSON from older agents)
+        return part_payload(result["messages"][0]["parts"][0])
 
-    except httpx.RequestError as e:
-        logger.error(f"Agent request error: {e}")
+    except AgentUnavailable as e:
+        logger.error(f"Agent unavailable: {e}")
         raise HTTPException(status_code=503, detail=f"Agent service unavailable: {str(e)}")
+    except httpx.RequestError as e:
+        # Not retried: the agent may still be running the task
+        logger.error(f"Agent request failed: {e!r}")
+        status = 504 if isinstance(e, httpx.TimeoutException) else 502
+        raise HTTPException(status_code=status, detail=f"Agent request failed: {e!r}")
     except httpx.HTTPStatusError as e:
         logger.error(f"Agent HTTP error: {e}")
         raise HTTPException(status_code=e.response.status_code, detail=f"Agent error: {str(e)}")
@@ -119,8 +201,7 @@ async def call_agent(agent_url: str, task_id: str, task_input: Dict[str, Any]) -
         raise HTTPException(status_code=500, detail=f"Agent call failed: {str(e)}")
 
 
-@app.post("/research", response_model=CompanyResearchResponse)
-async def research_company(request: CompanyResearchRequest):
+async def run_research_workflow(request: CompanyResearchRequest) -> CompanyResearchResponse:
     """
     Execute complete company research workflow.
 
@@ -145,6 +226,7 @@ async def research_company(request: CompanyResearchRequest):
             "extraction_schema": request.extraction_schema,
             "user_context": request.user_context,
             "research_queries": [],
+            "executed_queries": [],
             "search_results": [],
             "research_notes": "",
             "extracted_data": {},
@@ -166,11 +248,16 @@ async def research_company(request: CompanyResearchRequest):
                 "company_name": request.company_name,
                 "extraction_schema": request.extraction_schema,
                 "user_context": request.user_context,
-                "follow_up_queries": state["follow_up_queries"]
+                "follow_up_queries": state["follow_up_queries"],
+                # Previous sources/notes make follow-up iterations incremental
+                "search_results": state["search_results"],
+                "research_notes": state["research_notes"],
+                "executed_queries": state["executed_queries"],
+                "reflection_count": iteration
             }
 
             research_result = await call_agent(
-                RESEARCH_AGENT_URL,
+                research_agents,
                 f"research-{uuid.uuid4()}",
                 research_input
             )
@@ -178,6 +265,7 @@ async def research_company(request: CompanyResearchRequest):
             state["research_queries"] = research_result["research_queries"]
             state["search_results"] = research_result["search_results"]
             state["research_notes"] = research_result["research_notes"]
+            state["executed_queries"] = research_result.get("executed_queries", state["executed_queries"])
 
             logger.info(f"Research completed: {len(research_result['research_queries'])} queries, "
                        f"{len(research_result['search_results'])} results")
@@ -187,11 +275,15 @@ async def research_company(request: CompanyResearchRequest):
                 "company_name": request.company_name,
                 "extraction_schema": request.extraction_schema,
                 "research_notes": state["research_notes"],
-                "user_context": request.user_context
+                "user_context": request.user_context,
+                # Follow-up iterations re-extract only the missing fields
+                "extracted_data": state["extracted_data"],
+                "missing_fields": state.get("missing_fields", []),
+                "reflection_count": iteration
             }
 
             extraction_result = await call_agent(
-                EXTRACTION_AGENT_URL,
+                extraction_agents,
                 f"extraction-{uuid.uuid4()}",
                 extraction_input
             )
@@ -229,15 +321,97 @@ async def research_company(request: CompanyResearchRequest):
         raise HTTPException(status_code=500, detail=f"Research workflow failed: {str(e)}")
 
 
+@app.post("/research", response_model=CompanyResearchResponse)
+async def research_company(request: CompanyResearchRequest):
+    """
+    Execute the research workflow and wait for the result.
+
+    Holds the connection open for the whole workflow; prefer ``POST /jobs``
+    for long-running or bursty workloads.
+    """
+    return await run_research_workflow(request)
+
+
+async def _run_job(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: run the workflow for a stored request."""
+    response = await run_research_workflow(CompanyResearchRequest(**request_data))
+    return response.model_dump()
+
+
+job_store: JobStore = (
+    SQLiteJobStore(JOB_STORE_PATH) if JOB_STORE_PATH else InMemoryJobStore(max_finished=JOB_MAX_FINISHED)
+)
+job_workers = JobWorkerPool(
+    store=job_store,
+    queue=InMemoryJobQueue(maxsize=JOB_QUEUE_MAXSIZE),
+    handler=_run_job,
+    workers=JOB_WORKERS
+)
+
+
+# Prometheus metrics on GET /metrics (blocking /research calls + running jobs)
+install_metrics(
+    app,
+    "coordinator",
+    background_in_flight=lambda: job_workers.running,
+    queue_depth=lambda: job_workers.queue.qsize()
+)
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Re-enqueue jobs left unfinished by a previous process, then start the worker pool."""
+    await job_workers.recover()
+    job_workers.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    """Stop the job worker pool."""
+    await job_workers.stop()
+
+
+@app.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(request: CompanyResearchRequest):
+    """
+    Enqueue a research workflow and return its job id immediately.
+
+    Poll ``GET /jobs/{job_id}`` for status and results.
+    """
+    job_id = str(uuid.uuid4())
+    try:
+        record = await job_workers.submit(job_id, request.model_dump())
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Job queue is full, retry later",
+                            headers={"Retry-After": "5"})
+
+    logger.info(f"Queued job {job_id} for {request.company_name}")
+    return JobSubmitResponse(job_id=job_id, status=record["status"])
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get job status, and the result once completed."""
+    record = await job_store.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return record
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
         "service": "coordinator",
+        "jobs": {
+            "queued": job_workers.queue.qsize(),
+            "running": job_workers.running,
+            "workers": job_workers.workers
+        },
         "agents": {
-            "research": RESEARCH_AGENT_URL,
-            "extraction": EXTRACTION_AGENT_URL
+            "research": research_agents.snapshot(),
+            "extraction": extraction_agents.snapshot()
         }
     }
 
@@ -251,18 +425,21 @@ async def discover_agents():
     """
     agents_info = {}
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for agent_name, agent_url in [
-            ("research", RESEARCH_AGENT_URL),
-            ("extraction", EXTRACTION_AGENT_URL)
-        ]:
-            try:
-                response = await client.get(f"{agent_url}/.well-known/agent.json")
-                response.raise_for_status()
-                agents_info[agent_name] = response.json()
-            except Exception as e:
-                logger.warning(f"Could not discover {agent_name} agent: {e}")
-                agents_info[agent_name] = {"error": str(e)}
+    for agent_name, agents in [
+        ("research", research_agents),
+        ("extraction", extraction_agents)
+    ]:
+        try:
+            response = await agents.request(
+                "GET",
+                "/.well-known/agent.json",
+                timeout=default_timeout(read=10.0)
+            )
+            response.raise_for_status()
+            agents_info[agent_name] = response.json()
+        except Exception as e:
+            logger.warning(f"Could not discover {agent_name} agent: {e}")
+            agents_info[agent_name] = {"error": str(e)}
 
     return agents_info
 
@@ -0,0 +1,443 @@
+"""
+Replica-aware agent endpoints for coordinator → agent calls.
+
+Each downstream agent (research, extraction) is an ``AgentEndpointGroup``
+of replicas configured from the environment:
+
+    RESEARCH_AGENT_URLS=http://research-1:5001,http://research-2:5001
+    RESEARCH_AGENT_URLS=dns+http://research-agent:5001   # one replica per DNS record
+
+Requests go to the available replica with the fewest outstanding requests
+(random tie-break). Every replica has a circuit breaker; failed requests
+are retried on another replica with jittered backoff while the group's
+retry budget allows, so a failing replica costs capacity instead of whole
+workflows. Non-idempotent requests (``POST /tasks/send`` starts a paid,
+long-running task) only fail over when the agent cannot have received
+them: connect-phase errors and 429/503. A read timeout or 502/504 may mean
+the task is still running on the first replica, so it is left to the
+caller. A background loop polls ``GET /health``, ejects replicas that fail
+it and re-resolves ``dns+`` endpoints.
+
+Tuning (environment variables):
+- AGENT_MAX_ATTEMPTS: Attempts per request across replicas (default 3)
+- AGENT_RETRY_BUDGET: Retries earned per request (default 0.2, i.e. +20% load at most)
+- AGENT_RETRY_MIN_PER_SECOND: Retries always allowed per second (default 1)
+- AGENT_BREAKER_FAILURES: Consecutive failures that open a breaker (default 5)
+- AGENT_BREAKER_RESET: Seconds before an open breaker lets a probe through (default 15)
+- AGENT_HEALTH_INTERVAL: Seconds between health checks (default 10, 0 disables)
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+from src.agents.a2a.coordinator.clients import AgentClientPool, default_timeout
+from src.agents.company_research.metrics import AGENT_RETRIES, REPLICA_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying on another replica
+RETRYABLE_STATUS = {429, 502, 503, 504}
+# Statuses that guarantee the request was not processed (safe for POST)
+REJECTED_STATUS = {429, 503}
+# Errors raised before the request reached the agent
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+BACKOFF_BASE = 0.1
+BACKOFF_MAX = 2.0
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def agent_endpoints(prefix: str, default: str) -> List[str]:
+    """
+    Read an agent's endpoints from ``{prefix}_URLS`` (comma-separated),
+    falling back to the single ``{prefix}_URL``.
+    """
+    value = os.getenv(f"{prefix}_URLS") or os.getenv(f"{prefix}_URL") or default
+    return [endpoint.strip().rstrip("/") for endpoint in value.split(",") if endpoint.strip()]
+
+
+class AgentUnavailable(RuntimeError):
+    """Raised when no replica of an agent can take a request."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed → open after ``failure_threshold`` failures in a row; open →
+    half-open after ``reset_timeout`` seconds, letting one probe through;
+    the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allows(self) -> bool:
+        """Whether a request may be sent now (no state change)."""
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            return time.monotonic() - self._opened_at >= self.reset_timeout
+        return not self._probing
+
+    def begin(self) -> None:
+        """Note a dispatched request (the probe, when not closed)."""
+        if self.state == "open":
+            self.state = "half_open"
+        if self.state == "half_open":
+            self._probing = True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """End a request without an outcome (e.g. 429), freeing the probe slot."""
+        self._probing = False
+
+
+class RetryBudget:
+    """
+    Retry budget shared by all requests to one agent.
+
+    Each request earns ``ratio`` retries and ``min_per_second`` retries
+    accrue over time; a retry spends one. During an outage this caps retry
+    traffic at a fraction of normal load instead of multiplying it.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, cap: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.cap = cap
+        self._balance = min(cap, max(1.0, min_per_second * 10))
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._balance = min(self.cap, self._balance + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self) -> None:
+        self._refill()
+        self._balance = min(self.cap, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self._balance < 1.0:
+            return False
+        self._balance -= 1.0
+        return True
+
+
+class Replica:
+    """One agent instance: base URL, outstanding requests, breaker and health."""
+
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url
+        self.breaker = breaker
+        self.outstanding = 0
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.breaker.allows()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "breaker": self.breaker.state,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class AgentEndpointGroup:
+    """
+    Load-balanced, fault-tolerant client for all replicas of one agent.
+
+    Args:
+        name: Agent name (metrics label, logs)
+        endpoints: Base URLs; ``dns+http://host:port`` expands to one
+            replica per address the name resolves to
+        pool: Shared HTTP client pool (one client per replica URL)
+    """
+
+    def __init__(self, name: str, endpoints: List[str], pool: AgentClientPool):
+        self.name = name
+        self.endpoints = endpoints
+        self.pool = pool
+        self.max_attempts = max(1, int(os.getenv("AGENT_MAX_ATTEMPTS", "3")))
+        self.budget = RetryBudget(
+            _env_float("AGENT_RETRY_BUDGET", 0.2),
+            _env_float("AGENT_RETRY_MIN_PER_SECOND", 1.0)
+        )
+        self.breaker_failures = int(os.getenv("AGENT_BREAKER_FAILURES", "5"))
+        self.breaker_reset = _env_float("AGENT_BREAKER_RESET", 15.0)
+        self.health_interval = _env_float("AGENT_HEALTH_INTERVAL", 10.0)
+        self.replicas: Dict[str, Replica] = {}
+        # Until DNS is resolved, dns+ endpoints are used by hostname
+        self._set_replicas([endpoint[len("dns+"):] if endpoint.startswith("dns+") else endpoint
+                            for endpoint in endpoints])
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def urls(self) -> List[str]:
+        return list(self.replicas)
+
+    def _set_replicas(self, urls: List[str]) -> List[Replica]:
+        """Replace the replica set; returns the replicas that were removed."""
+        current = self.replicas
+        self.replicas = {
+            url: current.get(url) or Replica(url, CircuitBreaker(self.breaker_failures, self.breaker_reset))
+            for url in urls
+        }
+        removed = [replica for url, replica in current.items() if url not in self.replicas]
+        for replica in removed:
+            logger.info(f"{self.name}: replica {replica.url} removed")
+            REPLICA_AVAILABLE.labels(agent=self.name, replica=replica.url).set(0)
+        for url in set(self.replicas) - set(current):
+            REPLICA_AVAILABLE.labels(agent=self.name, replica=url).set(1)
+        return removed
+
+    async def _retire(self, replica: Replica) -> None:
+        """Close the pooled client of a removed replica once it has no requests in flight."""
+        if replica.outstanding == 0 and self.replicas.get(replica.url) is not replica:
+            await self.pool.discard(replica.url)
+
+    def pick(self, exclude: Set[str] = frozenset()) -> Replica:
+        """
+        Choose the available replica with the fewest outstanding requests.
+
+        When health checks have ejected every replica, breakers alone
+        decide (better to try than to fail everything on a flaky check).
+
+        Raises:
+            AgentUnavailable: If every candidate's breaker is open
+        """
+        candidates = [r for r in self.replicas.values() if r.url not in exclude and r.available]
+        if not candidates:
+            candidates = [r for r in self.replicas.values() if r.url not in exclude and r.breaker.allows()]
+        if not candidates:
+            raise AgentUnavailable(f"No available {self.name} agent replica ({len(self.replicas)} configured)")
+        fewest = min(r.outstanding for r in candidates)
+        return random.choice([r for r in candidates if r.outstanding == fewest])
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Send a request to the least loaded replica, failing over on errors.
+
+        Failed attempts are retried on a different replica (the same one if
+        it is the only candidate) while attempts and the retry budget last:
+
+        - idempotent requests: any connection error and 429/502/503/504
+        - others: only connect-phase errors and 429/503, which mean the
+          agent did not start the work; read errors/timeouts are raised
+          and 502/504 returned, since the task may still be running
+
+        Other responses are returned as-is for the caller to check.
+
+        Args:
+            method: HTTP method
+            path: Path on the agent
+            idempotent: Whether re-sending is safe (default: by method)
+            **kwargs: Passed to ``httpx.AsyncClient.request``
+
+        Returns:
+            Response of the last attempt
+
+        Raises:
+            AgentUnavailable: If no replica could be reached
+            httpx.RequestError: If a non-idempotent request failed after
+                it may have reached the agent
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        retryable_status = RETRYABLE_STATUS if idempotent else REJECTED_STATUS
+        self.budget.deposit()
+        tried: Set[str] = set()
+        last_error: Optional[BaseException] = None
+        last_response: Optional[httpx.Response] = None
+
+        for attempt in range(self.max_attempts):
+            if attempt:
+                if not self.budget.withdraw():
+                    AGENT_RETRIES.labels(agent=self.name, reason="budget_exhausted").inc()
+                    logger.warning(f"{self.name}: retry budget exhausted")
+                    break
+                ceiling = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+                await asyncio.sleep(random.uniform(ceiling / 2, ceiling))
+
+            try:
+                replica = self.pick(tried)
+            except AgentUnavailable:
+                if not tried:
+                    raise
+                # Every replica was tried: retry any that still accepts requests
+                try:
+                    replica = self.pick()
+                except AgentUnavailable:
+                    break
+            tried.add(replica.url)
+
+            replica.outstanding += 1
+            replica.requests += 1
+            replica.breaker.begin()
+            settled = False
+            try:
+                response = await self.pool.get(replica.url).request(method, path, **kwargs)
+                if response.status_code >= 500:
+                    self._failed(replica, f"status_{response.status_code}")
+                    settled = True
+                elif response.status_code == 429:
+                    # Overloaded, not broken: move on without tripping the breaker
+                    AGENT_RETRIES.labels(agent=self.name, reason="status_429").inc()
+                else:
+                    if replica.breaker.state != "closed":
+                        logger.info(f"{self.name}: circuit closed for {replica.url}")
+                        REPLICA_AVAILABLE.labels(agent=self.name, replica=replica.url).set(
+                            1 if replica.healthy else 0
+                        )
+                    replica.breaker.record_success()
+                    settled = True
+                    return response
+            except httpx.RequestError as e:
+                self._failed(replica, type(e).__name__)
+                settled = True
+                logger.warning(f"{self.name}: {method} {replica.url}{path} failed: {e!r}")
+                if not idempotent and not isinstance(e, CONNECT_ERRORS):
+                    raise
+                last_error = e
+                continue
+            except BaseException as e:
+                # Cancelled (job cancelled, shutdown) or unexpected: outcome unknown
+                self._failed(replica, "cancelled" if isinstance(e, asyncio.CancelledError) else "exception")
+                settled = True
+                raise
+            finally:
+                replica.outstanding -= 1
+                if not settled:
+                    # No outcome recorded (e.g. 429): free the half-open probe slot
+                    replica.breaker.release()
+                await self._retire(replica)
+
+            if response.status_code not in retryable_status:
+                return response
+            logger.warning(f"{self.name}: {replica.url}{path} returned {response.status_code}")
+            last_response = response
+
+        if last_response is not None:
+            return last_response
+        raise AgentUnavailable(f"{self.name} agent unreachable after {len(tried)} replica(s): {last_error}")
+
+    def _failed(self, replica: Replica, reason: str) -> None:
+        replica.failures += 1
+        was_open = replica.breaker.state == "open"
+        replica.breaker.record_failure()
+        AGENT_RETRIES.labels(agent=self.name, reason=reason).inc()
+        if replica.breaker.state == "open" and not was_open:
+            logger.warning(f"{self.name}: circuit opened for {replica.url}")
+            REPLICA_AVAILABLE.labels(agent=self.name, replica=replica.url).set(0)
+
+    async def resolve(self) -> None:
+        """Re-resolve ``dns+`` endpoints into replica URLs (keeps the old set on errors)."""
+        if not any(endpoint.startswith("dns+") for endpoint in self.endpoints):
+            return
+        loop = asyncio.get_running_loop()
+        urls: List[str] = []
+        for endpoint in self.endpoints:
+            if not endpoint.startswith("dns+"):
+                urls.append(endpoint)
+                continue
+            url = httpx.URL(endpoint[len("dns+"):])
+            port = url.port or (443 if url.scheme == "https" else 80)
+            try:
+                infos = await loop.getaddrinfo(url.host, port, type=socket.SOCK_STREAM)
+            except OSError as e:
+                logger.warning(f"{self.name}: could not resolve {url.host}: {e}")
+                return
+            for address in sorted({info[4][0] for info in infos}):
+                urls.append(str(url.copy_with(host=address, port=port)).rstrip("/"))
+        if set(urls) != set(self.replicas):
+            removed = self._set_replicas(urls)
+            logger.info(f"{self.name}: {len(urls)} replicas")
+            for replica in removed:
+                await self._retire(replica)
+
+    async def check_health(self) -> None:
+        """Poll ``GET /health`` on every replica and eject the failing ones."""
+        async def check(replica: Replica) -> None:
+            try:
+                response = await self.pool.get(replica.url).get("/health", timeout=default_timeout(read=5.0))
+                healthy = response.status_code == 200
+            except httpx.HTTPError:
+                healthy = False
+            if healthy != replica.healthy:
+                logger.warning(f"{self.name}: replica {replica.url} {'healthy' if healthy else 'ejected'}")
+            replica.healthy = healthy
+            REPLICA_AVAILABLE.labels(agent=self.name, replica=replica.url).set(1 if replica.available else 0)
+
+        await asyncio.gather(*(check(replica) for replica in list(self.replicas.values())))
+
+    async def _health_loop(self) -> None:
+        while True:
+            try:
+                await self.resolve()
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"{self.name}: health check failed: {e}", exc_info=True)
+            await asyncio.sleep(self.health_interval)
+
+    async def start(self) -> None:
+        """Resolve endpoints and start the background health checks."""
+        await self.resolve()
+        if self.health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+        logger.info(f"{self.name}: {len(self.replicas)} replicas {self.urls}")
+
+    async def stop(self) -> None:
+        """Stop the health checks."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "endpoints": self.endpoints,
+            "replicas": [replica.snapshot() for replica in self.replicas.values()]
+        }
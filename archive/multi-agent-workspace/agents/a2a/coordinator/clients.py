@@ -0,0 +1,109 @@
+"""
+Pooled HTTP clients for coordinator → agent calls.
+
+One long-lived ``httpx.AsyncClient`` is kept per downstream agent for the
+lifetime of the app, so TCP/TLS connections are reused across iterations
+and across concurrent research workflows.
+
+Tuning (environment variables):
+- AGENT_MAX_CONNECTIONS: Max open connections per agent (default 200)
+- AGENT_MAX_KEEPALIVE: Idle keep-alive connections per agent (default 50)
+- AGENT_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default 30)
+- AGENT_HTTP2: "1" to enable HTTP/2 (requires the ``h2`` package)
+- AGENT_CONNECT_TIMEOUT: Connect timeout in seconds (default 5)
+- AGENT_READ_TIMEOUT: Read timeout in seconds (default 120)
+"""
+import logging
+import os
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def default_timeout(read: Optional[float] = None) -> httpx.Timeout:
+    """Build a timeout with separate connect and read limits."""
+    connect = _env_float("AGENT_CONNECT_TIMEOUT", 5.0)
+    read = read if read is not None else _env_float("AGENT_READ_TIMEOUT", 120.0)
+    return httpx.Timeout(connect=connect, read=read, write=connect, pool=connect)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AgentClientPool:
+    """
+    App-lifetime pool of HTTP clients, one per agent base URL.
+
+    Use ``start()``/``close()`` from the app's startup/shutdown hooks and
+    ``get(url)`` to obtain the shared client for an agent.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        timeout: Optional[httpx.Timeout] = None
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("AGENT_MAX_CONNECTIONS", "200")),
+            max_keepalive_connections=max_keepalive_connections or int(os.getenv("AGENT_MAX_KEEPALIVE", "50")),
+            keepalive_expiry=keepalive_expiry or _env_float("AGENT_KEEPALIVE_EXPIRY", 30.0)
+        )
+        if http2 is None:
+            http2 = os.getenv("AGENT_HTTP2", "0") == "1"
+        if http2 and not _http2_available():
+            logger.warning("AGENT_HTTP2 requested but 'h2' is not installed; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.timeout = timeout or default_timeout()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        # Optional transports per URL (e.g. in-process ASGI apps for benchmarks)
+        self.transports: Dict[str, httpx.AsyncBaseTransport] = {}
+
+    def _create(self, base_url: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            limits=self.limits,
+            http2=self.http2,
+            timeout=self.timeout,
+            transport=self.transports.get(base_url)
+        )
+
+    async def start(self, *base_urls: str) -> None:
+        """Open clients for the given agents ahead of the first request."""
+        for url in base_urls:
+            self.get(url)
+        logger.info(f"Agent client pool started for {len(self._clients)} agents (http2={self.http2})")
+
+    def get(self, base_url: str) -> httpx.AsyncClient:
+        """Get (or lazily create) the shared client for an agent."""
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = self._create(base_url)
+            self._clients[base_url] = client
+        return client
+
+    async def discard(self, base_url: str) -> None:
+        """Close and forget the client of an agent that is no longer used."""
+        client = self._clients.pop(base_url, None)
+        if client is not None:
+            await client.aclose()
+
+    async def close(self) -> None:
+        """Close all clients and their connection pools."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
@@ -0,0 +1,314 @@
+"""
+Asynchronous job execution for the coordinator.
+
+``POST /jobs`` enqueues a research request and returns immediately; an
+in-process worker pool drains the queue and records results in a job store.
+Queue and store are small interfaces so the in-memory/SQLite stand-ins can
+be swapped for the Redis-backed versions described in A2A_ARCHITECTURE.md.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATES = {COMPLETED, FAILED}
+
+
+class QueueFull(Exception):
+    """Raised when the job queue cannot accept more work."""
+
+
+class JobStore:
+    """Persistence interface for job records."""
+
+    # Records survive a restart (unfinished jobs are resumed by ``recover``)
+    persistent = False
+
+    async def create(self, job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        raise NotImplementedError
+
+    async def unfinished(self) -> List[str]:
+        """Ids of queued or running jobs, oldest first (for recovery on startup)."""
+        raise NotImplementedError
+
+
+class JobQueue:
+    """Work queue interface holding job ids."""
+
+    async def put(self, job_id: str) -> None:
+        raise NotImplementedError
+
+    async def get(self) -> str:
+        raise NotImplementedError
+
+    def qsize(self) -> int:
+        raise NotImplementedError
+
+
+def _new_record(job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": job_id,
+        "status": QUEUED,
+        "request": request,
+        "result": None,
+        "error": None,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None
+    }
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Job store kept in a dict (lost on restart).
+
+    Finished jobs are kept for polling and evicted oldest-first once
+    ``max_finished`` is exceeded.
+    """
+
+    def __init__(self, max_finished: int = 1000):
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def create(self, job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        record = _new_record(job_id, request)
+        self._jobs[job_id] = record
+        return dict(record)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = self._jobs.get(job_id)
+        return dict(record) if record else None
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        self._jobs[job_id].update(fields)
+        if fields.get("status") in FINISHED_STATES:
+            self._evict()
+
+    async def unfinished(self) -> List[str]:
+        return [job_id for job_id, record in self._jobs.items() if record["status"] not in FINISHED_STATES]
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, record in self._jobs.items() if record["status"] in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store persisted to a local SQLite file.
+
+    Queries run on a worker thread so they never block the event loop.
+    """
+
+    persistent = True
+
+    _COLUMNS = ["job_id", "status", "request", "result", "error", "created_at", "started_at", "finished_at"]
+    _JSON_COLUMNS = {"request", "result"}
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, status TEXT, request TEXT, result TEXT, error TEXT,"
+            " created_at REAL, started_at REAL, finished_at REAL)"
+        )
+        self._db.commit()
+
+    def _encode(self, column: str, value: Any) -> Any:
+        if column in self._JSON_COLUMNS and value is not None:
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    async def create(self, job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._create, job_id, request)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        await asyncio.to_thread(self._update, job_id, fields)
+
+    async def unfinished(self) -> List[str]:
+        return await asyncio.to_thread(self._unfinished)
+
+    def _create(self, job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        record = _new_record(job_id, request)
+        with self._lock:
+            self._db.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                [self._encode(c, record[c]) for c in self._COLUMNS]
+            )
+            self._db.commit()
+        return record
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(self._COLUMNS, row))
+        for column in self._JSON_COLUMNS:
+            if record[column] is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    def _update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        columns = [c for c in fields if c in self._COLUMNS]
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET {', '.join(f'{c} = ?' for c in columns)} WHERE job_id = ?",
+                [self._encode(c, fields[c]) for c in columns] + [job_id]
+            )
+            self._db.commit()
+
+    def _unfinished(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+class InMemoryJobQueue(JobQueue):
+    """Bounded asyncio queue; ``put`` fails fast when full."""
+
+    def __init__(self, maxsize: int = 0):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def put(self, job_id: str) -> None:
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull as e:
+            raise QueueFull("Job queue is full") from e
+
+    async def get(self) -> str:
+        return await self._queue.get()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobWorkerPool:
+    """
+    Fixed set of asyncio workers draining a JobQueue.
+
+    Args:
+        store: Job store for status/result updates
+        queue: Queue of job ids
+        handler: Coroutine turning a job's request into its result
+        workers: Number of concurrent jobs
+    """
+
+    def __init__(self, store: JobStore, queue: JobQueue, handler: JobHandler, workers: int = 8):
+        self.store = store
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.running = 0
+        self._tasks: List[asyncio.Task] = []
+
+    async def submit(self, job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a job record and enqueue it."""
+        record = await self.store.create(job_id, request)
+        try:
+            await self.queue.put(job_id)
+        except QueueFull:
+            await self.store.update(job_id, status=FAILED, error="Job queue is full", finished_at=time.time())
+            raise
+        return record
+
+    async def recover(self) -> int:
+        """
+        Re-enqueue jobs a previous process left queued or running.
+
+        The queue is in-memory, so without this, jobs persisted in a SQLite
+        store would stay "queued" forever after a restart. Jobs that no
+        longer fit in the queue are marked failed.
+
+        Returns:
+            Number of jobs re-enqueued
+        """
+        recovered = 0
+        for job_id in await self.store.unfinished():
+            try:
+                await self.queue.put(job_id)
+            except QueueFull:
+                await self.store.update(job_id, status=FAILED, error="Job queue is full on restart",
+                                        finished_at=time.time())
+                continue
+            await self.store.update(job_id, status=QUEUED, started_at=None)
+            recovered += 1
+        if recovered:
+            logger.info(f"Re-enqueued {recovered} unfinished jobs")
+        return recovered
+
+    def start(self) -> None:
+        """Start the worker tasks on the running loop."""
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work(i)) for i in range(self.workers)]
+        logger.info(f"Job worker pool started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """
+        Cancel workers.
+
+        With a persistent store, in-flight jobs stay "running" and queued
+        jobs stay "queued" so the next process resumes them (``recover``);
+        with the in-memory store in-flight jobs are marked failed.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, worker_id: int) -> None:
+        while True:
+            job_id = await self.queue.get()
+            job = await self.store.get(job_id)
+            if job is None:
+                continue
+
+            self.running += 1
+            await self.store.update(job_id, status=RUNNING, started_at=time.time())
+            try:
+                result = await self.handler(job["request"])
+                await self.store.update(job_id, status=COMPLETED, result=result, finished_at=time.time())
+            except asyncio.CancelledError:
+                if not self.store.persistent:
+                    await self.store.update(job_id, status=FAILED, error="Cancelled on shutdown",
+                                            finished_at=time.time())
+                raise
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                logger.error(f"Job {job_id} failed: {detail}")
+                await self.store.update(job_id, status=FAILED, error=detail, finished_at=time.time())
+            finally:
+                self.running -= 1
@@ -3,17 +3,24 @@ Extraction Agent A2A Service - FastAPI Application.
 
 Wraps the company_research extraction phase as an independent HTTP service
 following the Agent2Agent (A2A) protocol.
+
+Besides the blocking ``tasks/send``, the agent supports the async task
+lifecycle: ``tasks/sendSubscribe`` (SSE progress stream), ``tasks/get``
+and ``tasks/cancel``.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 import logging
-import json
 
 # Import existing extraction logic
 from src.agents.company_research.extraction import extraction_node
 from src.agents.company_research.configuration import Configuration
 from src.agents.company_research.state import ResearchState
+from src.agents.a2a.common.tasks import TaskTable, TaskIdRequest, task_response, sse_format
+from src.agents.a2a.common.metrics import install_metrics
+from src.agents.a2a.common.codec import content_types, data_part, encoded_response, part_payload, read_model
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -25,9 +32,19 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Background tasks for tasks/sendSubscribe, tasks/get and tasks/cancel
+task_table = TaskTable()
+
+SERVICE = "extraction-agent"
+
+# Prometheus metrics on GET /metrics
+install_metrics(app, SERVICE, background_in_flight=task_table.in_flight)
+
 # A2A Protocol Models (reuse from research_agent)
 class MessagePart(BaseModel):
-    text: str
+    type: str = "text"
+    text: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
 
 class Message(BaseModel):
     role: str
@@ -58,7 +75,8 @@ async def get_agent_card():
         "capabilities": [
             "structured_extraction",
             "json_schema_validation",
-            "confidence_scoring"
+            "confidence_scoring",
+            "streaming"
         ],
         "skills": [
             {
@@ -78,6 +96,19 @@ async def get_agent_card():
                         "company_name": {
                             "type": "string",
                             "description": "Company name for context"
+                        },
+                        "extracted_data": {
+                            "type": "object",
+                            "description": "Previous extraction to merge into (follow-up iterations)"
+                        },
+                        "missing_fields": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Fields to re-extract on follow-up iterations"
+                        },
+                        "reflection_count": {
+                            "type": "integer",
+                            "description": "Number of completed iterations"
                         }
                     },
                     "required": ["extraction_schema", "research_notes"]
@@ -93,85 +124,115 @@ async def get_agent_card():
                 }
             }
         ],
+        "contentTypes": content_types(),
         "endpoints": {
             "task": "/tasks/send",
+            "subscribe": "/tasks/sendSubscribe",
+            "get": "/tasks/get",
+            "cancel": "/tasks/cancel",
             "discovery": "/.well-known/agent.json"
         }
     }
 
 
+def parse_task_input(request: TaskRequest) -> Dict[str, Any]:
+    """
+    Parse and validate extraction input from an A2A message.
+
+    Accepts a data part, or a text part holding JSON (older coordinators).
+
+    Raises:
+        HTTPException: If the input is not a JSON object or required
+            fields are missing
+    """
+    if not request.message.parts:
+        raise HTTPException(status_code=400, detail="Message has no parts")
+    try:
+        task_input = part_payload(request.message.parts[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid task input: {str(e)}")
+
+    # Validate required fields
+    if "extraction_schema" not in task_input:
+        raise HTTPException(status_code=400, detail="Missing required field: extraction_schema")
+    if "research_notes" not in task_input:
+        raise HTTPException(status_code=400, detail="Missing required field: research_notes")
+
+    return task_input
+
+
+async def run_extraction(task_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the extraction node for a parsed task input and build the output payload."""
+    # Create state for extraction node
+    state: ResearchState = {
+        "company_name": task_input.get("company_name", "Unknown"),
+        "extraction_schema": task_input["extraction_schema"],
+        "research_notes": task_input["research_notes"],
+        "user_context": task_input.get("user_context", ""),
+        "research_queries": [],
+        "search_results": [],
+        "extracted_data": task_input.get("extracted_data", {}),
+        "missing_fields": task_input.get("missing_fields", []),
+        "reflection_summary": "",
+        "follow_up_needed": False,
+        "follow_up_queries": [],
+        "reflection_count": task_input.get("reflection_count", 0),
+        "messages": []
+    }
+
+    # Create configuration
+    config = Configuration()
+
+    # Execute extraction using existing logic
+    logger.info(f"Executing extraction for {state['company_name']}")
+    result = await extraction_node(state, config)
+
+    return {
+        "extracted_data": result["extracted_data"]
+    }
+
+
 @app.post("/tasks/send", response_model=TaskResponse)
-async def execute_task(request: TaskRequest):
+async def execute_task(http_request: Request):
     """
     Execute an extraction task following A2A protocol.
 
+    The body is a ``TaskRequest`` as JSON or msgpack, optionally gzipped;
+    the response uses the content type from ``Accept`` (see codec.py).
+
     Args:
-        request: A2A task request with extraction parameters
+        http_request: HTTP request carrying the A2A task request
 
     Returns:
         A2A task response with extracted data
     """
-    try:
-        logger.info(f"Received task {request.id}")
-
-        # Parse input from A2A message
-        input_text = request.message.parts[0].text
-        task_input = json.loads(input_text)
-
-        # Validate required fields
-        if "extraction_schema" not in task_input:
-            raise HTTPException(status_code=400, detail="Missing required field: extraction_schema")
-        if "research_notes" not in task_input:
-            raise HTTPException(status_code=400, detail="Missing required field: research_notes")
-
-        # Create state for extraction node
-        state: ResearchState = {
-            "company_name": task_input.get("company_name", "Unknown"),
-            "extraction_schema": task_input["extraction_schema"],
-            "research_notes": task_input["research_notes"],
-            "user_context": task_input.get("user_context", ""),
-            "research_queries": [],
-            "search_results": [],
-            "extracted_data": {},
-            "reflection_summary": "",
-            "follow_up_needed": False,
-            "follow_up_queries": [],
-            "reflection_count": 0,
-            "messages": []
-        }
-
-        # Create configuration
-        config = Configuration()
+    request = await read_model(http_request, TaskRequest, SERVICE)
+    logger.info(f"Received task {request.id}")
 
-        # Execute extraction using existing logic
-        logger.info(f"Executing extraction for {state['company_name']}")
-        result = await extraction_node(state, config)
+    # Parse input from A2A message
+    task_input = parse_task_input(request)
+    company_name = task_input.get("company_name", "Unknown")
 
-        # Format response in A2A format
-        output_json = json.dumps({
-            "extracted_data": result["extracted_data"]
-        })
+    try:
+        output = await run_extraction(task_input)
 
-        return TaskResponse(
+        return encoded_response(http_request, TaskResponse(
             id=request.id,
             status=TaskStatus(
                 state="completed",
-                message=f"Extraction completed for {state['company_name']}"
+                message=f"Extraction completed for {company_name}"
             ),
             messages=[
                 Message(
                     role="assistant",
-                    parts=[MessagePart(text=output_json)]
+                    parts=[MessagePart(**data_part(output))]
                 )
             ]
-        )
+        ), SERVICE)
 
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON input: {e}")
-        raise HTTPException(status_code=400, detail=f"Invalid JSON input: {str(e)}")
     except Exception as e:
         logger.error(f"Task execution failed: {e}", exc_info=True)
-        return TaskResponse(
+        return encoded_response(http_request, TaskResponse(
             id=request.id,
             status=TaskStatus(
                 state="failed",
@@ -183,13 +244,61 @@ async def execute_task(request: TaskRequest):
                     parts=[MessagePart(text=f"Error: {str(e)}")]
                 )
             ]
-        )
+        ), SERVICE)
+
+
+@app.post("/tasks/sendSubscribe")
+async def execute_task_subscribe(http_request: Request):
+    """
+    Start an extraction task and stream its progress as Server-Sent Events.
+
+    Events: ``status`` (state changes; the final one carries the result)
+    and ``extraction_finished``. The task keeps running if the client
+    disconnects and can be polled with ``tasks/get``.
+    """
+    request = await read_model(http_request, TaskRequest, SERVICE)
+    task_input = parse_task_input(request)
+
+    try:
+        record = task_table.start(request.id, lambda: run_extraction(task_input))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    logger.info(f"Started streaming task {request.id}")
+
+    async def event_stream():
+        async for payload in record.subscribe():
+            yield sse_format(payload)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.post("/tasks/get", response_model=TaskResponse)
+async def get_task(request: TaskIdRequest, http_request: Request):
+    """Get the status (and result, once completed) of a task."""
+    record = task_table.get(request.id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Task not found: {request.id}")
+    return encoded_response(http_request, task_response(record), SERVICE)
+
+
+@app.post("/tasks/cancel", response_model=TaskResponse)
+async def cancel_task(request: TaskIdRequest, http_request: Request):
+    """Cancel a running task."""
+    record = await task_table.cancel(request.id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Task not found: {request.id}")
+    return encoded_response(http_request, task_response(record), SERVICE)
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "extraction-agent"}
+    return {
+        "status": "healthy",
+        "service": "extraction-agent",
+        "tasks_in_flight": task_table.in_flight()
+    }
 
 
 if __name__ == "__main__":
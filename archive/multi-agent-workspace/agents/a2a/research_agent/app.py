@@ -3,9 +3,13 @@ Research Agent A2A Service - FastAPI Application.
 
 Wraps the company_research research phase as an independent HTTP service
 following the Agent2Agent (A2A) protocol.
+
+Besides the blocking ``tasks/send``, the agent supports the async task
+lifecycle: ``tasks/sendSubscribe`` (SSE progress stream), ``tasks/get``
+and ``tasks/cancel``.
 """
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 import asyncio
@@ -15,6 +19,10 @@ import logging
 from src.agents.company_research.research import research_node
 from src.agents.company_research.configuration import Configuration
 from src.agents.company_research.state import ResearchState
+from src.agents.company_research.concurrency import EventLoopLagMonitor, shutdown_blocking_executor
+from src.agents.a2a.common.tasks import TaskTable, TaskIdRequest, task_response, sse_format
+from src.agents.a2a.common.metrics import install_metrics
+from src.agents.a2a.common.codec import content_types, data_part, encoded_response, part_payload, read_model
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -26,10 +34,37 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Background tasks for tasks/sendSubscribe, tasks/get and tasks/cancel
+task_table = TaskTable()
+
+# Event loop lag sampling: blocking calls in request handlers show up here
+loop_lag_monitor = EventLoopLagMonitor()
+
+SERVICE = "research-agent"
+
+# Prometheus metrics on GET /metrics
+install_metrics(app, SERVICE, background_in_flight=task_table.in_flight)
+
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    """Start sampling event loop lag."""
+    loop_lag_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    """Stop lag sampling and release the blocking search thread pool."""
+    await loop_lag_monitor.stop()
+    shutdown_blocking_executor()
+
+
 # A2A Protocol Models
 class MessagePart(BaseModel):
-    """Part of an A2A message."""
-    text: str
+    """Part of an A2A message: structured ``data`` or ``text``."""
+    type: str = "text"
+    text: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
 
 class Message(BaseModel):
     """A2A message format."""
@@ -69,7 +104,8 @@ async def get_agent_card():
             "query_generation",
             "web_search",
             "result_deduplication",
-            "research_note_creation"
+            "research_note_creation",
+            "streaming"
         ],
         "skills": [
             {
@@ -94,6 +130,22 @@ async def get_agent_card():
                             "type": "array",
                             "items": {"type": "string"},
                             "description": "Specific follow-up queries from reflection phase"
+                        },
+                        "search_results": {
+                            "type": "array",
+                            "description": "Sources from earlier iterations (only new sources are summarized)"
+                        },
+                        "research_notes": {
+                            "type": "string",
+                            "description": "Notes from earlier iterations (new findings are appended)"
+                        },
+                        "executed_queries": {
+                            "type": "array",
+                            "description": "Queries run in earlier iterations (repeats are skipped)"
+                        },
+                        "reflection_count": {
+                            "type": "integer",
+                            "description": "Number of completed iterations"
                         }
                     },
                     "required": ["company_name", "extraction_schema"]
@@ -113,74 +165,110 @@ async def get_agent_card():
                         "research_notes": {
                             "type": "string",
                             "description": "Structured research notes"
+                        },
+                        "executed_queries": {
+                            "type": "array",
+                            "description": "All queries run so far with result fingerprints"
                         }
                     }
                 }
             }
         ],
+        "contentTypes": content_types(),
         "endpoints": {
             "task": "/tasks/send",
+            "subscribe": "/tasks/sendSubscribe",
+            "get": "/tasks/get",
+            "cancel": "/tasks/cancel",
             "discovery": "/.well-known/agent.json"
         }
     }
 
 
+def parse_task_input(request: TaskRequest) -> Dict[str, Any]:
+    """
+    Parse and validate research input from an A2A message.
+
+    Accepts a data part, or a text part holding JSON (older coordinators).
+
+    Raises:
+        HTTPException: If the input is not a JSON object or required
+            fields are missing
+    """
+    if not request.message.parts:
+        raise HTTPException(status_code=400, detail="Message has no parts")
+    try:
+        task_input = part_payload(request.message.parts[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid task input: {str(e)}")
+
+    # Validate required fields
+    if "company_name" not in task_input:
+        raise HTTPException(status_code=400, detail="Missing required field: company_name")
+    if "extraction_schema" not in task_input:
+        raise HTTPException(status_code=400, detail="Missing required field: extraction_schema")
+
+    return task_input
+
+
+async def run_research(task_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the research node for a parsed task input and build the output payload."""
+    # Create state for research node
+    state: ResearchState = {
+        "company_name": task_input["company_name"],
+        "extraction_schema": task_input["extraction_schema"],
+        "user_context": task_input.get("user_context", ""),
+        "follow_up_queries": task_input.get("follow_up_queries", []),
+        "research_queries": [],
+        "executed_queries": task_input.get("executed_queries", []),
+        "search_results": task_input.get("search_results", []),
+        "research_notes": task_input.get("research_notes", ""),
+        "extracted_data": {},
+        "reflection_summary": "",
+        "follow_up_needed": False,
+        "reflection_count": task_input.get("reflection_count", 0),
+        "messages": []
+    }
+
+    # Create configuration
+    config = Configuration()
+
+    # Execute research using existing logic
+    logger.info(f"Executing research for {task_input['company_name']}")
+    result = await research_node(state, config)
+
+    return {
+        "research_queries": result["research_queries"],
+        "search_results": result["search_results"],
+        "research_notes": result["research_notes"],
+        "executed_queries": result.get("executed_queries", state["executed_queries"])
+    }
+
+
 @app.post("/tasks/send", response_model=TaskResponse)
-async def execute_task(request: TaskRequest):
+async def execute_task(http_request: Request):
     """
     Execute a research task following A2A protocol.
 
+    The body is a ``TaskRequest`` as JSON or msgpack, optionally gzipped;
+    the response uses the content type from ``Accept`` (see codec.py).
+
     Args:
-        request: A2A task request with company research parameters
+        http_request: HTTP request carrying the A2A task request
 
     Returns:
         A2A task response with research results
     """
-    try:
-        logger.info(f"Received task {request.id}")
-
-        # Parse input from A2A message
-        input_text = request.message.parts[0].text
-        import json
-        task_input = json.loads(input_text)
-
-        # Validate required fields
-        if "company_name" not in task_input:
-            raise HTTPException(status_code=400, detail="Missing required field: company_name")
-        if "extraction_schema" not in task_input:
-            raise HTTPException(status_code=400, detail="Missing required field: extraction_schema")
-
-        # Create state for research node
-        state: ResearchState = {
-            "company_name": task_input["company_name"],
-            "extraction_schema": task_input["extraction_schema"],
-            "user_context": task_input.get("user_context", ""),
-            "follow_up_queries": task_input.get("follow_up_queries", []),
-            "research_queries": [],
-            "search_results": [],
-            "research_notes": "",
-            "extracted_data": {},
-            "reflection_summary": "",
-            "follow_up_needed": False,
-            "reflection_count": 0,
-            "messages": []
-        }
-
-        # Create configuration
-        config = Configuration()
+    request = await read_model(http_request, TaskRequest, SERVICE)
+    logger.info(f"Received task {request.id}")
 
-        # Execute research using existing logic
-        logger.info(f"Executing research for {task_input['company_name']}")
-        result = await research_node(state, config)
+    # Parse input from A2A message
+    task_input = parse_task_input(request)
 
-        # Format response in A2A format
-        output_json = json.dumps({
-            "research_queries": result["research_queries"],
-            "search_results": result["search_results"][:10],  # Limit for response size
-            "research_notes": result["research_notes"]
-        })
+    try:
+        output = await run_research(task_input)
 
-        return TaskResponse(
+        return encoded_response(http_request, TaskResponse(
             id=request.id,
             status=TaskStatus(
                 state="completed",
@@ -189,17 +277,14 @@ async def execute_task(request: TaskRequest):
             messages=[
                 Message(
                     role="assistant",
-                    parts=[MessagePart(text=output_json)]
+                    parts=[MessagePart(**data_part(output))]
                 )
             ]
-        )
+        ), SERVICE)
 
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON input: {e}")
-        raise HTTPException(status_code=400, detail=f"Invalid JSON input: {str(e)}")
     except Exception as e:
         logger.error(f"Task execution failed: {e}", exc_info=True)
-        return TaskResponse(
+        return encoded_response(http_request, TaskResponse(
             id=request.id,
             status=TaskStatus(
                 state="failed",
@@ -211,13 +296,63 @@ async def execute_task(request: TaskRequest):
                     parts=[MessagePart(text=f"Error: {str(e)}")]
                 )
             ]
-        )
+        ), SERVICE)
+
+
+@app.post("/tasks/sendSubscribe")
+async def execute_task_subscribe(http_request: Request):
+    """
+    Start a research task and stream its progress as Server-Sent Events.
+
+    Events: ``status`` (state changes; the final one carries the result),
+    ``queries_generated``, ``search_finished`` (one per query) and
+    ``notes_ready``. The task keeps running if the client disconnects and
+    can be polled with ``tasks/get``.
+    """
+    request = await read_model(http_request, TaskRequest, SERVICE)
+    task_input = parse_task_input(request)
+
+    try:
+        record = task_table.start(request.id, lambda: run_research(task_input))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    logger.info(f"Started streaming task {request.id}")
+
+    async def event_stream():
+        async for payload in record.subscribe():
+            yield sse_format(payload)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.post("/tasks/get", response_model=TaskResponse)
+async def get_task(request: TaskIdRequest, http_request: Request):
+    """Get the status (and result, once completed) of a task."""
+    record = task_table.get(request.id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Task not found: {request.id}")
+    return encoded_response(http_request, task_response(record), SERVICE)
+
+
+@app.post("/tasks/cancel", response_model=TaskResponse)
+async def cancel_task(request: TaskIdRequest, http_request: Request):
+    """Cancel a running task."""
+    record = await task_table.cancel(request.id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Task not found: {request.id}")
+    return encoded_response(http_request, task_response(record), SERVICE)
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "research-agent"}
+    return {
+        "status": "healthy",
+        "service": "research-agent",
+        "tasks_in_flight": task_table.in_flight(),
+        "event_loop_lag": loop_lag_monitor.snapshot()
+    }
 
 
 if __name__ == "__main__":
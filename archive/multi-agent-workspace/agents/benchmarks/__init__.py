@@ -0,0 +1,26 @@
+"""
+Offline benchmarks for the research pipeline.
+
+Measures the graph and the A2A coordinator path with fake or recorded
+(cassette) LLM and search services, so performance changes can be
+compared without API keys. Run ``python -m src.agents.benchmarks --help``.
+"""
+from .harness import (
+    patched_services,
+    run_coordinator_benchmark,
+    run_graph_benchmark,
+    summarize,
+    format_report,
+)
+from .cassettes import Cassette, CassetteChatModel, CassetteSearchProvider
+
+__all__ = [
+    "patched_services",
+    "run_coordinator_benchmark",
+    "run_graph_benchmark",
+    "summarize",
+    "format_report",
+    "Cassette",
+    "CassetteChatModel",
+    "CassetteSearchProvider",
+]
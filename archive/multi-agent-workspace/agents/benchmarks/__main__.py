@@ -0,0 +1,207 @@
+"""
+Offline benchmark CLI.
+
+Usage:
+    # Fake services: 0.8s LLM, 0.4s search, one follow-up round per company
+    python -m src.agents.benchmarks -n 20,100 -c 1,5,20 --llm-latency 0.8 --search-latency 0.4 \
+        --fill-rate 0.6 --follow-up-rounds 1
+
+    # Staged pipeline: 10 research workers feeding 3 extraction/reflection workers
+    python -m src.agents.benchmarks --target pipeline -n 50 -c 3 --stage-workers research=10
+
+    # Coordinator path (A2A apps in-process)
+    python -m src.agents.benchmarks --target coordinator -n 50 -c 10
+
+    # Record real responses once, then replay them offline with recorded timing
+    python -m src.agents.benchmarks --record run.json --companies companies.csv -n 5 -c 1
+    python -m src.agents.benchmarks --replay run.json --replay-latency -c 1,5
+"""
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.agents.company_research import research, extraction, reflection
+from src.agents.company_research.batch import iter_companies
+from src.agents.company_research.configuration import Configuration
+from src.agents.company_research.fakes import (
+    FakeSearchProvider,
+    LatencyModel,
+    RecordingChatModel,
+    pipeline_responder,
+)
+from src.agents.company_research.state import DEFAULT_SCHEMA
+from src.agents.benchmarks.cassettes import Cassette, CassetteChatModel, CassetteSearchProvider
+from src.agents.benchmarks.harness import (
+    LLMFactory,
+    SearchFactory,
+    format_report,
+    patched_services,
+    run_coordinator_benchmark,
+    run_graph_benchmark,
+    run_pipeline_benchmark,
+)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _stage_workers(value: str) -> Dict[str, int]:
+    workers = {}
+    for item in value.split(","):
+        if item.strip():
+            stage, _, count = item.partition("=")
+            workers[stage.strip()] = int(count)
+    return workers
+
+
+def fake_services(args: argparse.Namespace, run: int, config: Configuration) -> Tuple[LLMFactory, SearchFactory]:
+    """Fresh fake LLM/search services for one run (seeded per run)."""
+    seed = args.seed + run
+    llm = RecordingChatModel(
+        responses=pipeline_responder(args.follow_up_rounds, args.fill_rate),
+        prefix_cache="none",
+        latency=LatencyModel(args.llm_latency, args.llm_sigma, args.llm_failure_rate, seed)
+    )
+    # One provider for the run, built from the benchmark config (cache settings)
+    search = FakeSearchProvider(
+        config,
+        latency=LatencyModel(args.search_latency, args.search_sigma, args.search_failure_rate, seed),
+        seed=seed
+    )
+    return (lambda stage, _config: llm), (lambda _config: search)
+
+
+def cassette_services(
+    cassette: Cassette,
+    replay_latency: bool,
+    config: Configuration
+) -> Tuple[LLMFactory, SearchFactory]:
+    """Cassette-backed services; in record mode they wrap the real providers."""
+    real_llm = {
+        "research": research.get_llm_for_research,
+        "extraction": extraction.get_llm_for_extraction,
+        "reflection": reflection.get_llm_for_reflection,
+    }
+    search = CassetteSearchProvider(
+        config,
+        cassette,
+        inner=research.get_search_provider(config) if cassette.recording else None,
+        replay_latency=replay_latency
+    )
+
+    def llm_factory(stage: str, stage_config: Configuration) -> CassetteChatModel:
+        inner = real_llm[stage](stage_config) if cassette.recording else None
+        return CassetteChatModel(cassette=cassette, inner=inner, replay_latency=replay_latency)
+
+    return llm_factory, (lambda _config: search)
+
+
+def company_names(args: argparse.Namespace, count: int, run: int, cassette: Optional[Cassette]) -> List[str]:
+    if cassette is not None and not cassette.recording:
+        recorded = cassette.companies
+        return (recorded * (count // len(recorded) + 1))[:count] if recorded else []
+    if args.companies:
+        names = [c["company_name"] for c in iter_companies(args.companies)]
+        return names[:count]
+    # Unique names per run so no cache carries over between runs
+    return [f"벤치마크기업 {run:02d}-{i:04d}" for i in range(count)]
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    schema = DEFAULT_SCHEMA
+    if args.schema:
+        with open(args.schema, encoding="utf-8") as f:
+            schema = json.load(f)
+
+    config = Configuration(
+        search_cache_enabled=args.warm_caches,
+        llm_cache_enabled=args.warm_caches,
+        max_reflection_steps=args.max_iterations
+    )
+
+    cassette = None
+    if args.record:
+        cassette = Cassette(args.record, mode="record")
+    elif args.replay:
+        cassette = Cassette(args.replay, mode="replay")
+
+    targets = ["graph", "coordinator"] if args.target == "both" else [args.target]
+    results = []
+    run_index = 0
+    for target in targets:
+        for count in args.num_companies:
+            for concurrency in args.concurrency:
+                if cassette is not None:
+                    services = cassette_services(cassette, args.replay_latency, config)
+                else:
+                    services = fake_services(args, run_index, config)
+                companies = company_names(args, count, run_index, cassette)
+                if cassette is not None and cassette.recording:
+                    for name in companies:
+                        cassette.add_company(name)
+                run_index += 1
+
+                with patched_services(*services, use_llm_cache=args.warm_caches):
+                    if target == "graph":
+                        result = await run_graph_benchmark(companies, concurrency, config, schema)
+                    elif target == "pipeline":
+                        result = await run_pipeline_benchmark(
+                            companies, concurrency, config, schema, stage_workers=args.stage_workers
+                        )
+                    else:
+                        result = await run_coordinator_benchmark(
+                            companies, concurrency, schema, max_iterations=args.max_iterations
+                        )
+                results.append(result)
+                print(format_report([result]), flush=True)
+
+    if cassette is not None and cassette.recording:
+        cassette.save()
+    return results
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Offline benchmark of the research pipeline")
+    parser.add_argument("--target", choices=["graph", "pipeline", "coordinator", "both"], default="graph")
+    parser.add_argument("-n", "--num-companies", type=_int_list, default=[20], help="Comma-separated N values")
+    parser.add_argument("-c", "--concurrency", type=_int_list, default=[1, 5], help="Comma-separated C values")
+    parser.add_argument("--stage-workers", type=_stage_workers, default={},
+                        help="Pipeline workers per stage, e.g. research=10,extraction=3 (others use C)")
+    parser.add_argument("--companies", help="Companies file (.csv/.jsonl/.txt) instead of synthetic names")
+    parser.add_argument("--schema", help="JSON file with a custom extraction schema")
+    parser.add_argument("--max-iterations", type=int, default=3, help="Max reflection iterations")
+    parser.add_argument("--warm-caches", action="store_true", help="Keep search/LLM caches enabled")
+    parser.add_argument("--seed", type=int, default=0)
+
+    fakes = parser.add_argument_group("fake services")
+    fakes.add_argument("--llm-latency", type=float, default=0.5, help="Median LLM latency (s)")
+    fakes.add_argument("--llm-sigma", type=float, default=0.3, help="Log-normal spread of LLM latency")
+    fakes.add_argument("--llm-failure-rate", type=float, default=0.0)
+    fakes.add_argument("--search-latency", type=float, default=0.3, help="Median search latency (s)")
+    fakes.add_argument("--search-sigma", type=float, default=0.3, help="Log-normal spread of search latency")
+    fakes.add_argument("--search-failure-rate", type=float, default=0.0)
+    fakes.add_argument("--follow-up-rounds", type=int, default=0, help="Reflection rounds asking for more research")
+    fakes.add_argument("--fill-rate", type=float, default=1.0,
+                       help="Share of schema fields the fake extraction fills (below 0.85 triggers reflection)")
+
+    cassettes = parser.add_argument_group("cassettes")
+    cassettes.add_argument("--record", help="Record real LLM/search responses into this cassette")
+    cassettes.add_argument("--replay", help="Replay responses from this cassette")
+    cassettes.add_argument("--replay-latency", action="store_true", help="Sleep for recorded latencies on replay")
+
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    print()
+    print(format_report(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Record/replay cassettes for LLM and search responses.
+
+Record a run once against the real providers, then replay it offline as
+often as needed. Entries are keyed by the exact prompt (LLM) or the
+normalized query (search) and keep the recorded latency, so replays can
+reproduce realistic timing with ``replay_latency=True``.
+
+    cassette = Cassette("run.json", mode="record")
+    llm = CassetteChatModel(cassette=cassette, inner=real_llm)
+    ...
+    cassette.save()
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.agents.company_research.configuration import Configuration
+from src.agents.company_research.search_cache import normalize_query
+from src.agents.company_research.search_providers import SearchProvider
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(KeyError):
+    """A replayed request has no recorded response."""
+
+
+class Cassette:
+    """
+    JSON file of recorded LLM and search responses.
+
+    Args:
+        path: Cassette file
+        mode: ``replay`` (only recorded responses) or ``record`` (call the
+            real provider for misses and store the response)
+    """
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in ("replay", "record"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.data: Dict[str, Any] = {"version": CASSETTE_VERSION, "companies": [], "llm": {}, "search": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.data.update(json.load(f))
+        elif mode == "replay":
+            raise FileNotFoundError(f"Cassette not found: {path}")
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def companies(self) -> List[str]:
+        return list(self.data["companies"])
+
+    def add_company(self, name: str) -> None:
+        with self._lock:
+            if name not in self.data["companies"]:
+                self.data["companies"].append(name)
+
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        return self.data[kind].get(key)
+
+    def put(self, kind: str, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.data[kind][key] = entry
+
+    def save(self) -> None:
+        """Write the cassette atomically."""
+        with self._lock:
+            payload = json.dumps(self.data, ensure_ascii=False, indent=1, default=str)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+
+
+def _message_key(messages: List[BaseMessage]) -> str:
+    rendered = [[message.type, message.content] for message in messages]
+    return hashlib.sha256(
+        json.dumps(rendered, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Chat model answering from a cassette.
+
+    Args:
+        cassette: Cassette to read from / record into
+        inner: Real chat model (required for recording)
+        replay_latency: Sleep for the recorded latency when replaying
+    """
+
+    cassette: Any
+    inner: Any = None
+    replay_latency: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def _lookup(self, messages: List[BaseMessage]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        key = _message_key(messages)
+        entry = self.cassette.get("llm", key)
+        if entry is None and not (self.cassette.recording and self.inner is not None):
+            raise CassetteMiss(f"No recorded LLM response for prompt {key[:12]}")
+        return key, entry
+
+    def _record(self, key: str, response: Any, started: float) -> Dict[str, Any]:
+        entry = {
+            "content": response.content,
+            "usage_metadata": getattr(response, "usage_metadata", None),
+            "elapsed": time.perf_counter() - started
+        }
+        self.cassette.put("llm", key, entry)
+        return entry
+
+    @staticmethod
+    def _result(entry: Dict[str, Any]) -> ChatResult:
+        message = AIMessage(content=entry["content"])
+        if entry.get("usage_metadata"):
+            message.usage_metadata = entry["usage_metadata"]
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        key, entry = self._lookup(messages)
+        if entry is None:
+            started = time.perf_counter()
+            entry = self._record(key, self.inner.invoke(messages), started)
+        elif self.replay_latency:
+            time.sleep(entry.get("elapsed", 0.0))
+        return self._result(entry)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        key, entry = self._lookup(messages)
+        if entry is None:
+            started = time.perf_counter()
+            entry = self._record(key, await self.inner.ainvoke(messages), started)
+        elif self.replay_latency:
+            await asyncio.sleep(entry.get("elapsed", 0.0))
+        return self._result(entry)
+
+
+class CassetteSearchProvider(SearchProvider):
+    """
+    Search provider answering from a cassette.
+
+    Args:
+        config: Agent configuration
+        cassette: Cassette to read from / record into
+        inner: Real search provider (required for recording)
+        replay_latency: Sleep for the recorded latency when replaying
+    """
+
+    name = "cassette"
+    label = "Cassette search"
+
+    def __init__(
+        self,
+        config: Configuration,
+        cassette: Cassette,
+        inner: Optional[SearchProvider] = None,
+        replay_latency: bool = False
+    ):
+        super().__init__(config)
+        self.cassette = cassette
+        self.inner = inner
+        self.replay_latency = replay_latency
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        key = f"{normalize_query(query)}|{self.max_results}"
+        entry = self.cassette.get("search", key)
+
+        if entry is None:
+            if not (self.cassette.recording and self.inner is not None):
+                raise CassetteMiss(f"No recorded search results for query '{query}'")
+            started = time.perf_counter()
+            results = await self.inner.search(query)
+            entry = {"results": results, "elapsed": time.perf_counter() - started}
+            self.cassette.put("search", key, entry)
+        elif self.replay_latency:
+            await asyncio.sleep(entry.get("elapsed", 0.0))
+
+        return entry["results"]
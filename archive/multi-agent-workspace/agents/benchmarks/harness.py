@@ -0,0 +1,286 @@
+"""
+Benchmark harness for the research pipeline.
+
+Runs N companies with C in flight through either
+
+- ``graph``: ``build_research_graph`` in-process,
+- ``pipeline``: the staged pipeline (per-stage worker pools, see
+  company_research/pipeline.py) in-process, or
+- ``coordinator``: the A2A coordinator's ``POST /research``, with the
+  research/extraction agents mounted in-process over ASGI transports,
+
+against injected LLM and search services (fakes or cassettes), and reports
+end-to-end latency percentiles, throughput and per-node (or per-agent)
+latency.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import httpx
+
+from src.agents.company_research import research, extraction, reflection, llm_cache
+from src.agents.company_research.batch import initial_state
+from src.agents.company_research.concurrency import gather_bounded
+from src.agents.company_research.configuration import Configuration
+from src.agents.company_research.graph import build_research_graph
+from src.agents.company_research.pipeline import PipelineItem, StagePipeline, next_stage, research_stages
+from src.agents.company_research.search_providers import SearchProvider
+
+LLMFactory = Callable[[str, Configuration], Any]
+SearchFactory = Callable[[Configuration], SearchProvider]
+
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, min(len(sorted_samples), round(q / 100 * len(sorted_samples) + 0.5)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Count, mean, p50/p95/p99 and max of latency samples (seconds)."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0
+    }
+
+
+@contextmanager
+def patched_services(
+    llm_factory: LLMFactory,
+    search_factory: SearchFactory,
+    use_llm_cache: bool = False
+) -> Iterator[None]:
+    """
+    Route the nodes' LLM and search factories to benchmark services.
+
+    Args:
+        llm_factory: Called with the stage (research/extraction/reflection)
+            and the node's configuration
+        search_factory: Called with the node's configuration
+        use_llm_cache: Keep the process-wide LLM output cache (off by
+            default so repeated runs measure real work)
+    """
+    originals = [
+        (research, "get_llm_for_research", lambda config: llm_factory("research", config)),
+        (extraction, "get_llm_for_extraction", lambda config: llm_factory("extraction", config)),
+        (reflection, "get_llm_for_reflection", lambda config: llm_factory("reflection", config)),
+        (research, "get_search_provider", lambda config, name=None: search_factory(config)),
+    ]
+    if not use_llm_cache:
+        originals.append((llm_cache, "get_llm_cache", lambda config: None))
+
+    saved = [(module, name, getattr(module, name)) for module, name, _ in originals]
+    try:
+        for module, name, replacement in originals:
+            setattr(module, name, replacement)
+        yield
+    finally:
+        for module, name, original in saved:
+            setattr(module, name, original)
+
+
+def _result(target: str, companies: int, concurrency: int, latencies: List[float],
+            failures: int, wall: float, breakdown: Dict[str, List[float]]) -> Dict[str, Any]:
+    return {
+        "target": target,
+        "companies": companies,
+        "concurrency": concurrency,
+        "completed": len(latencies),
+        "failed": failures,
+        "wall_seconds": wall,
+        "companies_per_minute": len(latencies) / wall * 60 if wall else 0.0,
+        "latency": summarize(latencies),
+        "breakdown": {name: summarize(samples) for name, samples in breakdown.items()}
+    }
+
+
+async def run_graph_benchmark(
+    companies: List[str],
+    concurrency: int,
+    config: Configuration,
+    schema: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Benchmark ``build_research_graph`` with C companies in flight.
+
+    Node latency is the time between consecutive node updates of one
+    company's graph stream.
+
+    Returns:
+        Result dict (latency percentiles, throughput, per-node breakdown)
+    """
+    graph = build_research_graph(config)
+    latencies: List[float] = []
+    nodes: Dict[str, List[float]] = {}
+    failures = 0
+
+    async def run_one(name: str) -> None:
+        started = last = time.perf_counter()
+        async for update in graph.astream(initial_state(name, schema), stream_mode="updates"):
+            now = time.perf_counter()
+            for node in update:
+                nodes.setdefault(node, []).append(now - last)
+            last = now
+        latencies.append(time.perf_counter() - started)
+
+    def report(name: str, error: BaseException) -> None:
+        nonlocal failures
+        failures += 1
+
+    started = time.perf_counter()
+    await gather_bounded(companies, run_one, limit=concurrency, on_error=report)
+    return _result("graph", len(companies), concurrency, latencies, failures,
+                   time.perf_counter() - started, nodes)
+
+
+async def run_pipeline_benchmark(
+    companies: List[str],
+    concurrency: int,
+    config: Configuration,
+    schema: Dict[str, Any],
+    stage_workers: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Benchmark the staged pipeline.
+
+    Each stage gets ``stage_workers[stage]`` workers (default C). The
+    breakdown is the time each company spent running in each stage
+    (queueing excluded).
+
+    Returns:
+        Result dict (latency percentiles, throughput, per-stage breakdown)
+    """
+    stage_workers = stage_workers or {}
+    stages = research_stages(
+        config,
+        research_workers=stage_workers.get("research", concurrency),
+        extraction_workers=stage_workers.get("extraction", concurrency),
+        reflection_workers=stage_workers.get("reflection", concurrency)
+    )
+    latencies: List[float] = []
+    breakdown: Dict[str, List[float]] = {}
+    failures = 0
+
+    async def record(item: PipelineItem) -> None:
+        nonlocal failures
+        if item.error is not None:
+            failures += 1
+            return
+        latencies.append(time.monotonic() - item.started)
+        for stage, seconds in item.stage_seconds.items():
+            breakdown.setdefault(stage, []).append(seconds)
+
+    async def items():
+        for name in companies:
+            yield PipelineItem(name, initial_state(name, schema))
+
+    started = time.perf_counter()
+    await StagePipeline(stages, next_stage, record).run(items())
+    return _result("pipeline", len(companies), concurrency, latencies, failures,
+                   time.perf_counter() - started, breakdown)
+
+
+class TimedTransport(httpx.ASGITransport):
+    """In-process ASGI transport that records request latency."""
+
+    def __init__(self, app: Any, samples: List[float]):
+        super().__init__(app=app)
+        self.samples = samples
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.samples.append(time.perf_counter() - started)
+
+
+async def run_coordinator_benchmark(
+    companies: List[str],
+    concurrency: int,
+    schema: Dict[str, Any],
+    max_iterations: int = 3
+) -> Dict[str, Any]:
+    """
+    Benchmark the A2A coordinator path in-process.
+
+    The coordinator's agent client pool is pointed at the research and
+    extraction apps through ASGI transports, so the full HTTP/JSON path
+    runs without sockets. Breakdown is per downstream agent call.
+
+    Returns:
+        Result dict (latency percentiles, throughput, per-agent breakdown)
+    """
+    from src.agents.a2a.coordinator import app as coordinator
+    from src.agents.a2a.research_agent.app import app as research_app
+    from src.agents.a2a.extraction_agent.app import app as extraction_app
+
+    agents: Dict[str, List[float]] = {"research_agent": [], "extraction_agent": []}
+    pool = coordinator.agent_clients
+    await pool.close()
+    for url in coordinator.research_agents.urls:
+        pool.transports[url] = TimedTransport(research_app, agents["research_agent"])
+    for url in coordinator.extraction_agents.urls:
+        pool.transports[url] = TimedTransport(extraction_app, agents["extraction_agent"])
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=coordinator.app),
+        base_url="http://coordinator",
+        timeout=None
+    )
+    latencies: List[float] = []
+    failures = 0
+
+    async def run_one(name: str) -> None:
+        started = time.perf_counter()
+        response = await client.post("/research", json={
+            "company_name": name,
+            "extraction_schema": schema,
+            "max_iterations": max_iterations
+        })
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+    def report(name: str, error: BaseException) -> None:
+        nonlocal failures
+        failures += 1
+
+    started = time.perf_counter()
+    try:
+        await gather_bounded(companies, run_one, limit=concurrency, on_error=report)
+    finally:
+        await client.aclose()
+        await pool.close()
+        pool.transports.clear()
+    return _result("coordinator", len(companies), concurrency, latencies, failures,
+                   time.perf_counter() - started, agents)
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    """Render results as a plain-text table (latencies in seconds)."""
+    lines = [
+        f"{'target':<12}{'N':>6}{'C':>5}{'ok':>6}{'fail':>6}{'wall':>9}{'co/min':>9}"
+        f"{'p50':>8}{'p95':>8}{'p99':>8}"
+    ]
+    for result in results:
+        latency = result["latency"]
+        lines.append(
+            f"{result['target']:<12}{result['companies']:>6}{result['concurrency']:>5}"
+            f"{result['completed']:>6}{result['failed']:>6}{result['wall_seconds']:>9.2f}"
+            f"{result['companies_per_minute']:>9.1f}{latency['p50']:>8.3f}{latency['p95']:>8.3f}"
+            f"{latency['p99']:>8.3f}"
+        )
+        for name, stats in result["breakdown"].items():
+            lines.append(
+                f"  {name:<22}n={stats['count']:<6} p50={stats['p50']:.3f} "
+                f"p95={stats['p95']:.3f} p99={stats['p99']:.3f}"
+            )
+    return "\n".join(lines)
@@ -4,10 +4,15 @@ Company Deep Research Agent
 from .configuration import Configuration
 from .state import ResearchState, DEFAULT_SCHEMA
 from .graph import build_research_graph
+from .batch import research_companies
+from .schema import CompiledSchema, compile_schema
 
 __all__ = [
     "Configuration",
     "ResearchState",
     "DEFAULT_SCHEMA",
     "build_research_graph",
+    "research_companies",
+    "CompiledSchema",
+    "compile_schema",
 ]
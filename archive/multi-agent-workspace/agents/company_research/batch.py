@@ -0,0 +1,445 @@
+"""
+Bulk company research runner.
+
+Streams company names from CSV/JSONL/text, runs the compiled research graph
+with a bounded number of companies in flight, and appends one JSON line per
+company to the output file. Companies already completed in the output file
+are skipped on restart, so interrupted runs resume where they stopped.
+With ``--checkpoint``, companies that were in flight when the run stopped
+also resume from their last finished graph node.
+
+With ``--pipeline``, research, extraction and reflection get separate
+worker pools connected by bounded queues (see pipeline.py), so company B's
+research overlaps company A's extraction and each stage is sized on its own.
+
+Usage:
+    python -m src.agents.company_research.batch companies.csv -o results.jsonl -c 10
+    python -m src.agents.company_research.batch companies.csv --checkpoint checkpoints.db --run-id 2025-q1
+    python -m src.agents.company_research.batch companies.csv --pipeline --research-workers 10 --extraction-workers 4
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Set, Union
+
+from .configuration import Configuration
+from .state import ResearchState, DEFAULT_SCHEMA
+from .graph import build_research_graph
+from .prompt_layout import get_prompt_cache_stats
+from .checkpoint import sqlite_checkpointer, thread_id_for, run_with_checkpoint, delete_thread
+from .pipeline import PipelineItem, StagePipeline, next_stage, research_stages
+
+
+CompanyInput = Union[str, Dict[str, Any]]
+
+
+def initial_state(
+    company_name: str,
+    schema: Dict[str, Any],
+    user_context: str = ""
+) -> ResearchState:
+    """Build the initial graph state for one company."""
+    return {
+        "company_name": company_name,
+        "extraction_schema": schema,
+        "user_context": user_context,
+        "research_queries": [],
+        "executed_queries": [],
+        "search_results": [],
+        "research_notes": "",
+        "extracted_data": {},
+        "reflection_count": 0,
+        "missing_fields": [],
+        "follow_up_queries": [],
+        "is_complete": False,
+        "messages": []
+    }
+
+
+def iter_companies(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream company records from a file without loading it into memory.
+
+    Supported formats (by extension):
+    - .csv: ``company_name`` (or ``name``) column, optional ``user_context``
+    - .jsonl: objects with ``company_name`` (or ``name``), or plain strings
+    - anything else: one company name per line
+
+    Yields:
+        Dicts with ``company_name`` and ``user_context``
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    with open(path, encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            for row in csv.DictReader(f):
+                name = (row.get("company_name") or row.get("name") or "").strip()
+                if name:
+                    yield {"company_name": name, "user_context": row.get("user_context") or ""}
+        elif extension in (".jsonl", ".ndjson"):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record, str):
+                    record = {"company_name": record}
+                name = (record.get("company_name") or record.get("name") or "").strip()
+                if name:
+                    yield {"company_name": name, "user_context": record.get("user_context") or ""}
+        else:
+            for line in f:
+                name = line.strip()
+                if name:
+                    yield {"company_name": name, "user_context": ""}
+
+
+def result_record(company_name: str, final_state: ResearchState) -> Dict[str, Any]:
+    """Output line for a company that finished the workflow."""
+    return {
+        "company_name": company_name,
+        "status": "completed",
+        "extracted_data": final_state.get("extracted_data", {}),
+        "missing_fields": final_state.get("missing_fields", []),
+        "reflection_count": final_state.get("reflection_count", 0),
+        "search_result_count": len(final_state.get("search_results", []))
+    }
+
+
+def load_completed(output_path: str) -> Set[str]:
+    """Company names already completed in an existing output file."""
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Truncated last line from a crash
+            if record.get("status") == "completed":
+                completed.add(record["company_name"])
+    return completed
+
+
+class ProgressTracker:
+    """Counts finished companies and prints throughput periodically."""
+
+    def __init__(self, report_every: float = 10.0, enabled: bool = True):
+        self.report_every = report_every
+        self.enabled = enabled
+        # Optional extra status appended to progress lines (e.g. pipeline stages)
+        self.detail: Optional[Callable[[], str]] = None
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def record(self, status: str) -> None:
+        if status == "completed":
+            self.completed += 1
+        elif status == "skipped":
+            self.skipped += 1
+        else:
+            self.failed += 1
+
+        now = time.monotonic()
+        if self.enabled and now - self.last_report >= self.report_every:
+            self.last_report = now
+            print(self.summary())
+
+    def summary(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        done = self.completed + self.failed
+        summary = (
+            f"[batch] completed={self.completed} failed={self.failed} skipped={self.skipped} "
+            f"elapsed={elapsed:.0f}s throughput={done / elapsed * 60:.1f} companies/min"
+        )
+        if self.detail is not None:
+            summary += f" {self.detail()}"
+        return summary
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(elapsed, 2),
+            "companies_per_minute": round((self.completed + self.failed) / elapsed * 60, 2) if elapsed else 0.0
+        }
+
+
+async def _aiter(companies: Union[Iterable[CompanyInput], AsyncIterator[CompanyInput]]) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(companies, "__aiter__"):
+        async for company in companies:
+            yield company if isinstance(company, dict) else {"company_name": company}
+    else:
+        for company in companies:
+            yield company if isinstance(company, dict) else {"company_name": company}
+
+
+async def research_companies(
+    companies: Union[Iterable[CompanyInput], AsyncIterator[CompanyInput]],
+    output_path: str,
+    config: Optional[Configuration] = None,
+    schema: Optional[Dict[str, Any]] = None,
+    concurrency: int = 5,
+    resume: bool = True,
+    progress: bool = True,
+    checkpoint_path: Optional[str] = None,
+    run_id: Optional[str] = None,
+    stage_workers: Optional[Dict[str, int]] = None,
+    stage_queue_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Research many companies with bounded concurrency.
+
+    The graph is compiled once and shared by all workers. Input is consumed
+    lazily through a small bounded queue, and every result is appended to
+    ``output_path`` as soon as it finishes.
+
+    Args:
+        companies: Company names or dicts with ``company_name``/``user_context``
+        output_path: JSONL file to append results to
+        config: Agent configuration (defaults to Configuration())
+        schema: Extraction schema (defaults to DEFAULT_SCHEMA)
+        concurrency: Number of companies in flight
+        resume: Skip companies already completed in ``output_path``
+        progress: Print periodic progress/throughput lines
+        checkpoint_path: SQLite file for per-node checkpoints; companies
+            interrupted mid-run resume from their last finished node
+        run_id: Checkpoint namespace, so separate runs don't share threads
+        stage_workers: Run as a staged pipeline with these workers per
+            stage (``research``/``extraction``/``reflection``; missing
+            stages get ``concurrency``) instead of whole-graph workers
+        stage_queue_size: Queue capacity per pipeline stage (default twice
+            its workers)
+
+    Returns:
+        Run statistics (completed, failed, skipped, throughput)
+
+    Raises:
+        ValueError: If ``stage_workers`` is combined with ``checkpoint_path``
+    """
+    config = config or Configuration()
+    schema = schema or DEFAULT_SCHEMA
+    if stage_workers is not None:
+        if checkpoint_path:
+            raise ValueError("Checkpoints are per graph node; they cannot be combined with the stage pipeline")
+        return await _research_companies_pipelined(
+            companies, output_path, config, schema, concurrency, resume, progress,
+            stage_workers, stage_queue_size
+        )
+    if checkpoint_path:
+        async with sqlite_checkpointer(checkpoint_path) as checkpointer:
+            return await _research_companies(
+                companies, output_path, config, schema, concurrency, resume, progress, checkpointer, run_id
+            )
+    return await _research_companies(
+        companies, output_path, config, schema, concurrency, resume, progress, None, run_id
+    )
+
+
+async def _research_companies(
+    companies: Union[Iterable[CompanyInput], AsyncIterator[CompanyInput]],
+    output_path: str,
+    config: Configuration,
+    schema: Dict[str, Any],
+    concurrency: int,
+    resume: bool,
+    progress: bool,
+    checkpointer: Optional[Any],
+    run_id: Optional[str]
+) -> Dict[str, Any]:
+    graph = build_research_graph(config, checkpointer=checkpointer)
+    completed = load_completed(output_path) if resume else set()
+    tracker = ProgressTracker(enabled=progress)
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    output = open(output_path, "a", encoding="utf-8")
+
+    async def producer() -> None:
+        async for company in _aiter(companies):
+            if company["company_name"] in completed:
+                tracker.record("skipped")
+                continue
+            await queue.put(company)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker() -> None:
+        while True:
+            company = await queue.get()
+            if company is None:
+                return
+
+            name = company["company_name"]
+            started = time.monotonic()
+            state = initial_state(name, schema, company.get("user_context") or "")
+            thread_id = thread_id_for(name, run_id)
+            try:
+                if checkpointer is not None:
+                    final_state = await run_with_checkpoint(graph, state, thread_id)
+                else:
+                    final_state = await graph.ainvoke(state)
+                record = result_record(name, final_state)
+            except Exception as e:
+                print(f"[batch] {name} failed: {e}")
+                record = {"company_name": name, "status": "failed", "error": str(e)}
+
+            record["elapsed_seconds"] = round(time.monotonic() - started, 3)
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            tracker.record(record["status"])
+
+            # The output line now holds the result; checkpoints are no longer needed
+            if checkpointer is not None and record["status"] == "completed":
+                await delete_thread(checkpointer, thread_id)
+
+    try:
+        await asyncio.gather(producer(), *(worker() for _ in range(concurrency)))
+    finally:
+        output.close()
+
+    if progress:
+        print(tracker.summary())
+    return tracker.as_dict()
+
+
+async def _research_companies_pipelined(
+    companies: Union[Iterable[CompanyInput], AsyncIterator[CompanyInput]],
+    output_path: str,
+    config: Configuration,
+    schema: Dict[str, Any],
+    concurrency: int,
+    resume: bool,
+    progress: bool,
+    stage_workers: Dict[str, int],
+    stage_queue_size: Optional[int]
+) -> Dict[str, Any]:
+    completed = load_completed(output_path) if resume else set()
+    tracker = ProgressTracker(enabled=progress)
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    output = open(output_path, "a", encoding="utf-8")
+
+    async def admit() -> AsyncIterator[PipelineItem]:
+        async for company in _aiter(companies):
+            name = company["company_name"]
+            if name in completed:
+                tracker.record("skipped")
+                continue
+            yield PipelineItem(name, initial_state(name, schema, company.get("user_context") or ""))
+
+    async def write(item: PipelineItem) -> None:
+        if item.error is None:
+            record = result_record(item.key, item.state)
+        else:
+            print(f"[batch] {item.key} failed: {item.error}")
+            record = {"company_name": item.key, "status": "failed", "error": item.error}
+
+        record["elapsed_seconds"] = round(time.monotonic() - item.started, 3)
+        record["stage_seconds"] = {stage: round(seconds, 3) for stage, seconds in item.stage_seconds.items()}
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+        tracker.record(record["status"])
+
+    stages = research_stages(
+        config,
+        research_workers=stage_workers.get("research", concurrency),
+        extraction_workers=stage_workers.get("extraction", concurrency),
+        reflection_workers=stage_workers.get("reflection", concurrency),
+        queue_size=stage_queue_size
+    )
+    pipeline = StagePipeline(stages, next_stage, write)
+    tracker.detail = pipeline.describe
+
+    try:
+        await pipeline.run(admit())
+    finally:
+        output.close()
+
+    if progress:
+        print(tracker.summary())
+    stats = tracker.as_dict()
+    stats["stages"] = {stage.name: stage.workers for stage in stages}
+    return stats
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Research many companies into a JSONL file")
+    parser.add_argument("input", help="Companies file (.csv, .jsonl, or one name per line)")
+    parser.add_argument("-o", "--output", default="research_results.jsonl", help="Output JSONL path")
+    parser.add_argument("-c", "--concurrency", type=int, default=5, help="Companies in flight")
+    parser.add_argument("--schema", help="JSON file with a custom extraction schema")
+    parser.add_argument("--search-provider", help="Override Configuration.search_provider")
+    parser.add_argument("--no-resume", action="store_true", help="Re-run companies already in the output")
+    parser.add_argument("--checkpoint", help="SQLite file for per-node checkpoints (resume mid-company)")
+    parser.add_argument("--run-id", help="Checkpoint namespace for this run")
+    parser.add_argument("--llm-rpm", type=float, help="LLM requests per minute across all companies")
+    parser.add_argument("--llm-tpm", type=float, help="LLM tokens per minute across all companies")
+    parser.add_argument("--search-rpm", type=float, help="Search requests per minute (default: provider limit)")
+    pipeline = parser.add_argument_group("stage pipeline")
+    pipeline.add_argument("--pipeline", action="store_true",
+                          help="Separate worker pools per stage instead of whole-graph workers")
+    pipeline.add_argument("--research-workers", type=int, help="Research workers (default: -c)")
+    pipeline.add_argument("--extraction-workers", type=int, help="Extraction workers (default: -c)")
+    pipeline.add_argument("--reflection-workers", type=int, help="Reflection workers (default: -c)")
+    pipeline.add_argument("--stage-queue", type=int, help="Queue capacity per stage (default: 2x its workers)")
+    args = parser.parse_args(argv)
+    if args.pipeline and args.checkpoint:
+        parser.error("--checkpoint cannot be combined with --pipeline")
+
+    schema = None
+    if args.schema:
+        with open(args.schema, encoding="utf-8") as f:
+            schema = json.load(f)
+
+    overrides = {
+        "search_provider": args.search_provider,
+        "llm_requests_per_minute": args.llm_rpm,
+        "llm_tokens_per_minute": args.llm_tpm,
+        "search_requests_per_minute": args.search_rpm,
+    }
+    config = Configuration(**{name: value for name, value in overrides.items() if value is not None})
+
+    stage_workers = None
+    if args.pipeline:
+        stage_workers = {
+            "research": args.research_workers,
+            "extraction": args.extraction_workers,
+            "reflection": args.reflection_workers,
+        }
+        stage_workers = {stage: workers for stage, workers in stage_workers.items() if workers}
+
+    stats = asyncio.run(research_companies(
+        iter_companies(args.input),
+        args.output,
+        config=config,
+        schema=schema,
+        concurrency=args.concurrency,
+        resume=not args.no_resume,
+        checkpoint_path=args.checkpoint,
+        run_id=args.run_id,
+        stage_workers=stage_workers,
+        stage_queue_size=args.stage_queue
+    ))
+    stats["llm_usage"] = get_prompt_cache_stats().snapshot()
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Durable checkpointing for research runs.
+
+With a checkpointer, LangGraph saves the state after every finished node
+(research → extract → reflect → ...). A run that crashes, or a worker that
+is redeployed, resumes from the last finished node instead of repeating the
+searches and LLM calls already paid for.
+
+Checkpoints are stored in a local SQLite file (``langgraph-checkpoint-sqlite``
+and ``aiosqlite``, both in requirements.txt) under one thread per company
+and run. ``search_results`` make states large, so checkpoint payloads above a
+small size are zlib-compressed.
+
+Usage:
+    async with sqlite_checkpointer("checkpoints.db") as checkpointer:
+        graph = build_research_graph(config, checkpointer=checkpointer)
+        final_state = await run_with_checkpoint(graph, state, thread_id_for("Acme"))
+"""
+import re
+import zlib
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# Payloads smaller than this are stored uncompressed
+COMPRESS_MIN_BYTES = 1024
+_ZLIB_SUFFIX = "+zlib"
+
+
+class CompactSerializer:
+    """
+    Checkpoint serializer that zlib-compresses large payloads.
+
+    Wraps LangGraph's default serializer; the compression is recorded in the
+    type tag, so uncompressed checkpoints written earlier still load.
+    """
+
+    def __init__(self, inner: Optional[Any] = None, level: int = 6, min_bytes: int = COMPRESS_MIN_BYTES):
+        self.inner = inner or JsonPlusSerializer()
+        self.level = level
+        self.min_bytes = min_bytes
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) >= self.min_bytes:
+            return type_ + _ZLIB_SUFFIX, zlib.compress(data, self.level)
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(_ZLIB_SUFFIX):
+            type_, payload = type_[:-len(_ZLIB_SUFFIX)], zlib.decompress(payload)
+        return self.inner.loads_typed((type_, payload))
+
+
+@asynccontextmanager
+async def sqlite_checkpointer(path: str) -> AsyncIterator[Any]:
+    """
+    Open an async SQLite checkpointer with the compact serializer.
+
+    Args:
+        path: SQLite database file
+
+    Yields:
+        AsyncSqliteSaver ready to pass to ``build_research_graph``
+    """
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+        raise ImportError(
+            "SQLite checkpointing requires langgraph-checkpoint-sqlite and aiosqlite. "
+            "Install them with: pip install langgraph-checkpoint-sqlite aiosqlite"
+        ) from e
+
+    conn = await aiosqlite.connect(path)
+    try:
+        await conn.execute("PRAGMA journal_mode=WAL")
+        checkpointer = AsyncSqliteSaver(conn, serde=CompactSerializer())
+        await checkpointer.setup()
+        yield checkpointer
+    finally:
+        await conn.close()
+
+
+def thread_id_for(company_name: str, run_id: Optional[str] = None) -> str:
+    """
+    Checkpoint thread id for one company in one run.
+
+    The name is normalized (case, whitespace) so re-submitting a company
+    with different spacing resumes the same thread.
+    """
+    name = re.sub(r"\s+", " ", company_name).strip().casefold()
+    return f"{run_id or 'default'}:{name}"
+
+
+def thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+async def run_with_checkpoint(graph: Any, state: Dict[str, Any], thread_id: str) -> Dict[str, Any]:
+    """
+    Run the graph for one thread, resuming an interrupted run.
+
+    - No checkpoint: start from ``state``
+    - Unfinished checkpoint: continue from the last finished node
+    - Finished checkpoint: return the saved final state
+
+    Args:
+        graph: Graph compiled with a checkpointer
+        state: Initial state (used only for new threads)
+        thread_id: Thread id from ``thread_id_for``
+
+    Returns:
+        Final state
+    """
+    config = thread_config(thread_id)
+    snapshot = await graph.aget_state(config)
+
+    if snapshot.values:
+        if snapshot.next:
+            return await graph.ainvoke(None, config)
+        return snapshot.values
+    return await graph.ainvoke(state, config)
+
+
+async def delete_thread(checkpointer: Any, thread_id: str) -> None:
+    """Drop a thread's checkpoints (no-op for savers without deletion)."""
+    delete = getattr(checkpointer, "adelete_thread", None)
+    if delete is not None:
+        await delete(thread_id)
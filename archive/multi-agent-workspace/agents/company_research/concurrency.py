@@ -0,0 +1,218 @@
+"""
+Concurrency helpers for the research agent.
+
+Search providers are I/O bound, so queries for one company are fanned out
+concurrently instead of being awaited one after another.
+
+Blocking SDK calls (SerpAPI, Bing, DuckDuckGo, Brave wrappers) run on a
+dedicated bounded thread pool so they never stall the event loop.
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class EarlyStop:
+    """
+    Stop condition shared by one or more ``gather_bounded`` calls.
+
+    ``should_stop`` is called with each finished item and its result until
+    it first returns True. From then on, items that have not started yet
+    in any gather using this object are skipped and counted in
+    ``skipped``. Items already in flight are left to finish (their work is
+    paid for and e.g. cached) but their results are dropped.
+
+    Args:
+        should_stop: Callback receiving an item and its result
+    """
+
+    def __init__(self, should_stop: Callable[[Any, Any], bool]):
+        self.should_stop = should_stop
+        self.stopped = False
+        self.skipped = 0
+
+    def check(self, item: Any, result: Any) -> bool:
+        """Evaluate ``should_stop`` unless already stopped; True when this call stopped."""
+        if self.stopped or not self.should_stop(item, result):
+            return False
+        self.stopped = True
+        return True
+
+
+async def gather_bounded(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[R]],
+    limit: int,
+    timeout: Optional[float] = None,
+    on_error: Optional[Callable[[T, BaseException], Any]] = None,
+    stop: Optional[EarlyStop] = None,
+) -> List[Optional[R]]:
+    """
+    Run ``worker`` over ``items`` concurrently with a concurrency limit.
+
+    Results are returned in the same order as ``items`` regardless of
+    completion order, so downstream steps (e.g. deduplication) stay
+    deterministic. A failed or timed-out item yields ``None`` and is
+    reported through ``on_error`` instead of cancelling its siblings.
+
+    Args:
+        items: Inputs to process (e.g. search queries)
+        worker: Coroutine function called once per item
+        limit: Maximum number of workers in flight at the same time
+        timeout: Per-item timeout in seconds (None disables it)
+        on_error: Optional callback receiving the item and the exception
+        stop: Optional shared stop condition checked as items complete;
+            once it triggers, items not started yet are skipped (counted
+            in ``stop.skipped``) and items finishing afterwards are
+            dropped; both yield ``None``
+
+    Returns:
+        List of results aligned with ``items``
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: T) -> Optional[R]:
+        async with semaphore:
+            if stop is not None and stop.stopped:
+                stop.skipped += 1
+                return None
+            try:
+                if timeout is None:
+                    result = await worker(item)
+                else:
+                    result = await asyncio.wait_for(worker(item), timeout=timeout)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                if on_error is not None:
+                    on_error(item, TimeoutError(f"timed out after {timeout}s"))
+                return None
+            except Exception as e:
+                if on_error is not None:
+                    on_error(item, e)
+                return None
+
+            if stop is not None:
+                if stop.stopped:
+                    # Finished after the stop (possibly in another gather)
+                    return None
+                stop.check(item, result)
+            return result
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+# Size of the thread pool used for synchronous search SDKs
+BLOCKING_POOL_SIZE = int(os.getenv("SEARCH_THREAD_POOL_SIZE", "16"))
+
+_blocking_executor: Optional[ThreadPoolExecutor] = None
+_blocking_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """
+    Get the process-wide thread pool for blocking search calls.
+
+    The pool is created lazily and kept separate from the loop's default
+    executor so slow providers cannot starve other ``to_thread`` users.
+    """
+    global _blocking_executor
+    if _blocking_executor is None:
+        with _blocking_lock:
+            if _blocking_executor is None:
+                _blocking_executor = ThreadPoolExecutor(
+                    max_workers=BLOCKING_POOL_SIZE,
+                    thread_name_prefix="search-sync"
+                )
+    return _blocking_executor
+
+
+def shutdown_blocking_executor(wait: bool = False) -> None:
+    """Shut down the blocking-call thread pool (e.g. on service shutdown)."""
+    global _blocking_executor
+    with _blocking_lock:
+        if _blocking_executor is not None:
+            _blocking_executor.shutdown(wait=wait, cancel_futures=True)
+            _blocking_executor = None
+
+
+async def run_blocking(func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """
+    Run a synchronous function on the blocking-call thread pool.
+
+    Note that a timeout on the awaiting side does not interrupt the
+    worker thread; the call finishes in the background and its result is
+    discarded.
+
+    Args:
+        func: Synchronous callable (e.g. ``ddg_search.run``)
+        *args: Positional arguments for ``func``
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        Return value of ``func``
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_blocking_executor(),
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+class EventLoopLagMonitor:
+    """
+    Measure event loop lag by scheduling a periodic sleep.
+
+    Lag is how much later than requested the sleep wakes up. A blocked
+    loop shows up directly as lag, which makes this a cheap health
+    signal for services running research_node under uvicorn.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.current_ms = 0.0
+        self.max_ms = 0.0
+        self._total_ms = 0.0
+        self._samples = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - started - self.interval) * 1000)
+            self.current_ms = lag_ms
+            self.max_ms = max(self.max_ms, lag_ms)
+            self._total_ms += lag_ms
+            self._samples += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return current, max and average lag in milliseconds."""
+        return {
+            "current_ms": round(self.current_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "avg_ms": round(self._total_ms / self._samples, 2) if self._samples else 0.0,
+            "samples": self._samples
+        }
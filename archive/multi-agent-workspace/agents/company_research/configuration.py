@@ -1,7 +1,7 @@
 """
 Configuration for the company research agent.
 """
-from typing import Annotated, Literal
+from typing import Annotated, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -30,6 +30,123 @@ class Configuration(BaseModel):
         ),
     ] = 3
 
+    search_concurrency: Annotated[
+        int,
+        Field(
+            description="Maximum number of search queries in flight at once per provider",
+            ge=1,
+            le=10,
+        ),
+    ] = 5
+
+    search_timeout: Annotated[
+        float,
+        Field(
+            description="Timeout in seconds for a single search query (slow queries are skipped)",
+            gt=0,
+        ),
+    ] = 30.0
+
+    search_cache_enabled: Annotated[
+        bool,
+        Field(
+            description="Cache search results by provider and normalized query (skips repeat paid calls)"
+        ),
+    ] = True
+
+    search_cache_path: Annotated[
+        Optional[str],
+        Field(
+            description="SQLite file for the persistent search cache tier (None = in-memory only)"
+        ),
+    ] = None
+
+    search_cache_ttl: Annotated[
+        float,
+        Field(
+            description="Seconds before a cached search result is considered stale",
+            gt=0,
+        ),
+    ] = 7 * 24 * 3600
+
+    near_duplicate_distance: Annotated[
+        int,
+        Field(
+            description="SimHash Hamming distance for treating two results as copies (0 disables)",
+            ge=0,
+            le=15,
+        ),
+    ] = 3
+
+    source_token_budget: Annotated[
+        int,
+        Field(
+            description="Total token budget for source content in the research notes prompt",
+            ge=500,
+        ),
+    ] = 8000
+
+    source_passage_tokens: Annotated[
+        int,
+        Field(
+            description="Passage size in tokens when ranking source content for packing",
+            ge=50,
+        ),
+    ] = 300
+
+    extraction_mode: Annotated[
+        Literal["single", "chunked"],
+        Field(
+            description="""How to extract structured data from research notes:
+            - single: one LLM call over all notes
+            - chunked: split long notes into token-bounded chunks, extract them
+              concurrently and merge the partial results (map-reduce)
+            """
+        ),
+    ] = "single"
+
+    extraction_chunk_tokens: Annotated[
+        int,
+        Field(
+            description="Token budget per notes chunk in chunked extraction mode",
+            ge=500,
+        ),
+    ] = 3000
+
+    extraction_concurrency: Annotated[
+        int,
+        Field(
+            description="Maximum number of chunk extractions in flight at once",
+            ge=1,
+            le=10,
+        ),
+    ] = 4
+
+    targeted_reextraction: Annotated[
+        bool,
+        Field(
+            description="On follow-up iterations, re-extract only missing/low-confidence fields and merge"
+        ),
+    ] = True
+
+    query_similarity_threshold: Annotated[
+        float,
+        Field(
+            description="Token-set/character-bigram similarity at which a repeated query is skipped (1.0 = exact repeats only)",
+            ge=0.5,
+            le=1.0,
+        ),
+    ] = 0.8
+
+    early_stop_coverage: Annotated[
+        Optional[float],
+        Field(
+            description="Skip an iteration's unsent searches once results cover this share of the (missing) schema fields, by keyword/pattern estimate (None disables; opt-in, e.g. 0.9)",
+            gt=0,
+            le=1.0,
+        ),
+    ] = None
+
     max_reflection_steps: Annotated[
         int,
         Field(
@@ -39,6 +156,14 @@ class Configuration(BaseModel):
         ),
     ] = 1
 
+    reflection_notes_tokens: Annotated[
+        int,
+        Field(
+            description="Token budget for the research notes shown to reflection (newest findings first)",
+            ge=200,
+        ),
+    ] = 1000
+
     llm_model: Annotated[
         str,
         Field(
@@ -61,6 +186,72 @@ class Configuration(BaseModel):
 
     temperature: float = 0.7
 
+    llm_cache_enabled: Annotated[
+        bool,
+        Field(
+            description="Memoize LLM stage outputs by model, temperature, prompt template and inputs"
+        ),
+    ] = True
+
+    llm_cache_path: Annotated[
+        Optional[str],
+        Field(
+            description="SQLite file for persistent LLM output cache (None = in-memory only)"
+        ),
+    ] = None
+
+    llm_cache_bypass: Annotated[
+        bool,
+        Field(
+            description="Skip cache reads (outputs are still written, refreshing stale entries)"
+        ),
+    ] = False
+
+    prompt_cache: Annotated[
+        Literal["auto", "anthropic", "automatic", "off"],
+        Field(
+            description="""Provider prompt caching of the static prompt prefix (instructions + schema):
+            - auto: infer from llm_model (claude → anthropic, others → automatic)
+            - anthropic: mark cache_control breakpoints after the static prefix
+            - automatic: rely on the provider's automatic prefix cache (DeepSeek, OpenAI)
+            - off: send prompts without cache breakpoints
+            """
+        ),
+    ] = "auto"
+
+    llm_requests_per_minute: Annotated[
+        Optional[float],
+        Field(
+            description="Process-wide request limit for llm_model, shared by all companies (None = unlimited)",
+            gt=0,
+        ),
+    ] = None
+
+    llm_tokens_per_minute: Annotated[
+        Optional[float],
+        Field(
+            description="Process-wide input+output token limit for llm_model (None = unlimited)",
+            gt=0,
+        ),
+    ] = None
+
+    search_requests_per_minute: Annotated[
+        Optional[float],
+        Field(
+            description="Process-wide request limit for the search provider (None = provider default, e.g. DuckDuckGo 20)",
+            gt=0,
+        ),
+    ] = None
+
+    rate_limit_retries: Annotated[
+        int,
+        Field(
+            description="Retries of a rate-limited (429) LLM or search call, with shared jittered backoff",
+            ge=0,
+            le=10,
+        ),
+    ] = 4
+
     search_provider: Annotated[
         Literal["tavily", "google_adk", "hybrid", "serpapi", "bing", "duckduckgo", "brave"],
         Field(
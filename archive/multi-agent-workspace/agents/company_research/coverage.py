@@ -0,0 +1,175 @@
+"""
+Cheap schema coverage estimate for search results.
+
+Decides when the searches of an iteration have probably found enough to
+fill the schema, so queries not sent yet can be skipped. No LLM is
+involved: every field gets
+
+- strong keywords: words of the field name, curated Korean/English hints
+  (e.g. revenue → 매출, sales) and an optional ``keywords`` list on the
+  schema property
+- weak keywords: content words of the field description
+- value patterns for common fields (years, amounts, head counts, URLs)
+
+A field counts as covered once a single result shows a strong keyword plus
+one more piece of evidence (fields without strong keywords need two weak
+ones). Hangul keywords match as substrings, so particles and compounds
+still match ("매출액은" ↔ "매출"); Latin keywords match whole words.
+"""
+import math
+import re
+from typing import Any, Dict, List, Pattern, Set, Tuple, Union
+
+from .schema import CompiledSchema, compile_schema
+
+_WORD = re.compile(r"[가-힣]+|[a-zA-Z0-9]+")
+_HANGUL = re.compile(r"[가-힣]")
+
+# Hints keyed by a word of the field name
+FIELD_HINTS: Dict[str, Tuple[str, ...]] = {
+    "founded": ("설립", "창립", "창업", "established", "founded"),
+    "headquarters": ("본사", "소재지", "본점", "주소", "headquartered", "located"),
+    "revenue": ("매출", "영업이익", "revenue", "sales"),
+    "employee": ("직원", "임직원", "종업원", "인원", "employees", "staff"),
+    "website": ("홈페이지", "웹사이트", "website", "homepage"),
+    "industry": ("업종", "산업", "분야", "industry", "sector"),
+    "products": ("제품", "서비스", "솔루션", "products", "services"),
+    "people": ("대표", "대표이사", "사장", "회장", "임원", "ceo", "founder", "executive"),
+    "name": ("주식회사", "(주)", "inc", "corp", "ltd"),
+    "description": ("기업", "회사", "company"),
+}
+FIELD_HINTS["employees"] = FIELD_HINTS["employee"]
+FIELD_HINTS["product"] = FIELD_HINTS["products"]
+
+FIELD_PATTERNS: Dict[str, Pattern[str]] = {
+    "founded": re.compile(r"(?:19|20)\d{2}\s*년|\b(?:19|20)\d{2}\b"),
+    "revenue": re.compile(r"\d[\d,.]*\s*(?:억|조|만)\s*원|[$₩]\s?\d|\d[\d,.]*\s*(?:million|billion)", re.I),
+    "employee": re.compile(r"\d[\d,]*\s*명|\d[\d,]*\s+employees", re.I),
+    "website": re.compile(r"https?://|www\.", re.I),
+}
+FIELD_PATTERNS["employees"] = FIELD_PATTERNS["employee"]
+
+# Description words that say nothing about where a value appears
+STOPWORDS = frozenset(
+    "the a an of and or if is are to in on for by with what does do its it this that "
+    "company companies most recent brief overview list main key official approximate "
+    "number name primary publicly available sentences person full job title position "
+    "information about other total current".split()
+) | frozenset(["회사", "기업", "정보", "목록", "주요", "경우"])
+
+
+def _words(text: str) -> List[str]:
+    return [word.lower() for word in _WORD.findall(text.replace("_", " "))]
+
+
+class FieldEvidence:
+    """Keywords and patterns used as evidence for one field."""
+
+    def __init__(self, path: str, prop: Dict[str, Any], description: str, company_name: str):
+        name_words = _words(re.sub(r"(?<=[a-z])(?=[A-Z])", " ", path.split(".")[-1]))
+        strong: Set[str] = {word for word in name_words if word not in STOPWORDS and len(word) > 2}
+        for word in name_words:
+            strong.update(FIELD_HINTS.get(word, ()))
+        strong.update(keyword.lower() for keyword in prop.get("keywords", []) if isinstance(keyword, str))
+        if "name" in name_words and company_name:
+            strong.add(company_name.lower())
+
+        self.strong = frozenset(strong)
+        self.weak = frozenset(
+            word for word in _words(description)
+            if word not in STOPWORDS and word not in strong and (len(word) > 2 or _HANGUL.search(word))
+        )
+        self.patterns = [FIELD_PATTERNS[word] for word in name_words if word in FIELD_PATTERNS]
+
+    @staticmethod
+    def _hits(keywords: frozenset, text: str, words: Set[str]) -> int:
+        return sum(
+            1 for keyword in keywords
+            if (keyword in text if _HANGUL.search(keyword) or not keyword.isalnum() else keyword in words)
+        )
+
+    def covered_by(self, text: str, words: Set[str]) -> bool:
+        """Whether one result (lower-cased text and its word set) evidences the field."""
+        if not self.strong and not self.weak and not self.patterns:
+            return bool(text.strip())
+        strong = self._hits(self.strong, text, words)
+        evidence = strong + self._hits(self.weak, text, words)
+        evidence += sum(1 for pattern in self.patterns if pattern.search(text))
+        if self.strong:
+            return strong >= 1 and evidence >= 2
+        return evidence >= min(2, len(self.weak) + len(self.patterns))
+
+
+class CoverageEstimator:
+    """
+    Running estimate of which schema fields the results so far cover.
+
+    Args:
+        schema: Extraction schema (or compiled form) to cover
+        company_name: Company being researched (evidence for name fields)
+    """
+
+    def __init__(self, schema: Union[Dict[str, Any], CompiledSchema], company_name: str = ""):
+        compiled = compile_schema(schema)
+        self.fields = {
+            field: FieldEvidence(field, prop, compiled.descriptions.get(field, ""), company_name)
+            for field, prop in compiled.properties.items()
+        }
+        self.covered: Set[str] = set()
+
+    @property
+    def coverage(self) -> float:
+        return len(self.covered) / len(self.fields) if self.fields else 1.0
+
+    @property
+    def uncovered(self) -> List[str]:
+        return [field for field in self.fields if field not in self.covered]
+
+    def add(self, results: List[Dict[str, Any]]) -> float:
+        """
+        Account for new results.
+
+        Returns:
+            Share of fields covered so far
+        """
+        for result in results:
+            if len(self.covered) == len(self.fields):
+                break
+            text = " ".join(
+                str(result.get(key) or "") for key in ("title", "content", "raw_content")
+            ).lower()
+            words = set(_WORD.findall(text))
+            for field in self.uncovered:
+                if self.fields[field].covered_by(text, words):
+                    self.covered.add(field)
+        return self.coverage
+
+
+def adaptive_max_results(
+    executed_queries: List[Dict[str, Any]],
+    max_results: int,
+    minimum: int = 2
+) -> int:
+    """
+    Results to take per query, scaled by the novelty of the previous round.
+
+    When the last iteration's queries mostly returned sources that were
+    already known, deeper result lists are mostly repeats too.
+
+    Args:
+        executed_queries: ``executed_queries`` state records
+        max_results: Configured maximum per query
+        minimum: Lower bound
+
+    Returns:
+        Results per query (``max_results`` on the first iteration)
+    """
+    if not executed_queries:
+        return max_results
+    last_iteration = max(record.get("iteration", 0) for record in executed_queries)
+    last = [record for record in executed_queries if record.get("iteration", 0) == last_iteration]
+    total = sum(record.get("results", 0) for record in last)
+    if not total:
+        return max_results
+    novelty = sum(record.get("new_results", 0) for record in last) / total
+    return max(min(minimum, max_results), min(max_results, math.ceil(max_results * novelty)))
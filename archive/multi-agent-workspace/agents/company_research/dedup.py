@@ -0,0 +1,212 @@
+"""
+Near-duplicate elimination for search results.
+
+URL deduplication misses syndicated press releases: the same Korean article
+is republished on many portals under different URLs. Results are
+fingerprinted with a 64-bit SimHash over word shingles, and fingerprints
+within a small Hamming distance are treated as copies. Candidate lookup
+uses LSH banding (the fingerprint is split into bands; by the pigeonhole
+principle near copies share at least one band), so deduplication runs in
+expected linear time.
+
+From each cluster of copies the most authoritative result is kept.
+"""
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+FINGERPRINT_BITS = 64
+
+_WORD = re.compile(r"[가-힣]+|[a-zA-Z0-9]+")
+
+# Portals that mostly republish other outlets' articles
+AGGREGATOR_DOMAINS = (
+    "news.naver.com", "n.news.naver.com", "v.daum.net", "news.daum.net",
+    "news.nate.com", "news.zum.com", "msn.com", "news.google.com"
+)
+
+# Primary/official sources (government, public disclosures, institutions)
+AUTHORITATIVE_SUFFIXES = (".go.kr", ".or.kr", ".ac.kr", ".gov", "dart.fss.or.kr", "kind.krx.co.kr")
+
+# Texts shorter than this (in words) are too short to fingerprint reliably
+MIN_TERMS = 20
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, shingle_size: int = 3) -> Optional[int]:
+    """
+    Compute a 64-bit SimHash over word shingles.
+
+    Returns:
+        Fingerprint, or None when the text is too short
+    """
+    terms = _WORD.findall(text.lower())
+    if len(terms) < MIN_TERMS:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for i in range(len(terms) - shingle_size + 1):
+        h = _hash64(" ".join(terms[i:i + shingle_size]))
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def authority_score(result: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Rank copies of the same article: official sources first, aggregator
+    portals last, then longer content.
+    """
+    host = urlparse(result.get("url", "")).netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+
+    tier = 1
+    if any(host == s.lstrip(".") or host.endswith(s) for s in AUTHORITATIVE_SUFFIXES):
+        tier = 2
+    elif any(host == d or host.endswith("." + d) for d in AGGREGATOR_DOMAINS):
+        tier = 0
+
+    length = len(result.get("raw_content") or result.get("content") or "")
+    return tier, length
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over SimHash fingerprints.
+
+    Share one index across calls to deduplicate beyond a single result
+    list (e.g. across reflection iterations, or a whole batch).
+
+    Args:
+        max_distance: Hamming distance at or below which texts are copies
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        # One band more than the allowed distance guarantees a shared band
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+        self._fingerprints: List[int] = []
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.bands)]
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Return the id of a near-duplicate already in the index, if any."""
+        for band, value in enumerate(self._band_values(fingerprint)):
+            for entry_id in self._buckets[band].get(value, ()):
+                if hamming_distance(fingerprint, self._fingerprints[entry_id]) <= self.max_distance:
+                    return entry_id
+        return None
+
+    def add(self, fingerprint: int) -> int:
+        """Add a fingerprint and return its id."""
+        entry_id = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        for band, value in enumerate(self._band_values(fingerprint)):
+            self._buckets[band].setdefault(value, []).append(entry_id)
+        return entry_id
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+
+def remove_near_duplicates(
+    results: List[Dict[str, Any]],
+    max_distance: int = 3,
+    index: Optional[NearDuplicateIndex] = None
+) -> List[Dict[str, Any]]:
+    """
+    Collapse near-duplicate results, keeping the most authoritative copy.
+
+    The kept copy takes the position of the first copy in ``results``.
+    Results too short to fingerprint are always kept. When a shared
+    ``index`` is given, results matching content seen in an earlier call
+    are dropped as well.
+
+    Args:
+        results: URL-deduplicated search results
+        max_distance: SimHash Hamming distance threshold (0 disables)
+        index: Optional index shared across calls
+
+    Returns:
+        Results without near-duplicates
+    """
+    if max_distance <= 0:
+        return results
+
+    if index is None:
+        index = NearDuplicateIndex(max_distance)
+    seen_before = len(index)
+
+    clusters: Dict[int, List[Dict[str, Any]]] = {}
+    order: List[Tuple[str, Any]] = []  # ("result", result) or ("cluster", entry id)
+
+    for result in results:
+        fingerprint = simhash(result.get("raw_content") or result.get("content") or "")
+        if fingerprint is None:
+            order.append(("result", result))
+            continue
+
+        entry_id = index.find(fingerprint)
+        if entry_id is None:
+            entry_id = index.add(fingerprint)
+            clusters[entry_id] = [result]
+            order.append(("cluster", entry_id))
+        elif entry_id < seen_before:
+            continue  # Copy of content from an earlier call
+        else:
+            clusters[entry_id].append(result)
+
+    deduplicated = []
+    for kind, item in order:
+        if kind == "result":
+            deduplicated.append(item)
+        else:
+            deduplicated.append(max(clusters[item], key=authority_score))
+    return deduplicated
+
+
+def filter_seen_sources(
+    previous: List[Dict[str, Any]],
+    results: List[Dict[str, Any]],
+    max_distance: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Keep only results not already covered by ``previous``.
+
+    A result is covered when its URL was seen before or its content is a
+    near-duplicate of a previous result.
+
+    Args:
+        previous: Sources accumulated in earlier iterations
+        results: Newly found (already deduplicated) sources
+        max_distance: SimHash Hamming distance threshold (0 = URL check only)
+
+    Returns:
+        Newly seen sources
+    """
+    seen_urls = {r.get("url") for r in previous if r.get("url")}
+    fresh = [r for r in results if not r.get("url") or r.get("url") not in seen_urls]
+    if max_distance <= 0 or not previous:
+        return fresh
+
+    index = NearDuplicateIndex(max_distance)
+    remove_near_duplicates(previous, max_distance, index=index)
+    return remove_near_duplicates(fresh, max_distance, index=index)
@@ -1,7 +1,8 @@
 """
 Extraction phase: Extract structured data from research notes.
 """
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from collections import Counter
 import json
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
@@ -9,15 +10,221 @@ from langchain_core.output_parsers import JsonOutputParser
 
 from .configuration import Configuration
 from .state import ResearchState
-from .prompts import EXTRACTION_PROMPT
+from .prompts import EXTRACTION_PROMPT, EXTRACTION_INPUT
+from .llm_cache import cached_ainvoke
+from .prompt_layout import build_prompt, build_chain
+from .progress import emit_progress
+from .concurrency import gather_bounded
+from .tokens import count_tokens
+from .packing import hard_split
+from .schema import CompiledSchema, compile_schema, is_empty, is_low_confidence
+from .metrics import FALLBACKS, observe_node
 from src.common.llm import get_llm_for_extraction
 
 
+def split_notes(notes: str, max_tokens: int) -> List[str]:
+    """
+    Split research notes into chunks of at most ``max_tokens`` tokens.
+
+    Splits on blank lines (note sections/paragraphs) and packs whole
+    paragraphs into chunks; a single oversized paragraph is split by lines,
+    and a single oversized line at word or character boundaries.
+
+    Args:
+        notes: Research notes
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List of chunks (a single chunk when the notes fit)
+    """
+    if count_tokens(notes) <= max_tokens:
+        return [notes]
+
+    pieces: List[str] = []
+    for paragraph in notes.split("\n\n"):
+        if count_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            for line in paragraph.split("\n"):
+                if not line.strip():
+                    continue
+                pieces.extend(hard_split(line, max_tokens) if count_tokens(line) > max_tokens else [line])
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        # One extra token per piece covers the "\n\n" separator
+        piece_tokens = count_tokens(piece) + 1
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def fields_to_reextract(
+    extracted: Dict[str, Any],
+    schema: CompiledSchema,
+    missing_fields: List[str]
+) -> List[str]:
+    """
+    Top-level schema fields that are missing or low-confidence.
+
+    Combines reflection's ``missing_fields`` (nested paths map to their
+    top-level field) with fields holding empty or placeholder values.
+    """
+    targets = []
+    for field in missing_fields:
+        top_level = field.split(".")[0].split("[")[0]
+        if top_level in schema.properties and top_level not in targets:
+            targets.append(top_level)
+    for field in schema.fields:
+        if field not in targets and is_low_confidence(extracted.get(field)):
+            targets.append(field)
+    return targets
+
+
+def merge_targeted(previous: Dict[str, Any], update: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Merge a targeted re-extraction into the previous result.
+
+    Only the targeted fields can change, and only to a non-placeholder
+    value, so fields found earlier never regress.
+    """
+    merged = dict(previous)
+    for field in fields:
+        value = update.get(field)
+        if not is_low_confidence(value):
+            merged[field] = value
+    return merged
+
+
+def _vote_key(value: Any) -> str:
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def _merge_array(values: List[List[Any]]) -> List[Any]:
+    """Union arrays in order; objects with a ``name`` are merged by name."""
+    merged: List[Any] = []
+    by_key: Dict[str, Any] = {}
+    for items in values:
+        for item in items:
+            if isinstance(item, dict) and item.get("name"):
+                key = "name:" + _vote_key(item["name"])
+                existing = by_key.get(key)
+                if existing is not None:
+                    for field, field_value in item.items():
+                        if is_empty(existing.get(field)) and not is_empty(field_value):
+                            existing[field] = field_value
+                    continue
+                item = dict(item)
+            else:
+                key = _vote_key(item)
+                if key in by_key:
+                    continue
+            by_key[key] = item
+            merged.append(item)
+    return merged
+
+
+def _merge_value(values: List[Any], field_schema: Dict[str, Any]) -> Any:
+    present = [v for v in values if not is_empty(v)]
+    if not present:
+        return None
+
+    field_type = field_schema.get("type")
+    if field_type == "array" or all(isinstance(v, list) for v in present):
+        return _merge_array([v if isinstance(v, list) else [v] for v in present])
+    if field_type == "object" or all(isinstance(v, dict) for v in present):
+        dicts = [v for v in present if isinstance(v, dict)]
+        return merge_extractions(dicts, field_schema)
+
+    # Scalar: keep the value supported by the most chunks (ties → earliest)
+    counts = Counter(_vote_key(v) for v in present)
+    best = max(counts.values())
+    for value in present:
+        if counts[_vote_key(value)] == best:
+            return value
+
+
+def merge_extractions(partials: List[Dict[str, Any]], schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge partial extractions from several chunks into one object.
+
+    Rules per field:
+    - arrays: union (deduplicated); objects with ``name`` (e.g. key_people)
+      are deduplicated by name and their missing fields filled in
+    - nested objects: merged recursively
+    - scalars: the most frequent non-null value across chunks
+
+    Args:
+        partials: Extraction results, in chunk order
+        schema: JSON schema (or sub-schema) of the object
+
+    Returns:
+        Merged extraction
+    """
+    properties = schema.get("properties", {})
+    fields = list(properties.keys())
+    for partial in partials:
+        fields.extend(field for field in partial if field not in fields)
+
+    return {
+        field: _merge_value([p.get(field) for p in partials], properties.get(field, {}))
+        for field in fields
+    }
+
+
+async def _extract_chunked(
+    chain: Any,
+    prompt: ChatPromptTemplate,
+    chunks: List[str],
+    schema_json: str,
+    schema: Dict[str, Any],
+    company_name: str,
+    config: Configuration
+) -> Optional[Dict[str, Any]]:
+    """Extract from each chunk concurrently and merge; None if every chunk failed."""
+    async def extract_chunk(chunk: str) -> Dict[str, Any]:
+        return await cached_ainvoke(chain, prompt, {
+            "schema": schema_json,
+            "notes": chunk,
+            "company_name": company_name
+        }, config, stage="extraction")
+
+    def report(chunk: str, error: BaseException) -> None:
+        print(f"Extraction chunk error: {error}")
+
+    partials = await gather_bounded(
+        chunks,
+        extract_chunk,
+        limit=config.extraction_concurrency,
+        on_error=report
+    )
+    partials = [p for p in partials if isinstance(p, dict)]
+    if not partials:
+        return None
+    return merge_extractions(partials, schema)
+
+
+@observe_node("extraction")
 async def extraction_node(state: ResearchState, config: Configuration) -> Dict[str, Any]:
     """
     Extraction phase node.
 
     Extracts structured data from research notes according to the schema.
+    In ``chunked`` mode, long notes are split into token-bounded chunks that
+    are extracted concurrently and merged field by field.
+
+    On follow-up iterations only the missing or low-confidence fields are
+    re-extracted (with a projected sub-schema) and merged into the
+    previous ``extracted_data``.
 
     Args:
         state: Current research state
@@ -26,39 +233,75 @@ async def extraction_node(state: ResearchState, config: Configuration) -> Dict[s
     Returns:
         Updated state with extracted data
     """
-    schema = state["extraction_schema"]
+    schema = compile_schema(state["extraction_schema"])
     notes = state["research_notes"]
     company_name = state["company_name"]
+    previous = state.get("extracted_data") or {}
+
+    # Targeted mode: re-extract only what is still missing
+    target_schema = schema
+    target_fields: List[str] = []
+    if config.targeted_reextraction and previous and state.get("reflection_count", 0) > 0:
+        target_fields = fields_to_reextract(previous, schema, state.get("missing_fields") or [])
+        if not target_fields:
+            return {
+                "extracted_data": previous,
+                "messages": [{"role": "assistant", "content": f"No missing fields to re-extract for {company_name}"}]
+            }
+        target_schema = schema.project(target_fields)
 
     # Initialize LLM with rate limiting (optimized for extraction)
     llm = get_llm_for_extraction(config)
 
     # Create extraction prompt using centralized template
-    extraction_prompt = ChatPromptTemplate.from_messages([
-        ("system", EXTRACTION_PROMPT),
-        ("human", "Extract structured data for {company_name}.")
-    ])
+    # (static instructions + schema first, so the prefix is cacheable)
+    extraction_prompt = build_prompt(EXTRACTION_PROMPT, EXTRACTION_INPUT)
 
     # Use JSON output parser for structured extraction
     parser = JsonOutputParser()
 
-    chain = extraction_prompt | llm | parser
+    chain = build_chain(extraction_prompt, llm, config, stage="extraction", parser=parser)
 
-    try:
-        extracted = await chain.ainvoke({
-            "schema": json.dumps(schema, indent=2),
-            "notes": notes,
-            "company_name": company_name
-        })
-    except Exception as e:
-        print(f"Extraction error: {e}")
+    schema_json = target_schema.prompt_json
+    chunks = (
+        split_notes(notes, config.extraction_chunk_tokens)
+        if config.extraction_mode == "chunked" else [notes]
+    )
+
+    extracted = None
+    if len(chunks) > 1:
+        extracted = await _extract_chunked(
+            chain, extraction_prompt, chunks, schema_json, target_schema.schema, company_name, config
+        )
+    else:
+        try:
+            extracted = await cached_ainvoke(chain, extraction_prompt, {
+                "schema": schema_json,
+                "notes": notes,
+                "company_name": company_name
+            }, config, stage="extraction")
+        except Exception as e:
+            print(f"Extraction error: {e}")
+
+    if extracted is not None and not isinstance(extracted, dict):
+        # The parser accepts any JSON value (e.g. a bare list); treat it as a failed run
+        print(f"Extraction error: expected a JSON object, got {type(extracted).__name__}")
+        extracted = None
+
+    if target_fields:
+        # Failed targeted runs keep the previous result unchanged
+        extracted = merge_targeted(previous, extracted or {}, target_fields)
+    elif extracted is None:
         # Fallback: return empty structure matching schema
+        FALLBACKS.labels(component="extraction", kind="null_result").inc()
         extracted = {
             field: None
-            for field in schema.get("properties", {}).keys()
+            for field in schema.fields
         }
         extracted["company_name"] = company_name
 
+    emit_progress("extraction_finished", field_count=len(extracted), chunk_count=len(chunks))
+
     return {
         "extracted_data": extracted,
         "messages": [{"role": "assistant", "content": f"Extracted {len(extracted)} fields for {company_name}"}]
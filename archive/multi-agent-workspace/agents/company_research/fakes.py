@@ -0,0 +1,389 @@
+"""
+Offline stand-ins for running the research agent without external APIs.
+
+``RecordingChatModel`` is a LangChain chat model that records every prompt
+it receives, returns scripted responses, and simulates provider prompt
+caching so the prompt layout can be checked without network access.
+``FakeSearchProvider`` returns synthetic, deterministic search results.
+Both accept a ``LatencyModel`` to simulate response times and failures
+(see agents/benchmarks):
+
+    llm = RecordingChatModel(responses=['["q1"]', "notes", "{}"], prefix_cache="anthropic")
+    chain = build_chain(prompt, llm, config, stage="extraction")
+    ...
+    llm.calls            # messages sent per call
+    llm.usage            # input / cache_read / cache_creation tokens per call
+
+Inject them by patching the ``get_llm_for_*`` / ``get_search_provider``
+factories used by the nodes.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field, PrivateAttr
+
+from .configuration import Configuration
+from .search_providers import SearchProvider
+from .tokens import count_tokens
+
+Responder = Callable[[List[BaseMessage]], str]
+
+# Earlier prompts compared for automatic prefix caching
+_AUTOMATIC_CACHE_PROMPTS = 64
+
+
+class FakeServiceError(RuntimeError):
+    """Simulated provider failure."""
+
+
+class LatencyModel:
+    """
+    Deterministic latency and failure distribution.
+
+    Latencies are log-normal around ``median`` (``sigma`` is the spread of
+    the underlying normal; 0 gives a constant latency). Each call fails with
+    probability ``failure_rate``.
+
+    Args:
+        median: Median latency in seconds
+        sigma: Log-normal spread
+        failure_rate: Probability of a simulated failure
+        seed: Random seed (same seed → same sequence)
+    """
+
+    def __init__(self, median: float = 0.0, sigma: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.median = median
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.median <= 0:
+                return 0.0
+            return self.median * math.exp(self._random.gauss(0.0, self.sigma)) if self.sigma else self.median
+
+    def fails(self) -> bool:
+        with self._lock:
+            return self.failure_rate > 0 and self._random.random() < self.failure_rate
+
+
+def _block_text(block: Any) -> str:
+    if isinstance(block, dict):
+        return block.get("text", "")
+    return str(block)
+
+
+def _render(messages: List[BaseMessage]) -> List[tuple]:
+    """Flatten messages into (text, is_breakpoint) segments in prompt order."""
+    segments = []
+    for message in messages:
+        segments.append((f"<{message.type}>", False))
+        if isinstance(message.content, str):
+            segments.append((message.content, False))
+        else:
+            for block in message.content:
+                marked = isinstance(block, dict) and "cache_control" in block
+                segments.append((_block_text(block), marked))
+    return segments
+
+
+class RecordingChatModel(BaseChatModel):
+    """
+    Scripted chat model with simulated prompt caching.
+
+    Args:
+        responses: A string, a list of strings (used in turn, cycling), or
+            a callable taking the messages and returning the response text
+        prefix_cache: Caching behaviour to simulate:
+            - anthropic: the prefix up to the last ``cache_control`` block is
+              read from cache when an identical prefix was sent before
+            - automatic: the longest prefix shared with any earlier prompt is
+              read from cache, in units of ``cache_unit_tokens`` (DeepSeek)
+            - none: no caching
+        cache_unit_tokens: Granularity of automatic prefix caching
+        latency: Optional LatencyModel applied to each call
+    """
+
+    responses: Union[str, List[str], Callable[..., str]] = "{}"
+    prefix_cache: str = "anthropic"
+    cache_unit_tokens: int = 64
+    latency: Any = None
+    calls: List[List[BaseMessage]] = Field(default_factory=list)
+    usage: List[Dict[str, int]] = Field(default_factory=list)
+
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _prefixes: set = PrivateAttr(default_factory=set)
+    _prompts: List[str] = PrivateAttr(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _respond(self, messages: List[BaseMessage], call_index: int) -> str:
+        if callable(self.responses):
+            return self.responses(messages)
+        if isinstance(self.responses, str):
+            return self.responses
+        return self.responses[call_index % len(self.responses)] if self.responses else ""
+
+    def _cache_usage(self, segments: List[tuple]) -> Dict[str, int]:
+        prompt = "".join(text for text, _ in segments)
+        cache_read = cache_creation = 0
+
+        if self.prefix_cache == "anthropic":
+            breakpoints = [i for i, (_, marked) in enumerate(segments) if marked]
+            if breakpoints:
+                prefix = "".join(text for text, _ in segments[:breakpoints[-1] + 1])
+                if prefix in self._prefixes:
+                    cache_read = count_tokens(prefix)
+                else:
+                    cache_creation = count_tokens(prefix)
+                    self._prefixes.add(prefix)
+        elif self.prefix_cache == "automatic":
+            shared = 0
+            for previous in self._prompts:
+                limit = min(len(previous), len(prompt))
+                n = 0
+                while n < limit and previous[n] == prompt[n]:
+                    n += 1
+                shared = max(shared, n)
+            if shared:
+                unit = max(self.cache_unit_tokens, 1)
+                cache_read = count_tokens(prompt[:shared]) // unit * unit
+            self._prompts.append(prompt)
+            del self._prompts[:-_AUTOMATIC_CACHE_PROMPTS]
+
+        return {
+            "input_tokens": count_tokens(prompt),
+            "cache_read_tokens": cache_read,
+            "cache_creation_tokens": cache_creation
+        }
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self.latency is not None:
+            time.sleep(self.latency.sample())
+            if self.latency.fails():
+                raise FakeServiceError("simulated LLM failure")
+        return self._complete(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self.latency is not None:
+            await asyncio.sleep(self.latency.sample())
+            if self.latency.fails():
+                raise FakeServiceError("simulated LLM failure")
+        return self._complete(messages)
+
+    def _complete(self, messages: List[BaseMessage]) -> ChatResult:
+        with self._lock:
+            call_index = len(self.calls)
+            self.calls.append(list(messages))
+            usage = self._cache_usage(_render(messages))
+            self.usage.append(usage)
+
+        text = self._respond(messages, call_index)
+        output_tokens = count_tokens(text)
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": usage["input_tokens"],
+                "output_tokens": output_tokens,
+                "total_tokens": usage["input_tokens"] + output_tokens,
+                "input_token_details": {
+                    "cache_read": usage["cache_read_tokens"],
+                    "cache_creation": usage["cache_creation_tokens"]
+                }
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+_SCHEMA_BLOCK = re.compile(r"<schema>\s*(.*?)\s*</schema>", re.S)
+_MAX_QUERIES = re.compile(r"at most (\d+)")
+
+
+def _message_text(message: BaseMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(_block_text(block) for block in message.content)
+
+
+def _fake_value(name: str, prop: Dict[str, Any], company: str) -> Any:
+    kind = prop.get("type")
+    if kind == "array":
+        item = prop.get("items") or {}
+        return [_fake_value(f"{name} {i}", item, company) for i in (1, 2)]
+    if kind == "object":
+        return {key: _fake_value(key, sub, company) for key, sub in prop.get("properties", {}).items()}
+    if kind in ("integer", "number"):
+        return 42
+    if kind == "boolean":
+        return True
+    return f"{name} of {company}"
+
+
+def pipeline_responder(follow_up_rounds: int = 0, fill_rate: float = 1.0) -> Responder:
+    """
+    Responder that answers every research stage plausibly.
+
+    The stage is recognized from the system prompt; the company name is
+    read from the last line of the user message.
+
+    Args:
+        follow_up_rounds: Reflection rounds per company that ask for more
+            research before reporting completion
+        fill_rate: Fraction of top-level schema fields filled by extraction
+            (lower values make reflection run)
+
+    Returns:
+        Callable for ``RecordingChatModel(responses=...)``
+    """
+    rounds: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def respond(messages: List[BaseMessage]) -> str:
+        system = _message_text(messages[0]) if messages else ""
+        user = _message_text(messages[-1]) if messages else ""
+        last_line = user.strip().splitlines()[-1] if user.strip() else ""
+        company = re.sub(r"^.*?(?:for:?)\s+", "", last_line).rstrip(".") or "company"
+
+        schema: Dict[str, Any] = {}
+        match = _SCHEMA_BLOCK.search(system)
+        if match:
+            try:
+                schema = json.loads(match.group(1))
+            except json.JSONDecodeError:
+                schema = {}
+
+        if system.startswith("You are a search query expert"):
+            max_queries = _MAX_QUERIES.search(system)
+            count = int(max_queries.group(1)) if max_queries else 3
+            topics = ["회사 소개", "뉴스", "채용", "투자 유치", "납품 실적", "파트너십", "매출", "대표이사"]
+            return json.dumps([f"{company} {topics[i % len(topics)]}" for i in range(count)], ensure_ascii=False)
+
+        if system.startswith("You are conducting web research"):
+            sources = re.findall(r"Most relevant content from source: (.{0,200})", user)
+            lines = "\n".join(f"- {snippet.strip()}" for snippet in sources[:10])
+            return f"## Research notes: {company}\n\n{lines or '- No relevant content.'}"
+
+        if system.startswith("You are a data extraction specialist"):
+            properties = schema.get("properties", {})
+            keep = max(1, round(len(properties) * fill_rate)) if properties else 0
+            data = {
+                name: (_fake_value(name, prop, company) if i < keep else None)
+                for i, (name, prop) in enumerate(properties.items())
+            }
+            return json.dumps(data, ensure_ascii=False)
+
+        if system.startswith("You are a research quality analyst"):
+            with lock:
+                done = rounds.get(company, 0)
+                rounds[company] = done + 1
+            if done < follow_up_rounds:
+                return json.dumps({
+                    "analysis": "Some fields are still missing",
+                    "follow_up_queries": [f"{company} 추가 정보 {done + 1}"],
+                    "is_complete": False
+                }, ensure_ascii=False)
+            return json.dumps({"analysis": "Complete", "follow_up_queries": [], "is_complete": True})
+
+        return "{}"
+
+    return respond
+
+
+_VOCABULARY = (
+    "매출 성장 제품 서비스 고객 투자 유치 시리즈 대표이사 설립 본사 직원 채용 "
+    "플랫폼 솔루션 제조 공급 계약 파트너십 특허 기술 연구 개발 수출 시장 점유율 "
+    "revenue growth customers platform funding series founder headquarters employees "
+    "product launch partnership contract supplier manufacturing patent export market"
+).split()
+
+
+class FakeSearchProvider(SearchProvider):
+    """
+    Synthetic search provider.
+
+    Results are a deterministic function of the query (and ``seed``).
+    Content mixes query terms with business vocabulary. A share of results
+    (``duplicate_rate``) are syndicated copies of the first result under
+    portal URLs, which exercises near-duplicate removal.
+
+    Args:
+        config: Agent configuration (max_search_results, concurrency, cache)
+        latency: Optional LatencyModel per query
+        words_per_result: Length of each result's content
+        duplicate_rate: Share of results that copy the first result
+        seed: Random seed for content
+    """
+
+    name = "fake"
+    label = "Fake search"
+
+    def __init__(
+        self,
+        config: Configuration,
+        latency: Optional[LatencyModel] = None,
+        words_per_result: int = 300,
+        duplicate_rate: float = 0.2,
+        seed: int = 0
+    ):
+        super().__init__(config)
+        self.latency = latency
+        self.words_per_result = words_per_result
+        self.duplicate_rate = duplicate_rate
+        self.seed = seed
+        self.queries: List[str] = []
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        self.queries.append(query)
+        if self.latency is not None:
+            await asyncio.sleep(self.latency.sample())
+            if self.latency.fails():
+                raise FakeServiceError("simulated search failure")
+
+        rng = random.Random(f"{self.seed}:{query}")
+        terms = query.split()
+        slug = "-".join(str(zlib.crc32(t.encode("utf-8")) % 10000) for t in terms[:3])
+        results: List[Dict[str, Any]] = []
+        for i in range(self.max_results):
+            if i and rng.random() < self.duplicate_rate:
+                original = results[0]
+                results.append({
+                    **original,
+                    "url": f"https://news.naver.com/article/{slug}-{i}",
+                    "title": original["title"] + " (전재)"
+                })
+                continue
+            words = [rng.choice(terms + list(_VOCABULARY)) for _ in range(self.words_per_result)]
+            content = " ".join(words)
+            results.append({
+                "title": f"{query} - result {i + 1}",
+                "url": f"https://example-{i}.co.kr/{slug}",
+                "content": content[:300],
+                "raw_content": content
+            })
+        return results
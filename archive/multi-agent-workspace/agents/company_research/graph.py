@@ -1,7 +1,7 @@
 """
 Main graph construction for the research agent.
 """
-from typing import Literal
+from typing import Any, Literal, Optional
 from langgraph.graph import StateGraph, END
 
 from .configuration import Configuration
@@ -26,7 +26,7 @@ def should_continue(state: ResearchState) -> Literal["research", "end"]:
     return "research"
 
 
-def build_research_graph(config: Configuration):
+def build_research_graph(config: Configuration, checkpointer: Optional[Any] = None):
     """
     Build the research workflow graph.
 
@@ -36,8 +36,13 @@ def build_research_graph(config: Configuration):
     3. Reflect: Evaluate quality and decide next steps
     4. Loop back to Research if needed, or End
 
+    With a ``checkpointer`` (see checkpoint.py) the state is saved after
+    every node, and runs must be invoked with a ``thread_id`` so they can
+    resume from the last finished node.
+
     Args:
         config: Agent configuration
+        checkpointer: Optional LangGraph checkpoint saver
 
     Returns:
         Compiled StateGraph
@@ -75,4 +80,4 @@ def build_research_graph(config: Configuration):
         }
     )
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
@@ -0,0 +1,278 @@
+"""
+Content-addressed cache for LLM stage outputs.
+
+Re-running a batch after a crash, or re-extracting the same notes, sends
+byte-identical prompts to the LLM. ``cached_ainvoke`` wraps a chain call
+and returns the stored output when the key matches:
+
+    sha256(stage, model, temperature, prompt template hash, rendered inputs)
+
+Only successful outputs are stored, so parse failures are always retried.
+Storage is pluggable (in-memory LRU or SQLite). Cache misses go through
+the model's shared rate limiter (see ``rate_limit``).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from .configuration import Configuration
+from .metrics import LLM_LATENCY, ERRORS, record_cache, timed
+from .rate_limit import call_with_rate_limit, get_llm_rate_limiter
+from .tokens import count_tokens
+
+
+class LLMCacheStorage:
+    """Storage backend interface for the LLM cache."""
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored JSON payload for ``key`` or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:
+        """Store a JSON payload under ``key``."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        raise NotImplementedError
+
+
+class MemoryLLMCacheStorage(LLMCacheStorage):
+    """In-process LRU storage bounded by entry count."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteLLMCacheStorage(LLMCacheStorage):
+    """Persistent SQLite storage; oldest entries are evicted past ``max_entries``."""
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " value TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, created_at, value) VALUES (?, ?, ?)",
+                (key, time.time(), value)
+            )
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= 100:
+                self._writes_since_evict = 0
+                self._db.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_cache")
+            self._db.commit()
+
+
+class LLMCache:
+    """LLM output cache over a storage backend, with hit/miss counters."""
+
+    def __init__(self, storage: LLMCacheStorage):
+        self.storage = storage
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    def lookup(self, key: str) -> Optional[Any]:
+        raw = self.storage.get(key)
+        if raw is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return _decode(json.loads(raw))
+
+    def store(self, key: str, value: Any) -> None:
+        self.storage.set(key, json.dumps(_encode(value), ensure_ascii=False))
+        self.stats["stores"] += 1
+
+
+def _encode(value: Any) -> Dict[str, Any]:
+    if isinstance(value, BaseMessage):
+        return {"kind": "message", "content": value.content}
+    return {"kind": "json", "value": value}
+
+
+def _decode(payload: Dict[str, Any]) -> Any:
+    if payload["kind"] == "message":
+        return AIMessage(content=payload["content"])
+    return payload["value"]
+
+
+def template_hash(prompt: ChatPromptTemplate) -> str:
+    """Hash the message templates of a chat prompt."""
+    parts = []
+    for message in prompt.messages:
+        template = getattr(getattr(message, "prompt", None), "template", None)
+        parts.append([type(message).__name__, template if template is not None else repr(message)])
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def make_llm_cache_key(
+    stage: str,
+    config: Configuration,
+    prompt: ChatPromptTemplate,
+    inputs: Dict[str, Any]
+) -> str:
+    """Build the content address for one LLM stage call."""
+    payload = json.dumps(
+        {
+            "stage": stage,
+            "model": config.llm_model,
+            "temperature": config.temperature,
+            "template": template_hash(prompt),
+            "inputs": inputs
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_caches: Dict[Tuple[Any, ...], LLMCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(config: Configuration) -> Optional[LLMCache]:
+    """
+    Get the process-wide LLM cache for a configuration.
+
+    Returns:
+        Shared LLMCache, or None when caching is disabled
+    """
+    if not config.llm_cache_enabled:
+        return None
+
+    key = (config.llm_cache_path,)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            if config.llm_cache_path:
+                storage: LLMCacheStorage = SQLiteLLMCacheStorage(config.llm_cache_path)
+            else:
+                storage = MemoryLLMCacheStorage()
+            cache = LLMCache(storage)
+            _caches[key] = cache
+        return cache
+
+
+async def cached_ainvoke(
+    chain: Any,
+    prompt: ChatPromptTemplate,
+    inputs: Dict[str, Any],
+    config: Configuration,
+    stage: str
+) -> Any:
+    """
+    Invoke a chain, memoizing its output by content address.
+
+    With ``config.llm_cache_bypass`` set, the cache is not read but fresh
+    outputs are still written (useful to refresh stale entries).
+
+    Args:
+        chain: Runnable built from ``prompt`` (e.g. ``prompt | llm | parser``)
+        prompt: Prompt template used by the chain
+        inputs: Template variables
+        config: Agent configuration
+        stage: Stage name (query_writer, notes, extraction, reflection)
+
+    Returns:
+        Chain output (AIMessage or parsed JSON)
+    """
+    cache = get_llm_cache(config)
+    if cache is None:
+        return await _invoke(chain, prompt, inputs, config, stage)
+
+    key = make_llm_cache_key(stage, config, prompt, inputs)
+    if not config.llm_cache_bypass:
+        cached = cache.lookup(key)
+        record_cache("llm", cached is not None)
+        if cached is not None:
+            return cached
+
+    result = await _invoke(chain, prompt, inputs, config, stage)
+    cache.store(key, result)
+    return result
+
+
+def estimate_prompt_tokens(prompt: ChatPromptTemplate, inputs: Dict[str, Any]) -> int:
+    """Estimate input tokens of a call from its templates and template variables."""
+    parts = [getattr(getattr(message, "prompt", None), "template", None) or "" for message in prompt.messages]
+    parts.extend(value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+                 for value in inputs.values())
+    return sum(count_tokens(part) for part in parts)
+
+
+async def _invoke(
+    chain: Any,
+    prompt: ChatPromptTemplate,
+    inputs: Dict[str, Any],
+    config: Configuration,
+    stage: str
+) -> Any:
+    """Invoke the chain under the model's rate limiter, recording latency and errors."""
+    limiter = get_llm_rate_limiter(config)
+    tokens = estimate_prompt_tokens(prompt, inputs) if limiter.limits_tokens else 0
+
+    async def call() -> Any:
+        with timed(LLM_LATENCY.labels(stage=stage)):
+            return await chain.ainvoke(inputs)
+
+    try:
+        return await call_with_rate_limit(limiter, call, config.rate_limit_retries, tokens=tokens)
+    except Exception:
+        ERRORS.labels(component=f"llm_{stage}", kind="exception").inc()
+        raise
@@ -0,0 +1,171 @@
+"""
+Prometheus metrics for the research pipeline.
+
+Nodes, search providers and LLM stages record into process-wide metrics;
+each A2A service exposes them on ``GET /metrics`` (see ``render_metrics``).
+``prometheus_client`` is optional: without it every metric is a no-op and
+``render_metrics`` raises ``MetricsUnavailable``.
+
+Metrics:
+- research_node_duration_seconds{node}
+- research_search_duration_seconds{provider}
+- research_llm_duration_seconds{stage}
+- research_llm_tokens_total{stage,kind}          input/output/cache_read/cache_creation
+- research_errors_total{component,kind}
+- research_fallbacks_total{component,kind}       e.g. extraction null_result
+- research_cache_requests_total{cache,result}    hit/miss
+- research_cache_hit_ratio{cache}
+- research_queries_skipped_total{reason}          executed/duplicate/covered
+- research_rate_limit_wait_seconds_total{limiter}  time spent waiting on rate limiters
+- research_pipeline_queue_depth{stage}           companies waiting for a pipeline stage (batch --pipeline)
+- research_pipeline_busy_workers{stage}
+- a2a_tasks_in_flight{service}
+- a2a_queue_depth{service}
+- a2a_request_duration_seconds{service,path,status}
+- a2a_agent_retries_total{agent,reason}           failed agent attempts (retried on another replica when possible)
+- a2a_replica_available{agent,replica}            1 when healthy with a closed breaker
+- a2a_payload_bytes_total{service,direction,format}  task message bytes on the wire (after compression)
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+class MetricsUnavailable(RuntimeError):
+    """Raised when metrics are rendered without prometheus_client installed."""
+
+
+class _NoopMetric:
+    """Stand-in accepting the prometheus_client metric API."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+
+_NOOP = _NoopMetric()
+
+
+def _metric(kind: str, name: str, documentation: str, labels: Tuple[str, ...], **kwargs: Any) -> Any:
+    if not PROMETHEUS_AVAILABLE:
+        return _NOOP
+    cls = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}[kind]
+    return cls(name, documentation, labels, **kwargs)
+
+
+_LLM_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+_SEARCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30)
+_NODE_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 20, 40, 80, 160, 300)
+
+NODE_LATENCY = _metric("histogram", "research_node_duration_seconds",
+                       "Duration of research graph nodes", ("node",), buckets=_NODE_BUCKETS)
+SEARCH_LATENCY = _metric("histogram", "research_search_duration_seconds",
+                         "Duration of search provider calls (cache misses)", ("provider",), buckets=_SEARCH_BUCKETS)
+LLM_LATENCY = _metric("histogram", "research_llm_duration_seconds",
+                      "Duration of LLM stage calls (cache misses)", ("stage",), buckets=_LLM_BUCKETS)
+LLM_TOKENS = _metric("counter", "research_llm_tokens_total",
+                     "LLM tokens by stage and kind", ("stage", "kind"))
+ERRORS = _metric("counter", "research_errors_total",
+                 "Errors by component and kind", ("component", "kind"))
+FALLBACKS = _metric("counter", "research_fallbacks_total",
+                    "Degraded paths taken (fallback providers, empty results)", ("component", "kind"))
+CACHE_REQUESTS = _metric("counter", "research_cache_requests_total",
+                         "Cache lookups by cache and result", ("cache", "result"))
+CACHE_HIT_RATIO = _metric("gauge", "research_cache_hit_ratio",
+                          "Share of cache lookups served from cache since start", ("cache",))
+QUERIES_SKIPPED = _metric("counter", "research_queries_skipped_total",
+                          "Search queries dropped as repeats before reaching the provider", ("reason",))
+RATE_LIMIT_WAIT = _metric("counter", "research_rate_limit_wait_seconds_total",
+                          "Seconds callers waited on rate limiters", ("limiter",))
+STAGE_QUEUE_DEPTH = _metric("gauge", "research_pipeline_queue_depth",
+                            "Companies queued for a pipeline stage", ("stage",))
+STAGE_BUSY_WORKERS = _metric("gauge", "research_pipeline_busy_workers",
+                             "Pipeline stage workers processing a company", ("stage",))
+TASKS_IN_FLIGHT = _metric("gauge", "a2a_tasks_in_flight",
+                          "Tasks or workflows currently running", ("service",))
+QUEUE_DEPTH = _metric("gauge", "a2a_queue_depth",
+                      "Work items waiting in a service queue", ("service",))
+AGENT_RETRIES = _metric("counter", "a2a_agent_retries_total",
+                        "Failed coordinator → agent attempts by reason", ("agent", "reason"))
+REPLICA_AVAILABLE = _metric("gauge", "a2a_replica_available",
+                            "Whether an agent replica takes requests (healthy, breaker not open)", ("agent", "replica"))
+PAYLOAD_BYTES = _metric("counter", "a2a_payload_bytes_total",
+                        "A2A task message bytes sent/received (after compression)", ("service", "direction", "format"))
+REQUEST_LATENCY = _metric("histogram", "a2a_request_duration_seconds",
+                          "HTTP request duration", ("service", "path", "status"), buckets=_NODE_BUCKETS)
+
+_cache_counts: Dict[str, Dict[str, int]] = {}
+_cache_lock = threading.Lock()
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one cache lookup."""
+    result = "hit" if hit else "miss"
+    CACHE_REQUESTS.labels(cache=cache, result=result).inc()
+    with _cache_lock:
+        counts = _cache_counts.setdefault(cache, {"hit": 0, "miss": 0})
+        counts[result] += 1
+
+
+@contextmanager
+def timed(histogram: Any) -> Iterator[None]:
+    """Observe the duration of the ``with`` block on a (labelled) histogram."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+
+def observe_node(node: str) -> Callable:
+    """Decorator timing an async graph node and counting its exceptions."""
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed(NODE_LATENCY.labels(node=node)):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    ERRORS.labels(component=node, kind="exception").inc()
+                    raise
+        return wrapper
+    return decorate
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        (body, content type)
+
+    Raises:
+        MetricsUnavailable: If prometheus_client is not installed
+    """
+    if not PROMETHEUS_AVAILABLE:
+        raise MetricsUnavailable("prometheus_client is not installed (pip install prometheus-client)")
+
+    with _cache_lock:
+        for cache, counts in _cache_counts.items():
+            total = counts["hit"] + counts["miss"]
+            CACHE_HIT_RATIO.labels(cache=cache).set(counts["hit"] / total if total else 0.0)
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,188 @@
+"""
+Relevance-ranked source packing for the research notes prompt.
+
+Instead of capping every source at a fixed size, sources are split into
+passages, ranked with BM25 against the schema's field names and
+descriptions, and the highest-value passages are packed into one global
+token budget. Hangul text is indexed with character bigrams, so Korean
+compounds still match schema terms (e.g. "매출액" ↔ "매출").
+"""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple, Union
+
+from .tokens import count_tokens, count_tokens_uncached
+from .schema import CompiledSchema, compile_schema
+
+_WORD = re.compile(r"[가-힣]+|[a-zA-Z0-9]+")
+_HANGUL_RUN = re.compile(r"[가-힣]+")
+
+# BM25 parameters
+_K1 = 1.5
+_B = 0.75
+
+
+def tokenize_for_search(text: str) -> List[str]:
+    """
+    Tokenize text for lexical ranking.
+
+    Latin/numeric words are lower-cased; Hangul runs yield the whole word
+    plus its character bigrams.
+    """
+    terms: List[str] = []
+    for word in _WORD.findall(text.lower()):
+        terms.append(word)
+        if _HANGUL_RUN.fullmatch(word) and len(word) > 2:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def hard_split(unit: str, max_tokens: int) -> List[str]:
+    """
+    Cut a unit with no usable line/sentence break into pieces of at most
+    ``max_tokens`` tokens, preferring to cut at whitespace.
+    """
+    pieces: List[str] = []
+    start = 0
+    while start < len(unit):
+        # Longest prefix that fits (always at least one character)
+        low, high = start + 1, len(unit)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if count_tokens_uncached(unit[start:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        end = low
+        if end < len(unit):
+            space = unit.rfind(" ", start + 1, end)
+            if space > start:
+                end = space
+        piece = unit[start:end].strip()
+        if piece:
+            pieces.append(piece)
+        start = end
+    return pieces
+
+
+def split_passages(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into passages of at most ``max_tokens`` tokens on line/sentence
+    breaks; lines or sentences longer than that are cut at word or character
+    boundaries.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text] if text.strip() else []
+
+    units: List[str] = []
+    for unit in re.split(r"\n+|(?<=[.!?。])\s+", text):
+        unit = unit.strip()
+        if not unit:
+            continue
+        units.extend(hard_split(unit, max_tokens) if count_tokens(unit) > max_tokens else [unit])
+
+    passages: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = count_tokens(unit)
+        if current and current_tokens + unit_tokens > max_tokens:
+            passages.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def bm25_scores(query_terms: List[str], documents: List[List[str]]) -> List[float]:
+    """Score tokenized documents against query terms with Okapi BM25."""
+    if not documents:
+        return []
+
+    n_docs = len(documents)
+    avg_len = sum(len(doc) for doc in documents) / n_docs or 1.0
+    doc_freq: Counter = Counter()
+    for doc in documents:
+        doc_freq.update(set(doc))
+
+    query = set(query_terms)
+    idf = {
+        term: math.log(1 + (n_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+        for term in query if doc_freq[term]
+    }
+
+    scores = []
+    for doc in documents:
+        tf = Counter(doc)
+        norm = _K1 * (1 - _B + _B * len(doc) / avg_len)
+        score = 0.0
+        for term, weight in idf.items():
+            freq = tf.get(term, 0)
+            if freq:
+                score += weight * freq * (_K1 + 1) / (freq + norm)
+        scores.append(score)
+    return scores
+
+
+def pack_sources(
+    sources: List[Dict[str, Any]],
+    schema: Union[Dict[str, Any], CompiledSchema],
+    token_budget: int = 8000,
+    passage_tokens: int = 300
+) -> str:
+    """
+    Format sources for the notes prompt within a global token budget.
+
+    Passages are ranked by BM25 relevance to the schema and selected
+    greedily until the budget is spent. Each source's title/URL header is
+    charged against the budget the first time one of its passages is
+    selected. Output keeps source order and passage order.
+
+    Args:
+        sources: Deduplicated search results
+        schema: Extraction schema or its compiled form (ranking query)
+        token_budget: Maximum tokens of packed source text
+        passage_tokens: Target passage size in tokens
+
+    Returns:
+        Formatted source text
+    """
+    passages: List[Tuple[int, int, str]] = []  # (source index, passage index, text)
+    for source_index, source in enumerate(sources):
+        text = source.get("raw_content") or source.get("content") or ""
+        for passage_index, passage in enumerate(split_passages(text, passage_tokens)):
+            passages.append((source_index, passage_index, passage))
+
+    if not passages:
+        return "Sources:\n\n(no content found)"
+
+    query_terms = tokenize_for_search(compile_schema(schema).query_text)
+    scores = bm25_scores(query_terms, [tokenize_for_search(p[2]) for p in passages])
+
+    # Highest score first; ties keep the original (provider rank) order
+    ranked = sorted(range(len(passages)), key=lambda i: (-scores[i], i))
+
+    selected: Dict[int, List[Tuple[int, str]]] = {}
+    remaining = token_budget
+    for i in ranked:
+        source_index, passage_index, text = passages[i]
+        cost = count_tokens(text)
+        if source_index not in selected:
+            source = sources[source_index]
+            cost += count_tokens(f"{source.get('title', '')} {source.get('url', '')}") + 10
+        if cost > remaining:
+            continue
+        selected.setdefault(source_index, []).append((passage_index, text))
+        remaining -= cost
+
+    formatted = "Sources:\n\n"
+    for source_index in sorted(selected):
+        source = sources[source_index]
+        content = "\n...\n".join(text for _, text in sorted(selected[source_index]))
+        formatted += f"Source {source.get('title', '')}:\n===\n"
+        formatted += f"URL: {source.get('url', '')}\n===\n"
+        formatted += f"Most relevant content from source: {content}\n===\n\n"
+    return formatted.strip()
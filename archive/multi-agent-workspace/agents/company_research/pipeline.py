@@ -0,0 +1,256 @@
+"""
+Staged pipeline for researching many companies at once.
+
+``graph.ainvoke`` runs research → extraction → reflection for one company
+per worker, so a batch can only size "companies in flight": while research
+waits on search APIs the extraction LLM capacity sits idle, and vice versa.
+``StagePipeline`` gives every stage its own worker pool and a bounded input
+queue instead:
+
+    admit ─▶ research ─▶ extraction ─▶ reflection ─▶ done
+                ▲                           │
+                └──── follow-up iteration ──┘
+
+- Company B's research overlaps company A's extraction and reflection.
+- A full queue blocks the workers of the stage feeding it, and ultimately
+  the reader of the company list (backpressure instead of unbounded
+  buffering).
+- Follow-up iterations re-enter research ahead of new companies and never
+  wait for queue space: reflection cannot block on research, so the cycle
+  cannot deadlock, and started companies finish before new ones are
+  admitted.
+
+Nodes run directly on each company's state (no graph checkpoints).
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+from .configuration import Configuration
+from .extraction import extraction_node
+from .graph import should_continue
+from .metrics import STAGE_BUSY_WORKERS, STAGE_QUEUE_DEPTH
+from .reflection import reflection_node
+from .research import research_node
+from .state import ResearchState
+
+StageRunner = Callable[[ResearchState], Awaitable[Dict[str, Any]]]
+
+
+class StageQueue:
+    """
+    Bounded FIFO with an unbounded priority lane.
+
+    ``put`` waits while ``capacity`` regular items are queued;
+    ``put_priority`` never waits and its items are taken first.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._items: Deque[Any] = deque()
+        self._priority: Deque[Any] = deque()
+        self._changed = asyncio.Condition()
+
+    def qsize(self) -> int:
+        return len(self._items) + len(self._priority)
+
+    async def put(self, item: Any) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: len(self._items) < self.capacity)
+            self._items.append(item)
+            self._changed.notify_all()
+
+    async def put_priority(self, item: Any) -> None:
+        async with self._changed:
+            self._priority.append(item)
+            self._changed.notify_all()
+
+    async def get(self) -> Any:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._items or self._priority)
+            item = self._priority.popleft() if self._priority else self._items.popleft()
+            self._changed.notify_all()
+            return item
+
+
+class PipelineStage:
+    """
+    One stage: a worker pool draining a bounded queue.
+
+    Args:
+        name: Stage name (metrics label, ``stage_seconds`` key)
+        run: Coroutine function returning a state update (like a graph node)
+        workers: Items processed concurrently
+        capacity: Items that may wait in the queue (default ``2 * workers``)
+    """
+
+    def __init__(self, name: str, run: StageRunner, workers: int = 1, capacity: Optional[int] = None):
+        self.name = name
+        self.run = run
+        self.workers = max(1, workers)
+        self.queue = StageQueue(capacity or self.workers * 2)
+        self.busy = 0
+
+    def observe(self) -> None:
+        STAGE_QUEUE_DEPTH.labels(stage=self.name).set(self.queue.qsize())
+        STAGE_BUSY_WORKERS.labels(stage=self.name).set(self.busy)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"workers": self.workers, "busy": self.busy, "queued": self.queue.qsize()}
+
+
+class PipelineItem:
+    """A company moving through the pipeline with its graph state."""
+
+    def __init__(self, key: str, state: ResearchState):
+        self.key = key
+        self.state = state
+        self.started = time.monotonic()
+        self.error: Optional[str] = None
+        self.stage_seconds: Dict[str, float] = {}
+
+    def apply(self, update: Dict[str, Any]) -> None:
+        """Merge a node's update like the graph does (``messages`` are appended)."""
+        for key, value in update.items():
+            if key == "messages":
+                self.state["messages"] = list(self.state.get("messages", [])) + list(value)
+            else:
+                self.state[key] = value
+
+
+class StagePipeline:
+    """
+    Run items through stages with independent worker pools.
+
+    Args:
+        stages: Stages in order; each item goes through all of them
+        route: Called after the last stage; returns the name of the stage
+            to re-enter (ahead of new items) or None when the item is done
+        on_done: Called once per finished or failed item
+    """
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        route: Callable[[ResearchState], Optional[str]],
+        on_done: Callable[[PipelineItem], Awaitable[None]]
+    ):
+        self.stages = stages
+        self.route = route
+        self.on_done = on_done
+        self._by_name = {stage.name: stage for stage in stages}
+        self._in_flight = 0
+        self._admitting = True
+        self._drained = asyncio.Event()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {stage.name: stage.snapshot() for stage in self.stages}
+
+    def describe(self) -> str:
+        """One-line stage status for progress output."""
+        return " ".join(
+            f"{stage.name}={stage.busy}/{stage.workers}+{stage.queue.qsize()}q" for stage in self.stages
+        )
+
+    async def run(self, items: AsyncIterator[PipelineItem]) -> None:
+        """
+        Admit ``items`` as the first stage has room and wait until all are done.
+        """
+        workers = [
+            asyncio.ensure_future(self._worker(index))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+        try:
+            first = self.stages[0]
+            async for item in items:
+                self._in_flight += 1
+                await first.queue.put(item)
+                first.observe()
+            self._admitting = False
+            if self._in_flight == 0:
+                self._drained.set()
+            await self._drained.wait()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _worker(self, index: int) -> None:
+        stage = self.stages[index]
+        while True:
+            item = await stage.queue.get()
+            stage.busy += 1
+            stage.observe()
+            started = time.monotonic()
+            target = None
+            try:
+                item.apply(await stage.run(item.state))
+                if index + 1 == len(self.stages):
+                    target = self.route(item.state)
+            except Exception as e:
+                print(f"[pipeline] {item.key} failed in {stage.name}: {e}")
+                item.error = str(e)
+            finally:
+                item.stage_seconds[stage.name] = item.stage_seconds.get(stage.name, 0.0) + time.monotonic() - started
+                stage.busy -= 1
+                stage.observe()
+
+            if item.error is not None:
+                await self._finish(item)
+            elif index + 1 < len(self.stages):
+                # Blocks while the next stage is saturated (backpressure)
+                following = self.stages[index + 1]
+                await following.queue.put(item)
+                following.observe()
+            elif target is not None:
+                await self._by_name[target].queue.put_priority(item)
+                self._by_name[target].observe()
+            else:
+                await self._finish(item)
+
+    async def _finish(self, item: PipelineItem) -> None:
+        try:
+            await self.on_done(item)
+        except Exception as e:
+            print(f"[pipeline] result handler failed for {item.key}: {e}")
+        self._in_flight -= 1
+        if not self._admitting and self._in_flight == 0:
+            self._drained.set()
+
+
+def research_stages(
+    config: Configuration,
+    research_workers: int = 5,
+    extraction_workers: int = 5,
+    reflection_workers: int = 5,
+    queue_size: Optional[int] = None
+) -> List[PipelineStage]:
+    """
+    The research graph's nodes as pipeline stages.
+
+    Args:
+        config: Agent configuration
+        research_workers: Companies searching and summarizing at once
+        extraction_workers: Companies in extraction at once
+        reflection_workers: Companies in reflection at once
+        queue_size: Queue capacity per stage (default twice its workers)
+
+    Returns:
+        Stages for ``StagePipeline`` (route with ``next_stage``)
+    """
+    return [
+        PipelineStage("research", lambda state: research_node(state, config), research_workers, queue_size),
+        PipelineStage("extraction", lambda state: extraction_node(state, config), extraction_workers, queue_size),
+        PipelineStage("reflection", lambda state: reflection_node(state, config), reflection_workers, queue_size),
+    ]
+
+
+def next_stage(state: ResearchState) -> Optional[str]:
+    """Route after reflection, as the graph does: back to research or done."""
+    return "research" if should_continue(state) == "research" else None
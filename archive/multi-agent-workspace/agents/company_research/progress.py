@@ -0,0 +1,32 @@
+"""
+Progress events for the research agent.
+
+Nodes call ``emit_progress`` at notable points (queries generated, each
+search finished, notes ready). Events go to the reporter installed for the
+current context, e.g. an A2A task streaming updates over SSE; without a
+reporter they are dropped at no cost.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+ProgressReporter = Callable[[str, Dict[str, Any]], None]
+
+_reporter: ContextVar[Optional[ProgressReporter]] = ContextVar("progress_reporter", default=None)
+
+
+def emit_progress(event: str, **data: Any) -> None:
+    """Send a progress event to the current reporter, if any."""
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter(event, data)
+
+
+@contextmanager
+def progress_reporter(reporter: ProgressReporter) -> Iterator[None]:
+    """Install ``reporter`` for code run inside the ``with`` block."""
+    token = _reporter.set(reporter)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
@@ -0,0 +1,188 @@
+"""
+Prompt assembly for provider prompt caching.
+
+Providers cache prompt prefixes: Anthropic caches up to explicit
+``cache_control`` breakpoints, DeepSeek (and OpenAI) cache the longest
+previously seen prefix automatically. Both only help when the beginning of
+the prompt is byte-identical across calls, so every stage prompt is laid
+out as:
+
+    system: static instructions + schema      ← same for the whole batch
+            [cache breakpoint]
+    user:   per-company values (name, sources, notes, ...)
+
+``build_chain`` assembles ``prompt | breakpoints | llm | usage | parser``.
+The usage step reads cache-hit token counts from each response and adds
+them to ``get_prompt_cache_stats()`` and an ``llm_usage`` progress event.
+"""
+import threading
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.prompt_values import PromptValue
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from .configuration import Configuration
+from .progress import emit_progress
+from .metrics import LLM_TOKENS
+from .rate_limit import get_llm_rate_limiter
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def cache_mode(config: Configuration) -> str:
+    """Resolve ``config.prompt_cache`` to anthropic, automatic or off."""
+    if config.prompt_cache != "auto":
+        return config.prompt_cache
+    if config.llm_model.startswith("claude"):
+        return "anthropic"
+    return "automatic"
+
+
+def build_prompt(system_template: str, input_template: str) -> ChatPromptTemplate:
+    """Chat prompt with the static system prefix first and per-call input last."""
+    return ChatPromptTemplate.from_messages([
+        ("system", system_template),
+        ("human", input_template)
+    ])
+
+
+def add_cache_breakpoints(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Mark the end of the system prefix with an Anthropic ``cache_control`` block.
+
+    The last system message is converted to content blocks with the
+    breakpoint on its final block; other messages are unchanged.
+    """
+    last_system = max(
+        (i for i, message in enumerate(messages) if isinstance(message, SystemMessage)),
+        default=None
+    )
+    if last_system is None:
+        return messages
+
+    message = messages[last_system]
+    if isinstance(message.content, str):
+        blocks: List[Any] = [{"type": "text", "text": message.content}]
+    else:
+        blocks = [dict(block) if isinstance(block, dict) else {"type": "text", "text": block}
+                  for block in message.content]
+    if not blocks:
+        return messages
+    blocks[-1]["cache_control"] = CACHE_CONTROL
+
+    marked = list(messages)
+    marked[last_system] = SystemMessage(content=blocks)
+    return marked
+
+
+def usage_from_message(message: Any) -> Dict[str, int]:
+    """
+    Read input/cache token counts from an LLM response.
+
+    Understands LangChain ``usage_metadata`` (Anthropic cache_read /
+    cache_creation details) and the raw DeepSeek/OpenAI ``token_usage``
+    fields (``prompt_cache_hit_tokens``, ``prompt_tokens_details.cached_tokens``).
+    """
+    usage = {"input_tokens": 0, "output_tokens": 0, "cache_read_tokens": 0, "cache_creation_tokens": 0}
+
+    metadata = getattr(message, "usage_metadata", None) or {}
+    usage["input_tokens"] = metadata.get("input_tokens", 0) or 0
+    usage["output_tokens"] = metadata.get("output_tokens", 0) or 0
+    details = metadata.get("input_token_details") or {}
+    usage["cache_read_tokens"] = details.get("cache_read", 0) or 0
+    usage["cache_creation_tokens"] = details.get("cache_creation", 0) or 0
+
+    if not usage["cache_read_tokens"]:
+        response_metadata = getattr(message, "response_metadata", None) or {}
+        token_usage = response_metadata.get("token_usage") or response_metadata.get("usage") or {}
+        usage["cache_read_tokens"] = (
+            token_usage.get("prompt_cache_hit_tokens")
+            or (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+            or token_usage.get("cache_read_input_tokens")
+            or 0
+        )
+        if not usage["input_tokens"]:
+            usage["input_tokens"] = token_usage.get("prompt_tokens") or token_usage.get("input_tokens") or 0
+    return usage
+
+
+class PromptCacheStats:
+    """Process-wide token counters per LLM stage."""
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, usage: Dict[str, int]) -> None:
+        with self._lock:
+            totals = self._stages.setdefault(stage, {"calls": 0, **{k: 0 for k in usage}})
+            totals["calls"] += 1
+            for name, value in usage.items():
+                totals[name] = totals.get(name, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Totals per stage plus the share of input tokens served from cache."""
+        with self._lock:
+            stages = {stage: dict(totals) for stage, totals in self._stages.items()}
+        for totals in stages.values():
+            input_tokens = totals.get("input_tokens", 0)
+            totals["cache_hit_ratio"] = (
+                totals.get("cache_read_tokens", 0) / input_tokens if input_tokens else 0.0
+            )
+        return stages
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+
+_stats = PromptCacheStats()
+
+
+def get_prompt_cache_stats() -> PromptCacheStats:
+    return _stats
+
+
+def build_chain(
+    prompt: ChatPromptTemplate,
+    llm: Any,
+    config: Configuration,
+    stage: str,
+    parser: Optional[Runnable] = None
+) -> Runnable:
+    """
+    Assemble a stage chain with cache breakpoints and usage reporting.
+
+    Args:
+        prompt: Prompt from ``build_prompt`` (static system prefix first)
+        llm: Chat model
+        config: Agent configuration (``prompt_cache``)
+        stage: Stage name used in usage stats and progress events
+        parser: Optional output parser applied last
+
+    Returns:
+        Runnable taking the template variables
+    """
+    def to_messages(value: PromptValue) -> List[BaseMessage]:
+        messages = value.to_messages()
+        if cache_mode(config) == "anthropic":
+            messages = add_cache_breakpoints(messages)
+        return messages
+
+    def record_usage(message: Any) -> Any:
+        usage = usage_from_message(message)
+        _stats.record(stage, usage)
+        for name, value in usage.items():
+            if value:
+                LLM_TOKENS.labels(stage=stage, kind=name[:-len("_tokens")]).inc(value)
+        # Input tokens were reserved from an estimate; output is only known now
+        get_llm_rate_limiter(config).charge_tokens(usage["output_tokens"])
+        emit_progress("llm_usage", stage=stage, **usage)
+        return message
+
+    chain = prompt | RunnableLambda(to_messages) | llm | RunnableLambda(record_usage)
+    if parser is not None:
+        chain = chain | parser
+    return chain
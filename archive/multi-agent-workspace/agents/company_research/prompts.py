@@ -2,40 +2,41 @@
 Prompt templates for the research agent.
 
 All prompts are centralized here for easy maintenance, version control, and testing.
+
+Each stage has a system prompt holding only values that are the same for a
+whole batch (instructions, schema) and an ``*_INPUT`` user message holding
+the per-company values. Keeping the static part first lets providers reuse
+their prompt prefix cache across companies (see prompt_layout.py).
 """
 
 # Query Generation Prompt
 QUERY_WRITER_PROMPT = """You are a search query expert specializing in researching private SME (small-to-mid-sized enterprise) companies.
 
-Target Company: {company_name}
-
-You need to generate at most {max_search_queries} targeted search queries to gather the following information:
+You need to generate at most {max_search_queries} targeted search queries about the target company to gather the following information:
 
 <schema>
 {schema}
 </schema>
 
-<user_context>
-{user_context}
-</user_context>
-
 IMPORTANT - Search Strategy for Private SMEs:
 Private SMEs often lack direct public information. Use these strategies:
 
 1. **Direct Sources**:
-   - Company official website: "{company_name} 회사 소개"
-   - News and press releases: "{company_name} 뉴스"
-   - Job postings: "{company_name} 채용"
+   - Company official website: "<company> 회사 소개"
+   - News and press releases: "<company> 뉴스"
+   - Job postings: "<company> 채용"
 
 2. **Indirect Sources** (CRITICAL for private SMEs):
-   - Public company disclosures: "{company_name} 상장사 공시 거래처"
-   - Government procurement: "{company_name} 정부 발주"
-   - VC portfolios: "{company_name} 투자 유치"
-   - Industry reports: "{company_name} 업종 분석"
+   - Public company disclosures: "<company> 상장사 공시 거래처"
+   - Government procurement: "<company> 정부 발주"
+   - VC portfolios: "<company> 투자 유치"
+   - Industry reports: "<company> 업종 분석"
 
 3. **B2B Context**:
-   - Customer references: "{company_name} 납품 실적"
-   - Partner announcements: "{company_name} 파트너십"
+   - Customer references: "<company> 납품 실적"
+   - Partner announcements: "<company> 파트너십"
+
+(<company> stands for the target company name.)
 
 Your queries should:
 1. Focus on factual, up-to-date company information
@@ -47,9 +48,13 @@ Your queries should:
 Return ONLY a JSON array of query strings:
 ["query 1", "query 2", "query 3"]"""
 
+QUERY_WRITER_INPUT = """Target Company: {company_name}
+{user_context}
+Generate search queries for: {company_name}"""
+
 
 # Research Notes Prompt
-INFO_PROMPT = """You are conducting web research on a company: {company_name}
+INFO_PROMPT = """You are conducting web research on a company.
 
 This company is likely a private SME (non-listed, small-to-mid-sized). Information may be limited.
 
@@ -59,15 +64,7 @@ The following schema shows the type of information we're interested in:
 {schema}
 </schema>
 
-You have just scraped website content. Your task is to take clear, organized notes about the company, focusing on topics relevant to our interests.
-
-<Website contents>
-{content}
-</Website contents>
-
-<user_context>
-{user_context}
-</user_context>
+You have just scraped website content (given in the user message). Your task is to take clear, organized notes about the company, focusing on topics relevant to our interests.
 
 Please provide detailed research notes that:
 1. Are well-organized and easy to read
@@ -81,20 +78,28 @@ Please provide detailed research notes that:
 
 Remember: Don't try to format the output to match the schema - just take clear notes that capture all relevant information."""
 
+INFO_INPUT = """Company: {company_name}
+
+<Website contents>
+{content}
+</Website contents>
+
+<user_context>
+{user_context}
+</user_context>
+
+Create research notes for {company_name}."""
+
 
 # Extraction Prompt
 EXTRACTION_PROMPT = """You are a data extraction specialist for private SME company research.
 
-Your task is to extract company information from research notes according to the provided JSON schema.
+Your task is to extract company information from research notes (given in the user message) according to the provided JSON schema.
 
 <schema>
 {schema}
 </schema>
 
-<research_notes>
-{notes}
-</research_notes>
-
 Instructions:
 1. Extract information that matches the schema fields
 2. Use null for fields where information is not available
@@ -110,28 +115,22 @@ IMPORTANT - Source Quality:
 
 Return ONLY valid JSON matching the schema structure."""
 
+EXTRACTION_INPUT = """<research_notes>
+{notes}
+</research_notes>
+
+Extract structured data for {company_name}."""
+
 
 # Reflection Prompt
 REFLECTION_PROMPT = """You are a research quality analyst specializing in private SME company research.
 
-Compare the extracted information with the required schema:
+Compare the extracted information (given in the user message) with the required schema:
 
 <schema>
 {schema}
 </schema>
 
-<extracted_info>
-{extracted_info}
-</extracted_info>
-
-<missing_fields>
-{missing_fields}
-</missing_fields>
-
-<previous_research_notes>
-{notes}
-</previous_research_notes>
-
 Tasks:
 1. Identify which missing fields are most important
 2. Determine why information might be missing (common for private SMEs)
@@ -158,3 +157,17 @@ Return JSON with:
     "follow_up_queries": ["specific query 1", "specific query 2"],
     "is_complete": false
 }}"""
+
+REFLECTION_INPUT = """<extracted_info>
+{extracted_info}
+</extracted_info>
+
+<missing_fields>
+{missing_fields}
+</missing_fields>
+
+<previous_research_notes>
+{notes}
+</previous_research_notes>
+
+Analyze extraction quality for {company_name}."""
@@ -0,0 +1,195 @@
+"""
+Cross-iteration query memory.
+
+Reflection's follow-up queries often restate queries that already ran,
+and LLM-written query lists contain near-paraphrases
+("삼성전자 매출" / "삼성전자의 매출액"). Every paid search that returns the
+same sources is wasted, so before queries reach the provider they are
+compared against
+
+1. queries executed in earlier iterations (``state["executed_queries"]``)
+2. queries already accepted in the current batch
+
+using the larger of two similarities on the normalized query with the
+company name and trailing Korean particles removed (the name appears in
+every query). Queries whose numbers differ ("매출 2023" / "매출 2024")
+are never similar, however much of the text they share.
+
+- token-set Jaccard (word reordering, repeated words)
+- character bigram Jaccard over the text without spaces (Korean spacing
+  and particle variants)
+
+Executed queries also record fingerprints of their result URLs and how
+many were new. Neighbours of an *exhausted* query (one that found nothing
+new) are filtered with a lower threshold, since paraphrasing it is
+unlikely to surface new sources either.
+"""
+import hashlib
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .search_cache import normalize_query
+
+_WORD = re.compile(r"[가-힣]+|[^\W_]+")
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Trailing particles stripped from Hangul words ("매출액의" → "매출액"), longest
+# first. Words must keep at least 3 syllables, so nouns ending in a
+# particle-like syllable survive ("경기도", "한국이") at the cost of missing
+# short variants ("매출의"), which the bigram similarity still catches.
+_PARTICLES = ("에서", "으로", "의", "은", "는", "이", "가", "을", "를", "에", "와", "과", "로", "도")
+
+# Threshold reduction for neighbours of queries that found no new sources
+EXHAUSTED_MARGIN = 0.2
+
+
+def query_tokens(text: str) -> List[str]:
+    """Words of a normalized query (Hangul runs and alphanumerics)."""
+    return _WORD.findall(normalize_query(text))
+
+
+def _strip_particle(token: str) -> str:
+    for particle in _PARTICLES:
+        if len(token) > len(particle) + 2 and token.endswith(particle) and "가" <= token[0] <= "힣":
+            return token[:-len(particle)]
+    return token
+
+
+def char_bigrams(text: str) -> FrozenSet[str]:
+    compact = "".join(text.split())
+    if len(compact) < 2:
+        return frozenset([compact]) if compact else frozenset()
+    return frozenset(compact[i:i + 2] for i in range(len(compact) - 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def result_fingerprint(result: Dict[str, Any]) -> str:
+    """Short stable fingerprint of a result's URL (scheme, www and trailing slash ignored)."""
+    parsed = urlparse(result.get("url", "").strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    key = f"{host}{parsed.path.rstrip('/')}?{parsed.query}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class QuerySignature:
+    """Token set and character bigrams of a query, company name removed."""
+
+    def __init__(self, query: str, company_name: str):
+        normalized = normalize_query(query)
+        if company_name and company_name in normalized:
+            normalized = normalized.replace(company_name, " ")
+        remainder = [_strip_particle(token) for token in query_tokens(normalized) if token not in _PARTICLES]
+        remainder = remainder or query_tokens(query)
+        self.tokens = frozenset(remainder)
+        self.bigrams = char_bigrams(" ".join(remainder))
+        self.numbers = frozenset(_NUMBER.findall(normalized))
+
+    def similarity(self, other: "QuerySignature") -> float:
+        # Different years, quarters or amounts ask for different facts
+        if self.numbers != other.numbers:
+            return 0.0
+        return max(jaccard(self.tokens, other.tokens), jaccard(self.bigrams, other.bigrams))
+
+
+class QueryFilter:
+    """
+    Drop queries redundant with executed or already accepted ones.
+
+    Args:
+        company_name: Company the queries are about
+        executed: ``executed_queries`` records from earlier iterations
+        threshold: Similarity at or above which a query is redundant
+            (1.0 only drops exact repeats after normalization)
+    """
+
+    def __init__(self, company_name: str, executed: Iterable[Dict[str, Any]], threshold: float = 0.8):
+        self.threshold = threshold
+        self.company_name = normalize_query(company_name)
+        self._known: List[Tuple[str, QuerySignature, float]] = []
+        for record in executed:
+            exhausted = record.get("results", 0) > 0 and record.get("new_results", 0) == 0
+            self._remember(record["query"], threshold - EXHAUSTED_MARGIN if exhausted else threshold)
+
+    def _remember(self, query: str, threshold: float) -> None:
+        self._known.append((query, QuerySignature(query, self.company_name), threshold))
+
+    def match(self, query: str) -> Optional[str]:
+        """Return the known query that makes ``query`` redundant, if any."""
+        signature = QuerySignature(query, self.company_name)
+        for known, known_signature, threshold in self._known:
+            if signature.similarity(known_signature) >= threshold:
+                return known
+        return None
+
+    def filter(self, queries: Iterable[str]) -> Tuple[List[str], List[Dict[str, str]]]:
+        """
+        Keep the first of each group of redundant queries.
+
+        Returns:
+            (kept queries in order, dropped entries as ``{"query", "duplicate_of"}``)
+        """
+        kept: List[str] = []
+        dropped: List[Dict[str, str]] = []
+        for query in queries:
+            query = " ".join(query.split())
+            if not query:
+                continue
+            duplicate_of = self.match(query)
+            if duplicate_of is not None:
+                dropped.append({"query": query, "duplicate_of": duplicate_of})
+                continue
+            kept.append(query)
+            self._remember(query, self.threshold)
+        return kept, dropped
+
+
+def record_executions(
+    queries: List[str],
+    batches: List[Optional[List[Dict[str, Any]]]],
+    previous_results: List[Dict[str, Any]],
+    executed: List[Dict[str, Any]],
+    iteration: int
+) -> List[Dict[str, Any]]:
+    """
+    Build ``executed_queries`` records for one iteration's searches.
+
+    A result counts as new when its fingerprint appeared neither in earlier
+    sources nor in earlier executed queries.
+
+    Args:
+        queries: Queries sent to the provider
+        batches: Results per query (aligned with ``queries``; None for
+            failed queries, which are not recorded so they can be retried)
+        previous_results: Sources from earlier iterations
+        executed: Records from earlier iterations
+        iteration: Current iteration number
+
+    Returns:
+        New records (one per successful query)
+    """
+    seen = {result_fingerprint(result) for result in previous_results}
+    for record in executed:
+        seen.update(record.get("fingerprints", []))
+
+    records = []
+    for query, batch in zip(queries, batches):
+        if batch is None:
+            continue
+        fingerprints = list(dict.fromkeys(result_fingerprint(result) for result in batch))
+        records.append({
+            "query": query,
+            "iteration": iteration,
+            "results": len(batch),
+            "new_results": sum(1 for fingerprint in fingerprints if fingerprint not in seen),
+            "fingerprints": fingerprints
+        })
+    return records
@@ -0,0 +1,363 @@
+"""
+Process-wide rate limiting for LLM and search calls.
+
+Companies run concurrently, so per-call retries alone turn a provider's
+rate limit into a 429 storm. Every call instead goes through a shared
+``RateLimiter`` keyed by ``("llm", model)`` or ``("search", provider)``:
+
+- a requests-per-minute bucket and, for LLMs, a tokens-per-minute bucket
+  (input tokens are estimated up front, output tokens charged afterwards)
+- on 429 / ``Retry-After`` the limiter pauses *all* callers for the
+  advertised (or jittered exponential) delay, drains its request bucket
+  and halves its request rate; successes raise the rate back to the
+  configured limit, so high concurrency settles at the sustainable rate
+
+Limits come from ``Configuration.llm_requests_per_minute``,
+``llm_tokens_per_minute`` and ``search_requests_per_minute`` (search
+providers declare their own default, e.g. DuckDuckGo). Without a limit
+only the shared 429 pause applies.
+"""
+import asyncio
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .configuration import Configuration
+from .metrics import ERRORS, RATE_LIMIT_WAIT
+
+R = TypeVar("R")
+
+# Seconds of traffic a bucket may burst after being idle
+BURST_SECONDS = 10.0
+# Backoff for 429s without Retry-After: base * 2**attempt, capped
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Upper bound for advertised Retry-After values
+RETRY_AFTER_MAX = 120.0
+# Request rate never drops below this share of the configured limit
+MIN_RATE_SHARE = 0.1
+# Share of the configured limit regained per successful call
+RECOVERY_SHARE = 0.05
+
+RATE_LIMIT_STATUS = (429, 529)
+# Fallback for errors without a status code; "429" must stand alone, not
+# be part of a URL, path or id
+_RATE_LIMIT_TEXT = re.compile(
+    r"(?<![\w./-])429(?![\w./-])|\b(?:rate[ _-]?limit\w*|too many requests|overloaded)\b",
+    re.IGNORECASE
+)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    ``reserve`` debits immediately and returns how long the caller must
+    wait, so concurrent callers queue up in arrival order without holding
+    a lock across ``await``. Amounts larger than the burst capacity are
+    admitted from a full bucket and paid back by later callers.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.limit = per_minute / 60.0
+        self.rate = self.limit
+        self.capacity = max(1.0, self.limit * burst_seconds)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Debit ``amount`` and return the wait in seconds before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            excess = max(0.0, amount - self.capacity)
+            return max(0.0, -self._tokens - excess) / self.rate
+
+    def charge(self, amount: float) -> None:
+        """Debit ``amount`` after the fact (e.g. output tokens), without waiting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+
+    def slow_down(self) -> None:
+        """Drain the bucket and halve the refill rate."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+            self.rate = max(self.limit * MIN_RATE_SHARE, self.rate / 2)
+
+    def set_limit(self, per_minute: float, burst_seconds: float = BURST_SECONDS) -> None:
+        """
+        Change the limit in place: tokens already spent stay spent and a
+        backed-off rate keeps its share of the new limit.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            limit = per_minute / 60.0
+            self.rate = limit * (self.rate / self.limit)
+            self.limit = limit
+            self.capacity = max(1.0, limit * burst_seconds)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def recover(self) -> None:
+        """Raise the refill rate back towards the configured limit."""
+        if self.rate < self.limit:
+            with self._lock:
+                self._refill(time.monotonic())
+                self.rate = min(self.limit, self.rate + self.limit * RECOVERY_SHARE)
+
+
+def _reconfigured(bucket: Optional[TokenBucket], per_minute: Optional[float]) -> Optional[TokenBucket]:
+    if not per_minute:
+        return None
+    if bucket is None:
+        return TokenBucket(per_minute)
+    bucket.set_limit(per_minute)
+    return bucket
+
+
+class RateLimiter:
+    """
+    Request and token buckets plus a shared 429 pause for one model or provider.
+
+    Args:
+        name: Limiter name used in logs and metrics (e.g. ``llm:deepseek-chat``)
+        requests_per_minute: Request limit (None = unlimited)
+        tokens_per_minute: Token limit (None = unlimited)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None
+    ):
+        self.name = name
+        self.requests: Optional[TokenBucket] = None
+        self.tokens: Optional[TokenBucket] = None
+        self._limits: Tuple[Optional[float], Optional[float]] = (None, None)
+        self._paused_until = 0.0
+        self.configure(requests_per_minute, tokens_per_minute)
+
+    def configure(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]) -> None:
+        """
+        Change the limits (no-op when unchanged).
+
+        Existing buckets are adjusted in place rather than replaced, so a
+        caller with different limits cannot hand out a fresh full bucket.
+        """
+        if (requests_per_minute, tokens_per_minute) == self._limits:
+            return
+        self._limits = (requests_per_minute, tokens_per_minute)
+        self.requests = _reconfigured(self.requests, requests_per_minute)
+        self.tokens = _reconfigured(self.tokens, tokens_per_minute)
+
+    @property
+    def limits_tokens(self) -> bool:
+        return self.tokens is not None
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait for a request slot (and ``tokens`` of token budget).
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            # Jitter so callers released by the same pause don't stampede
+            delay = pause + random.uniform(0, min(1.0, pause))
+            await asyncio.sleep(delay)
+            waited += delay
+
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        if delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+
+        if waited:
+            RATE_LIMIT_WAIT.labels(limiter=self.name).inc(waited)
+        return waited
+
+    def charge_tokens(self, tokens: int) -> None:
+        """Count tokens that were not known before the call (e.g. output)."""
+        if self.tokens is not None and tokens:
+            self.tokens.charge(tokens)
+
+    def rate_limited(self, delay: float) -> None:
+        """Pause every caller for ``delay`` seconds and back off the request rate."""
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        if self.requests is not None:
+            self.requests.slow_down()
+
+    def succeeded(self) -> None:
+        if self.requests is not None:
+            self.requests.recover()
+
+
+_LIMITERS: Dict[Tuple[str, str], RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(
+    kind: str,
+    name: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None
+) -> RateLimiter:
+    """
+    Get the process-wide limiter for ``(kind, name)``.
+
+    Later calls with different limits reconfigure the shared limiter.
+    """
+    key = (kind, name)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = RateLimiter(f"{kind}:{name}", requests_per_minute, tokens_per_minute)
+            _LIMITERS[key] = limiter
+        else:
+            limiter.configure(requests_per_minute, tokens_per_minute)
+        return limiter
+
+
+def get_llm_rate_limiter(config: Configuration) -> RateLimiter:
+    """Shared limiter for ``config.llm_model``."""
+    return get_rate_limiter(
+        "llm",
+        config.llm_model,
+        config.llm_requests_per_minute,
+        config.llm_tokens_per_minute
+    )
+
+
+def clear_rate_limiters() -> None:
+    """Drop all limiters (mainly for tests and reconfiguration)."""
+    with _LIMITERS_LOCK:
+        _LIMITERS.clear()
+
+
+def _error_chain(error: BaseException):
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    for candidate in (error, getattr(error, "response", None)):
+        for attribute in ("status_code", "status", "code"):
+            value = getattr(candidate, attribute, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Whether an exception (or its cause) is a 429/overloaded response.
+
+    A status code decides when present, then the exception type; the
+    message is only searched for errors that carry neither.
+    """
+    for exc in _error_chain(error):
+        status = _status_code(exc)
+        if status is not None:
+            if status in RATE_LIMIT_STATUS:
+                return True
+            continue
+        if "ratelimit" in type(exc).__name__.lower():
+            return True
+        if _RATE_LIMIT_TEXT.search(str(exc)):
+            return True
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Read the advertised delay from ``Retry-After`` (seconds or HTTP date)
+    or ``retry-after-ms`` headers, or a ``retry_after`` attribute.
+    """
+    for exc in _error_chain(error):
+        value = getattr(exc, "retry_after", None)
+        if isinstance(value, (int, float)):
+            return min(RETRY_AFTER_MAX, max(0.0, float(value)))
+
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        if not headers:
+            continue
+        try:
+            milliseconds = headers.get("retry-after-ms")
+            if milliseconds:
+                return min(RETRY_AFTER_MAX, float(milliseconds) / 1000)
+            seconds = headers.get("retry-after")
+            if seconds:
+                try:
+                    delay = float(seconds)
+                except ValueError:
+                    delay = parsedate_to_datetime(seconds).timestamp() - time.time()
+                return min(RETRY_AFTER_MAX, max(0.0, delay))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def backoff_delay(attempt: int, advertised: Optional[float] = None) -> float:
+    """Retry delay: the advertised delay plus jitter, else jittered exponential backoff."""
+    if advertised is not None:
+        return advertised + random.uniform(0, 1.0)
+    ceiling = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+async def call_with_rate_limit(
+    limiter: RateLimiter,
+    call: Callable[[], Awaitable[R]],
+    retries: int,
+    tokens: int = 0
+) -> R:
+    """
+    Run ``call`` within the limiter, retrying rate-limit errors.
+
+    Other exceptions propagate unchanged. A 429 pauses the whole limiter,
+    so concurrent callers wait instead of adding to the storm.
+
+    Args:
+        limiter: Shared limiter for the model or provider
+        call: Zero-argument coroutine function making one request
+        retries: Retries after the first rate-limited attempt
+        tokens: Estimated tokens for the token bucket
+
+    Returns:
+        Result of ``call``
+    """
+    attempt = 0
+    while True:
+        await limiter.acquire(tokens)
+        try:
+            result = await call()
+        except Exception as e:
+            if attempt >= retries or not is_rate_limit_error(e):
+                raise
+            delay = backoff_delay(attempt, retry_after(e))
+            attempt += 1
+            ERRORS.labels(component=limiter.name, kind="rate_limited").inc()
+            print(f"{limiter.name} rate limited, retrying in {delay:.1f}s ({attempt}/{retries})")
+            limiter.rate_limited(delay)
+            continue
+        limiter.succeeded()
+        return result
@@ -2,21 +2,24 @@
 Reflection phase: Evaluate extraction quality and generate follow-up queries.
 """
 from typing import Dict, Any, List
-import json
 from langchain_anthropic import ChatAnthropic
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
 from .configuration import Configuration
 from .state import ResearchState
-from .prompts import REFLECTION_PROMPT
-from src.common.utils import calculate_completeness, truncate_text
+from .prompts import REFLECTION_PROMPT, REFLECTION_INPUT
+from .llm_cache import cached_ainvoke
+from .prompt_layout import build_prompt, build_chain
+from .schema import compile_schema, render_json
+from .metrics import FALLBACKS, observe_node
+from .research import recent_notes
 from src.common.llm import get_llm_for_reflection
 
 
 # evaluate_completeness moved to utils.py
 
 
+@observe_node("reflection")
 async def reflection_node(state: ResearchState, config: Configuration) -> Dict[str, Any]:
     """
     Reflection phase node.
@@ -30,13 +33,13 @@ async def reflection_node(state: ResearchState, config: Configuration) -> Dict[s
     Returns:
         Updated state with reflection results
     """
-    schema = state["extraction_schema"]
+    schema = compile_schema(state["extraction_schema"])
     extracted = state["extracted_data"]
     company_name = state["company_name"]
     reflection_count = state.get("reflection_count", 0)
 
-    # Simple completeness check using utils
-    missing_fields, completeness_score = calculate_completeness(extracted, schema)
+    # Simple completeness check against the compiled schema
+    missing_fields, completeness_score = schema.completeness(extracted)
 
     # Early exit conditions
     if (
@@ -59,24 +62,23 @@ async def reflection_node(state: ResearchState, config: Configuration) -> Dict[s
     llm = get_llm_for_reflection(config)
 
     # Use centralized prompt template
-    reflection_prompt = ChatPromptTemplate.from_messages([
-        ("system", REFLECTION_PROMPT),
-        ("human", "Analyze extraction quality for {company_name}.")
-    ])
+    reflection_prompt = build_prompt(REFLECTION_PROMPT, REFLECTION_INPUT)
 
     parser = JsonOutputParser()
-    chain = reflection_prompt | llm | parser
+    chain = build_chain(reflection_prompt, llm, config, stage="reflection", parser=parser)
 
     try:
-        evaluation = await chain.ainvoke({
-            "schema": json.dumps(schema, indent=2),
-            "extracted_info": json.dumps(extracted, indent=2),
+        evaluation = await cached_ainvoke(chain, reflection_prompt, {
+            "schema": schema.prompt_json,
+            "extracted_info": render_json(extracted),
             "missing_fields": ", ".join(missing_fields),
-            "notes": truncate_text(state["research_notes"], max_length=2000),  # Use utils function
+            # Newest findings first: merged notes grow at the end
+            "notes": recent_notes(state["research_notes"], config.reflection_notes_tokens),
             "company_name": company_name
-        })
+        }, config, stage="reflection")
     except Exception as e:
         print(f"Reflection error: {e}")
+        FALLBACKS.labels(component="reflection", kind="assume_complete").inc()
         evaluation = {
             "analysis": "Error during reflection",
             "follow_up_queries": [],
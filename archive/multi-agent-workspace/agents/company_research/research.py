@@ -3,14 +3,25 @@ Research phase: Query generation and web search.
 """
 from typing import Dict, Any, List
 import json
+import re
 from langchain_anthropic import ChatAnthropic
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_community.tools.tavily_search import TavilySearchResults
 
 from .configuration import Configuration
 from .state import ResearchState
-from .prompts import QUERY_WRITER_PROMPT, INFO_PROMPT
-from src.common.utils import deduplicate_sources, format_sources, extract_field_descriptions
+from .prompts import QUERY_WRITER_PROMPT, QUERY_WRITER_INPUT, INFO_PROMPT, INFO_INPUT
+from .search_providers import get_search_provider, SearchProviderUnavailable
+from .llm_cache import cached_ainvoke
+from .prompt_layout import build_prompt, build_chain
+from .progress import emit_progress
+from .packing import hard_split, pack_sources
+from .tokens import count_tokens
+from .dedup import remove_near_duplicates, filter_seen_sources
+from .schema import compile_schema
+from .metrics import FALLBACKS, QUERIES_SKIPPED, observe_node
+from .query_memory import QueryFilter, record_executions
+from .coverage import CoverageEstimator, adaptive_max_results
+from .concurrency import EarlyStop
+from src.common.utils import deduplicate_sources
 from src.common.llm import get_llm_for_research
 
 
@@ -43,6 +54,51 @@ def parse_queries_from_response(response_text: str) -> List[str]:
     return queries[:10]  # Limit to 10 max
 
 
+def merge_notes(existing_notes: str, delta_notes: str, iteration: int) -> str:
+    """
+    Append notes for newly found sources to the existing notes.
+
+    Earlier notes are kept verbatim so facts found in previous iterations
+    are never lost; the delta is added as a labelled section.
+    """
+    if not existing_notes:
+        return delta_notes
+    if not delta_notes:
+        return existing_notes
+    return f"{existing_notes}\n\n## Additional findings (iteration {iteration})\n\n{delta_notes}"
+
+
+# Start of each section appended by merge_notes
+_FINDINGS_SECTION = re.compile(r"\n\n(?=## Additional findings \(iteration \d+\)\n)")
+
+
+def recent_notes(notes: str, max_tokens: int) -> str:
+    """
+    Notes within ``max_tokens``, keeping the newest findings.
+
+    Sections appended by ``merge_notes`` are taken newest first while they
+    fit; the first section that does not fit is cut to its beginning and
+    older notes are left out.
+    """
+    if count_tokens(notes) <= max_tokens:
+        return notes
+
+    kept: List[str] = []
+    remaining = max_tokens
+    for section in reversed(_FINDINGS_SECTION.split(notes)):
+        # One extra token for the blank line joining sections
+        cost = count_tokens(section) + 1
+        if cost <= remaining:
+            kept.append(section)
+            remaining -= cost
+            continue
+        if remaining > 1:
+            kept.append(hard_split(section, remaining - 1)[0])
+        break
+    return "\n\n".join(reversed(kept))
+
+
+@observe_node("research")
 async def research_node(state: ResearchState, config: Configuration) -> Dict[str, Any]:
     """
     Research phase node.
@@ -50,6 +106,13 @@ async def research_node(state: ResearchState, config: Configuration) -> Dict[str
     Generates targeted search queries based on schema requirements
     and executes web searches to gather information.
 
+    Follow-up iterations are incremental: sources accumulate across
+    iterations, only newly seen sources are summarized, and the delta
+    notes are appended to the existing notes. Queries that repeat an
+    executed query (or each other) are skipped before they reach the
+    provider, and with ``early_stop_coverage`` set, searches not sent yet
+    are skipped once the results cover the schema (see coverage.py).
+
     Args:
         state: Current research state
         config: Agent configuration
@@ -61,298 +124,159 @@ async def research_node(state: ResearchState, config: Configuration) -> Dict[str
     schema = state["extraction_schema"]
     user_context = state.get("user_context", "")
     follow_up_queries = state.get("follow_up_queries", [])
+    previous_results = state.get("search_results") or []
+    previous_notes = state.get("research_notes") or ""
+    executed_queries = state.get("executed_queries") or []
+    iteration = state.get("reflection_count", 0) + 1
 
     # Initialize LLM with rate limiting
     llm = get_llm_for_research(config)
 
-    # Extract schema fields for context
-    field_descriptions = extract_field_descriptions(schema)
+    # Schema rendering/field walks are compiled once per schema
+    compiled_schema = compile_schema(schema)
 
     # Generate search queries
     if follow_up_queries:
         # Use follow-up queries from reflection
-        queries = follow_up_queries[:config.max_search_queries]
+        queries = follow_up_queries
     else:
         # Generate initial queries using centralized prompt
-        query_prompt = ChatPromptTemplate.from_messages([
-            ("system", QUERY_WRITER_PROMPT),
-            ("human", "Generate search queries for: {company_name}")
-        ])
+        query_prompt = build_prompt(QUERY_WRITER_PROMPT, QUERY_WRITER_INPUT)
 
-        chain = query_prompt | llm
+        chain = build_chain(query_prompt, llm, config, stage="query_writer")
 
-        response = await chain.ainvoke({
+        response = await cached_ainvoke(chain, query_prompt, {
             "company_name": company_name,
             "max_search_queries": config.max_search_queries,
-            "schema": json.dumps(schema, indent=2),
+            "schema": compiled_schema.prompt_json,
             "user_context": f"\nAdditional context: {user_context}" if user_context else ""
-        })
+        }, config, stage="query_writer")
 
         queries = parse_queries_from_response(response.content)
 
-    # Execute web searches based on search_provider
-    all_results = []
-
-    if config.search_provider == "tavily":
-        # Use Tavily (paid, high quality)
-        search_tool = TavilySearchResults(
-            max_results=config.max_search_results,
-            search_depth="advanced",
-            include_raw_content=True
-        )
-
-        for query in queries[:config.max_search_queries]:
-            try:
-                results = await search_tool.ainvoke(query)
-                if isinstance(results, list):
-                    all_results.extend(results)
-                elif isinstance(results, dict):
-                    all_results.append(results)
-            except Exception as e:
-                print(f"Tavily search error for query '{query}': {e}")
-                continue
-
-    elif config.search_provider == "google_adk":
-        # Use Google ADK google_search (free with Gemini 2+)
-        try:
-            from langchain_google_genai import GoogleSearchAPIWrapper
-
-            google_search = GoogleSearchAPIWrapper()
-
-            for query in queries[:config.max_search_queries]:
-                try:
-                    # Google search returns string, need to structure it
-                    result_text = await google_search.arun(query)
-                    all_results.append({
-                        "title": f"Google Search: {query}",
-                        "content": result_text[:1000],  # Limit content
-                        "url": f"https://www.google.com/search?q={query.replace(' ', '+')}",
-                        "raw_content": result_text
-                    })
-                except Exception as e:
-                    print(f"Google ADK search error for query '{query}': {e}")
-                    continue
-
-        except ImportError:
-            print("Warning: langchain-google-genai not installed. Install with: pip install langchain-google-genai")
-            print("Falling back to Tavily...")
-            # Fallback to Tavily
-            search_tool = TavilySearchResults(
-                max_results=config.max_search_results,
-                search_depth="advanced"
-            )
-            for query in queries[:config.max_search_queries]:
-                try:
-                    results = await search_tool.ainvoke(query)
-                    if isinstance(results, list):
-                        all_results.extend(results)
-                except Exception as e:
-                    print(f"Fallback search error: {e}")
-                    continue
-
-    elif config.search_provider == "hybrid":
-        # Use Tavily for main queries, Google ADK for follow-up (cost optimization)
-        # First half with Tavily (high quality)
-        tavily_tool = TavilySearchResults(
-            max_results=config.max_search_results,
-            search_depth="advanced",
-            include_raw_content=True
-        )
-
-        mid_point = len(queries) // 2
-
-        # Tavily for first half
-        for query in queries[:mid_point]:
-            try:
-                results = await tavily_tool.ainvoke(query)
-                if isinstance(results, list):
-                    all_results.extend(results)
-            except Exception as e:
-                print(f"Tavily (hybrid) error for '{query}': {e}")
-                continue
-
-        # Google ADK for second half (free)
-        try:
-            from langchain_google_genai import GoogleSearchAPIWrapper
-            google_search = GoogleSearchAPIWrapper()
-
-            for query in queries[mid_point:config.max_search_queries]:
-                try:
-                    result_text = await google_search.arun(query)
-                    all_results.append({
-                        "title": f"Google Search: {query}",
-                        "content": result_text[:1000],
-                        "url": f"https://www.google.com/search?q={query.replace(' ', '+')}",
-                        "raw_content": result_text
-                    })
-                except Exception as e:
-                    print(f"Google ADK (hybrid) error for '{query}': {e}")
-                    continue
-        except ImportError:
-            print("Warning: langchain-google-genai not installed for hybrid mode")
-            # Continue with Tavily only
-            for query in queries[mid_point:config.max_search_queries]:
-                try:
-                    results = await tavily_tool.ainvoke(query)
-                    if isinstance(results, list):
-                        all_results.extend(results)
-                except Exception as e:
-                    continue
-
-    elif config.search_provider == "serpapi":
-        # Use SerpAPI (Google results scraping, paid)
-        try:
-            from langchain_community.utilities import SerpAPIWrapper
-
-            serpapi = SerpAPIWrapper()
-
-            for query in queries[:config.max_search_queries]:
-                try:
-                    results = serpapi.results(query)
-                    # SerpAPI returns dict with 'organic_results'
-                    organic = results.get("organic_results", [])
-
-                    for item in organic[:config.max_search_results]:
-                        all_results.append({
-                            "title": item.get("title", ""),
-                            "content": item.get("snippet", ""),
-                            "url": item.get("link", ""),
-                            "raw_content": item.get("snippet", "")
-                        })
-                except Exception as e:
-                    print(f"SerpAPI search error for query '{query}': {e}")
-                    continue
-
-        except ImportError:
-            print("Warning: google-search-results not installed. Install with: pip install google-search-results")
-            print("Falling back to DuckDuckGo (free alternative)...")
-            # Fallback to free alternative
-            config = config.model_copy(update={"search_provider": "duckduckgo"})
-
-    elif config.search_provider == "bing":
-        # Use Bing Search API (Microsoft, free tier available)
-        try:
-            from langchain_community.utilities import BingSearchAPIWrapper
-
-            bing_search = BingSearchAPIWrapper(k=config.max_search_results)
-
-            for query in queries[:config.max_search_queries]:
-                try:
-                    # Bing returns list of dicts
-                    results = bing_search.results(query, num_results=config.max_search_results)
-
-                    for item in results:
-                        all_results.append({
-                            "title": item.get("title", ""),
-                            "content": item.get("snippet", ""),
-                            "url": item.get("link", ""),
-                            "raw_content": item.get("snippet", "")
-                        })
-                except Exception as e:
-                    print(f"Bing search error for query '{query}': {e}")
-                    continue
-
-        except ImportError:
-            print("Warning: Bing API not configured. Set BING_SUBSCRIPTION_KEY in environment")
-            print("Falling back to DuckDuckGo (free alternative)...")
-            config = config.model_copy(update={"search_provider": "duckduckgo"})
-
-    elif config.search_provider == "duckduckgo":
-        # Use DuckDuckGo (completely free, no API key needed)
-        try:
-            from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
-
-            ddg_search = DuckDuckGoSearchAPIWrapper()
-
-            for query in queries[:config.max_search_queries]:
-                try:
-                    # DuckDuckGo returns string, need to parse
-                    result_text = ddg_search.run(query)
-
-                    # Split by newlines and create structured results
-                    snippets = result_text.split('\n')[:config.max_search_results]
-
-                    for i, snippet in enumerate(snippets):
-                        if snippet.strip():
-                            all_results.append({
-                                "title": f"DuckDuckGo Result {i+1}: {query}",
-                                "content": snippet.strip(),
-                                "url": f"https://duckduckgo.com/?q={query.replace(' ', '+')}",
-                                "raw_content": snippet.strip()
-                            })
-                except Exception as e:
-                    print(f"DuckDuckGo search error for query '{query}': {e}")
-                    continue
-
-        except ImportError:
-            print("Warning: duckduckgo-search not installed. Install with: pip install duckduckgo-search")
-            print("Cannot proceed without a search provider.")
-            return {
-                "research_queries": queries,
-                "search_results": [],
-                "research_notes": "Error: No search provider available. Please install duckduckgo-search or configure another provider.",
-                "messages": [{"role": "assistant", "content": "Search provider not available"}]
-            }
-
-    elif config.search_provider == "brave":
-        # Use Brave Search API (privacy-focused, free tier available)
-        try:
-            from langchain_community.utilities import BraveSearchWrapper
-
-            brave_search = BraveSearchWrapper(search_kwargs={"count": config.max_search_results})
-
-            for query in queries[:config.max_search_queries]:
-                try:
-                    result_text = brave_search.run(query)
-
-                    # Parse Brave results (similar to DuckDuckGo)
-                    snippets = result_text.split('\n')[:config.max_search_results]
-
-                    for i, snippet in enumerate(snippets):
-                        if snippet.strip():
-                            all_results.append({
-                                "title": f"Brave Result {i+1}: {query}",
-                                "content": snippet.strip(),
-                                "url": f"https://search.brave.com/search?q={query.replace(' ', '+')}",
-                                "raw_content": snippet.strip()
-                            })
-                except Exception as e:
-                    print(f"Brave search error for query '{query}': {e}")
-                    continue
-
-        except ImportError:
-            print("Warning: Brave Search not configured. Set BRAVE_API_KEY in environment")
-            print("Falling back to DuckDuckGo (free alternative)...")
-            config = config.model_copy(update={"search_provider": "duckduckgo"})
-
-    # Deduplicate search results by URL
+    # Drop repeats of executed queries and near-paraphrases before slicing,
+    # so distinct candidates fill the freed slots
+    queries, skipped = QueryFilter(
+        company_name,
+        executed_queries,
+        threshold=config.query_similarity_threshold
+    ).filter(queries)
+    queries = queries[:config.max_search_queries]
+    executed = {record["query"] for record in executed_queries}
+    for entry in skipped:
+        QUERIES_SKIPPED.labels(reason="executed" if entry["duplicate_of"] in executed else "duplicate").inc()
+    if skipped:
+        emit_progress("queries_skipped", skipped=skipped)
+    emit_progress("queries_generated", queries=queries)
+
+    if not queries and previous_notes:
+        return {
+            "research_queries": [],
+            "search_results": previous_results,
+            "research_notes": previous_notes,
+            "messages": [{"role": "assistant", "content": f"Skipped research for {company_name}: all {len(skipped)} queries repeat earlier ones"}]
+        }
+
+    try:
+        search_provider = get_search_provider(config)
+    except SearchProviderUnavailable as e:
+        print(f"Warning: {e}")
+        print("Cannot proceed without a search provider.")
+        FALLBACKS.labels(component="research", kind="no_search_provider").inc()
+        return {
+            "research_queries": queries,
+            "search_results": previous_results,
+            "research_notes": previous_notes or "Error: No search provider available. Please install duckduckgo-search or configure another provider.",
+            "messages": [{"role": "assistant", "content": "Search provider not available"}]
+        }
+
+    # Stop searching once the results (probably) cover the fields still
+    # needed; follow-up rounds only need reflection's missing fields
+    early_stop = None
+    stopped_at: List[float] = []
+    if config.early_stop_coverage is not None:
+        missing_fields = state.get("missing_fields") or []
+        target = compiled_schema.project(missing_fields) if previous_results and missing_fields else compiled_schema
+        estimator = CoverageEstimator(target, company_name)
+
+        def covered(query: str, results: List[Dict[str, Any]]) -> bool:
+            coverage = estimator.add(results)
+            if coverage >= config.early_stop_coverage:
+                stopped_at.append(coverage)
+                return True
+            return False
+
+        early_stop = EarlyStop(covered)
+
+    # Execute web searches with the configured provider.
+    # Queries run concurrently; results keep query order.
+    batches = await search_provider.search_each(
+        queries,
+        max_results=adaptive_max_results(executed_queries, config.max_search_results),
+        stop=early_stop
+    )
+    if early_stop is not None and early_stop.stopped:
+        # Failed, timed-out and dropped in-flight queries also yield None;
+        # count only the queries that were never sent
+        QUERIES_SKIPPED.labels(reason="covered").inc(early_stop.skipped)
+        emit_progress("search_stopped_early", coverage=round(stopped_at[0], 3), skipped=early_stop.skipped)
+    all_results = [result for batch in batches if batch for result in batch]
+    executed_queries = executed_queries + record_executions(
+        queries, batches, previous_results, executed_queries, iteration
+    )
+
+    # Deduplicate search results by URL, then collapse syndicated copies
     deduplicated_results = deduplicate_sources(all_results)
+    deduplicated_results = remove_near_duplicates(
+        deduplicated_results,
+        max_distance=config.near_duplicate_distance
+    )
 
-    # Format sources with token limits (prevents context overflow)
-    formatted_sources = format_sources(
+    # Only sources not seen in earlier iterations need new notes
+    new_results = filter_seen_sources(
+        previous_results,
         deduplicated_results,
-        include_raw_content=True,
-        max_tokens_per_source=1000  # Limit per source to prevent LLM context overflow
+        max_distance=config.near_duplicate_distance
+    )
+    accumulated_results = previous_results + new_results
+
+    if not new_results and previous_notes:
+        emit_progress("notes_ready", source_count=len(accumulated_results), new_source_count=0)
+        return {
+            "research_queries": queries,
+            "executed_queries": executed_queries,
+            "search_results": accumulated_results,
+            "research_notes": previous_notes,
+            "messages": [{"role": "assistant", "content": f"Researched {company_name} with {len(queries)} queries, found no new sources"}]
+        }
+
+    # Pack the most schema-relevant passages into a global token budget
+    # (prevents context overflow and trims irrelevant input tokens)
+    formatted_sources = pack_sources(
+        new_results,
+        compiled_schema,
+        token_budget=config.source_token_budget,
+        passage_tokens=config.source_passage_tokens
     )
 
     # Generate structured research notes using centralized prompt
-    notes_prompt = ChatPromptTemplate.from_messages([
-        ("system", INFO_PROMPT),
-        ("human", "Create research notes for {company_name}.")
-    ])
+    notes_prompt = build_prompt(INFO_PROMPT, INFO_INPUT)
 
-    notes_chain = notes_prompt | llm
+    notes_chain = build_chain(notes_prompt, llm, config, stage="notes")
 
-    notes_response = await notes_chain.ainvoke({
+    notes_response = await cached_ainvoke(notes_chain, notes_prompt, {
         "company_name": company_name,
-        "schema": json.dumps(schema, indent=2),
+        "schema": compiled_schema.prompt_json,
         "content": formatted_sources,
         "user_context": user_context if user_context else "No additional context provided."
-    })
+    }, config, stage="notes")
+
+    emit_progress("notes_ready", source_count=len(accumulated_results), new_source_count=len(new_results))
 
     return {
         "research_queries": queries,
-        "search_results": deduplicated_results,
-        "research_notes": notes_response.content,
-        "messages": [{"role": "assistant", "content": f"Researched {company_name} with {len(queries)} queries, found {len(deduplicated_results)} unique results"}]
+        "executed_queries": executed_queries,
+        "search_results": accumulated_results,
+        "research_notes": merge_notes(previous_notes, notes_response.content, iteration),
+        "messages": [{"role": "assistant", "content": f"Researched {company_name} with {len(queries)} queries, found {len(new_results)} new unique results ({len(accumulated_results)} total)"}]
     }
@@ -0,0 +1,192 @@
+"""
+Compiled extraction schemas.
+
+A batch usually researches thousands of companies with one schema. Work that
+only depends on the schema (prompt rendering, field walks, required sets)
+is done once in ``CompiledSchema`` and cached by schema hash, instead of in
+every node for every company.
+
+The prompt rendering is minified JSON, which carries far fewer whitespace
+tokens than ``json.dumps(schema, indent=2)``.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Values the LLM uses when it could not find a field
+PLACEHOLDER_VALUES = {"unknown", "n/a", "na", "none", "null", "not available", "not found", "정보 없음", "알 수 없음", "미상"}
+
+_JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+
+def is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def is_low_confidence(value: Any) -> bool:
+    """True for empty values and placeholder strings like "unknown"."""
+    return is_empty(value) or (
+        isinstance(value, str) and value.strip().casefold() in PLACEHOLDER_VALUES
+    )
+
+
+def render_json(value: Any) -> str:
+    """Minified JSON for prompts (keeps Hangul unescaped)."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    return hashlib.sha256(
+        json.dumps(schema, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+class CompiledSchema:
+    """
+    Precomputed views of an extraction schema.
+
+    Attributes:
+        schema: The original JSON schema
+        hash: Stable content hash
+        prompt_json: Minified JSON rendering for prompts
+        fields: Top-level property names, in schema order
+        field_paths: Dotted paths of all (nested) properties
+        required: Required top-level fields
+        descriptions: Description per field path
+        field_descriptions: "path: description" lines for prompts
+        query_text: Field names and descriptions joined (ranking query)
+    """
+
+    def __init__(self, schema: Dict[str, Any], digest: Optional[str] = None):
+        self.schema = schema
+        self.hash = digest or schema_hash(schema)
+        self.prompt_json = render_json(schema)
+        self.properties: Dict[str, Any] = schema.get("properties", {})
+        self.fields: List[str] = list(self.properties)
+        self.required = frozenset(schema.get("required", []))
+
+        self.field_paths: List[str] = []
+        self.descriptions: Dict[str, str] = {}
+        self._walk(schema, "")
+
+        self.field_descriptions = "\n".join(
+            f"- {path}: {description}" for path, description in self.descriptions.items()
+        )
+        self.query_text = " ".join(
+            f"{path.split('.')[-1].replace('_', ' ')} {self.descriptions.get(path, '')}"
+            for path in self.field_paths
+        )
+        self._types = {
+            field: _JSON_TYPES.get(prop.get("type"))
+            for field, prop in self.properties.items()
+        }
+        self._projections: Dict[Tuple[str, ...], "CompiledSchema"] = {}
+
+    def _walk(self, node: Dict[str, Any], prefix: str) -> None:
+        for name, prop in node.get("properties", {}).items():
+            path = f"{prefix}{name}"
+            self.field_paths.append(path)
+            if prop.get("description"):
+                self.descriptions[path] = prop["description"]
+            if prop.get("type") == "object":
+                self._walk(prop, path + ".")
+            elif prop.get("type") == "array" and isinstance(prop.get("items"), dict):
+                self._walk(prop["items"], path + "[].")
+
+    def validate(self, data: Dict[str, Any]) -> List[str]:
+        """
+        Check required fields and top-level types.
+
+        Null is accepted for any field (the extraction prompt asks for null
+        when information is unavailable).
+
+        Returns:
+            List of error messages (empty when valid)
+        """
+        errors = [f"missing required field: {field}" for field in self.required if field not in data]
+        for field, expected in self._types.items():
+            value = data.get(field)
+            if value is None or expected is None:
+                continue
+            if not isinstance(value, expected) or (isinstance(value, bool) and bool not in expected):
+                errors.append(f"{field}: expected {self.properties[field].get('type')}")
+        return errors
+
+    def completeness(self, data: Dict[str, Any]) -> Tuple[List[str], float]:
+        """
+        Missing fields and completeness score of an extraction.
+
+        A field is missing when it is empty, a placeholder value, or of the
+        wrong type.
+
+        Returns:
+            (missing field names, fraction of fields filled)
+        """
+        invalid = {error.split(":")[0] for error in self.validate(data)}
+        missing = [
+            field for field in self.fields
+            if field in invalid or is_low_confidence(data.get(field))
+        ]
+        score = 1 - len(missing) / len(self.fields) if self.fields else 1.0
+        return missing, score
+
+    def project(self, fields: List[str]) -> "CompiledSchema":
+        """Compiled sub-schema containing only ``fields`` (cached per field set)."""
+        key = tuple(f for f in self.fields if f in fields)
+        projection = self._projections.get(key)
+        if projection is None:
+            projected = {k: v for k, v in self.schema.items() if k not in ("properties", "required")}
+            projected["properties"] = {f: self.properties[f] for f in key}
+            required = [f for f in self.schema.get("required", []) if f in key]
+            if required:
+                projected["required"] = required
+            projection = CompiledSchema(projected)
+            self._projections[key] = projection
+        return projection
+
+
+_MAX_CACHED = 64
+_by_hash: "OrderedDict[str, CompiledSchema]" = OrderedDict()
+# Fast path: the same dict object is usually passed for every company
+_by_id: Dict[int, Tuple[Dict[str, Any], CompiledSchema]] = {}
+_lock = threading.Lock()
+
+
+def compile_schema(schema: Union[Dict[str, Any], CompiledSchema]) -> CompiledSchema:
+    """
+    Get the compiled form of a schema, cached by content hash.
+
+    Repeated calls with the same dict object skip hashing entirely, so
+    schemas must not be mutated after their first use.
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema
+
+    cached = _by_id.get(id(schema))
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+
+    digest = schema_hash(schema)
+    with _lock:
+        compiled = _by_hash.get(digest)
+        if compiled is None:
+            compiled = CompiledSchema(schema, digest)
+            _by_hash[digest] = compiled
+            while len(_by_hash) > _MAX_CACHED:
+                _by_hash.popitem(last=False)
+        else:
+            _by_hash.move_to_end(digest)
+
+        if len(_by_id) >= _MAX_CACHED:
+            _by_id.clear()
+        _by_id[id(schema)] = (schema, compiled)
+    return compiled
@@ -0,0 +1,286 @@
+"""
+Tiered cache for web search results.
+
+Batch runs repeat many near-identical queries, and paid providers (Tavily,
+SerpAPI) charge per query. ``SearchCache`` sits in front of every
+``SearchProvider`` with two tiers:
+
+1. In-process LRU (fast, bounded by entry count)
+2. Optional SQLite file (persists across runs, bounded by total bytes)
+
+Keys combine the provider name, the normalized query, the number of
+results and the search depth. Empty result lists are cached too
+(negative caching) with a shorter TTL. Async callers use ``aget``/``aset``,
+which run the SQLite tier on a worker thread so concurrent searches are
+not blocked by disk reads and commits.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .configuration import Configuration
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for cache lookups.
+
+    Applies NFKC (folds full-width and compatibility forms common in Korean
+    text), case-folding and whitespace collapsing.
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def make_cache_key(
+    provider: str,
+    query: str,
+    max_results: int,
+    search_depth: Optional[str] = None
+) -> str:
+    """Build a stable cache key for a provider query."""
+    payload = json.dumps(
+        [provider, normalize_query(query), max_results, search_depth],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    Two-tier (memory LRU + SQLite) cache for search results.
+
+    Thread-safe; SQLite access is serialized with a lock. ``get``/``set``
+    run both tiers inline; ``aget``/``aset`` keep only the memory tier on
+    the event loop.
+
+    Args:
+        path: SQLite file for the persistent tier (None = memory only)
+        ttl: Lifetime of non-empty results in seconds
+        negative_ttl: Lifetime of empty results in seconds
+        max_memory_entries: LRU capacity
+        max_disk_bytes: Total payload size allowed on disk before eviction
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 7 * 24 * 3600,
+        negative_ttl: float = 24 * 3600,
+        max_memory_entries: int = 2048,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY,"
+                " expires_at REAL NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " value TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_cache_created ON search_cache(created_at)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results.
+
+        Returns:
+            Cached result list (possibly empty), or None on a miss
+        """
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = self._get_disk(key, now)
+        if value is None:
+            self._count_miss()
+        return value
+
+    async def aget(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """``get`` with the SQLite lookup on a worker thread."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key, now)
+        if value is None:
+            self._count_miss()
+        return value
+
+    def set(self, key: str, value: List[Dict[str, Any]]) -> None:
+        """Store results; empty lists use the negative TTL."""
+        now, expires_at = self._set_memory(key, value)
+        if self._db is not None:
+            self._set_disk(key, value, now, expires_at)
+
+    async def aset(self, key: str, value: List[Dict[str, Any]]) -> None:
+        """``set`` with the SQLite write on a worker thread."""
+        now, expires_at = self._set_memory(key, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, now, expires_at)
+
+    def _get_memory(self, key: str, now: float) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            if not value:
+                self.stats["negative_hits"] += 1
+            return value
+
+    def _get_disk(self, key: str, now: float) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT expires_at, value FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expires_at, raw = row
+            if expires_at <= now:
+                self._db.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            value = json.loads(raw)
+            self._remember(key, expires_at, value)
+            self.stats["disk_hits"] += 1
+            if not value:
+                self.stats["negative_hits"] += 1
+            return value
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def _set_memory(self, key: str, value: List[Dict[str, Any]]) -> Tuple[float, float]:
+        now = time.time()
+        expires_at = now + (self.ttl if value else self.negative_ttl)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self.stats["stores"] += 1
+        return now, expires_at
+
+    def _set_disk(self, key: str, value: List[Dict[str, Any]], now: float, expires_at: float) -> None:
+        raw = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, expires_at, created_at, size, value)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, expires_at, now, len(raw), raw)
+            )
+            self._db.commit()
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= 100:
+                self._evict_disk(now)
+
+    def _remember(self, key: str, expires_at: float, value: List[Dict[str, Any]]) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, now: float) -> None:
+        """Drop expired rows, then the oldest rows until under the size budget."""
+        self._writes_since_evict = 0
+        self._db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM search_cache").fetchone()[0]
+        if total > self.max_disk_bytes:
+            excess = total - self.max_disk_bytes
+            rows = self._db.execute(
+                "SELECT key, size FROM search_cache ORDER BY created_at ASC"
+            )
+            doomed = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                doomed.append((key,))
+                excess -= size
+            self._db.executemany("DELETE FROM search_cache WHERE key = ?", doomed)
+            self.stats["evictions"] += len(doomed)
+        self._db.commit()
+
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from either tier."""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_caches: Dict[Tuple[Any, ...], SearchCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache(config: Configuration) -> Optional[SearchCache]:
+    """
+    Get the process-wide search cache for a configuration.
+
+    Returns:
+        Shared SearchCache, or None when caching is disabled
+    """
+    if not config.search_cache_enabled:
+        return None
+
+    key = (config.search_cache_path, config.search_cache_ttl)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = SearchCache(path=config.search_cache_path, ttl=config.search_cache_ttl)
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,443 @@
+"""
+Search provider engine for the research agent.
+
+Every web search backend implements ``SearchProvider`` and registers itself
+under its ``Configuration.search_provider`` name. Provider instances are
+created once per process and reused across companies, so SDK clients (and
+their HTTP connection pools) are not rebuilt for every research call.
+
+Adding a provider:
+
+    @register_provider("my_search")
+    class MySearchProvider(SearchProvider):
+        async def search(self, query):
+            ...
+"""
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from .configuration import Configuration
+from .concurrency import EarlyStop, gather_bounded, run_blocking
+from .search_cache import get_search_cache, make_cache_key
+from .progress import emit_progress
+from .metrics import SEARCH_LATENCY, ERRORS, FALLBACKS, record_cache, timed
+from .rate_limit import call_with_rate_limit, get_rate_limiter
+
+
+class SearchProviderUnavailable(RuntimeError):
+    """Raised when a provider (and its fallbacks) cannot be constructed."""
+
+
+class SearchProvider:
+    """
+    Base class for web search providers.
+
+    Subclasses implement ``search`` for a single query and return a list of
+    result dicts with ``title``, ``content``, ``url`` and ``raw_content``.
+    ``search_each`` fans queries out concurrently and keeps query order;
+    ``search_many`` flattens its results.
+    """
+
+    name: str = ""
+    label: str = ""
+    # Provider to use when this one cannot be constructed (missing SDK/key)
+    fallback: Optional[str] = None
+    # Provider-side search depth, part of the cache key
+    search_depth: Optional[str] = None
+    # Default process-wide request limit (overridden by search_requests_per_minute)
+    requests_per_minute: Optional[float] = None
+
+    def __init__(self, config: Configuration):
+        self.max_results = config.max_search_results
+        self.concurrency = config.search_concurrency
+        self.timeout = config.search_timeout
+        self.cache = get_search_cache(config)
+        self.rate_limit_retries = config.rate_limit_retries
+        self.rate_limiter = get_rate_limiter(
+            "search",
+            self.name,
+            config.search_requests_per_minute or self.requests_per_minute
+        )
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        """Run a single query."""
+        raise NotImplementedError
+
+    async def search_many(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run all queries concurrently.
+
+        Results are flattened in query order so deduplication stays
+        deterministic.
+
+        Args:
+            queries: Search queries
+
+        Returns:
+            Flattened search results
+        """
+        batches = await self.search_each(queries)
+        return [result for batch in batches if batch for result in batch]
+
+    async def search_each(
+        self,
+        queries: List[str],
+        max_results: Optional[int] = None,
+        stop: Optional[EarlyStop] = None
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Run all queries concurrently and return the results per query.
+
+        Failed or timed-out queries are reported and yield None. Queries
+        with fresh cached results skip the network entirely; the others
+        wait for the provider's shared rate limiter (the timeout only
+        covers the request itself).
+
+        Args:
+            queries: Search queries
+            max_results: Keep at most this many results per query (the
+                provider still fetches and caches its configured number)
+            stop: Checked with each finished query and its results; once it
+                triggers, queries not sent yet are skipped and queries
+                still in flight finish (and are cached) but yield None
+
+        Returns:
+            Result lists aligned with ``queries`` (None for failed or
+            skipped or dropped queries)
+        """
+        def report(query: str, error: BaseException) -> None:
+            print(f"{self.label or self.name} search error for query '{query}': {error}")
+            kind = "timeout" if isinstance(error, TimeoutError) else "exception"
+            ERRORS.labels(component=f"search_{self.name}", kind=kind).inc()
+
+        async def run(query: str) -> List[Dict[str, Any]]:
+            results = await self.search_cached(query)
+            if max_results is not None:
+                results = results[:max_results]
+            emit_progress("search_finished", provider=self.name, query=query, result_count=len(results))
+            return results
+
+        return await gather_bounded(
+            queries,
+            run,
+            limit=self.concurrency,
+            on_error=report,
+            stop=stop
+        )
+
+    async def search_cached(self, query: str) -> List[Dict[str, Any]]:
+        """Run a single query through the search cache."""
+        if self.cache is None:
+            return await self._timed_search(query)
+
+        key = make_cache_key(self.name, query, self.max_results, self.search_depth)
+        cached = await self.cache.aget(key)
+        record_cache("search", cached is not None)
+        if cached is not None:
+            return cached
+
+        results = await self._timed_search(query)
+        await self.cache.aset(key, results)
+        return results
+
+    async def _timed_search(self, query: str) -> List[Dict[str, Any]]:
+        async def call() -> List[Dict[str, Any]]:
+            with timed(SEARCH_LATENCY.labels(provider=self.name)):
+                try:
+                    return await asyncio.wait_for(self.search(query), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"timed out after {self.timeout}s") from None
+
+        return await call_with_rate_limit(self.rate_limiter, call, self.rate_limit_retries)
+
+
+_REGISTRY: Dict[str, Type[SearchProvider]] = {}
+_INSTANCES: Dict[Tuple[Any, ...], SearchProvider] = {}
+_INSTANCES_LOCK = threading.RLock()
+
+
+def register_provider(name: str) -> Callable[[Type[SearchProvider]], Type[SearchProvider]]:
+    """Class decorator registering a provider under ``name``."""
+    def decorator(cls: Type[SearchProvider]) -> Type[SearchProvider]:
+        cls.name = name
+        _REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def available_providers() -> List[str]:
+    """Names of all registered providers."""
+    return sorted(_REGISTRY)
+
+
+def _instance_key(name: str, config: Configuration) -> Tuple[Any, ...]:
+    return (
+        name,
+        config.max_search_results,
+        config.search_concurrency,
+        config.search_timeout,
+        config.search_cache_enabled,
+        config.search_cache_path,
+        config.search_cache_ttl,
+        config.search_requests_per_minute,
+        config.rate_limit_retries
+    )
+
+
+def get_search_provider(config: Configuration, name: Optional[str] = None) -> SearchProvider:
+    """
+    Get the process-wide provider instance for a configuration.
+
+    Providers whose SDK or credentials are missing are replaced by their
+    declared fallback (e.g. SerpAPI → DuckDuckGo).
+
+    Args:
+        config: Agent configuration
+        name: Provider name (defaults to ``config.search_provider``)
+
+    Returns:
+        Shared provider instance
+
+    Raises:
+        SearchProviderUnavailable: If no provider in the fallback chain works
+    """
+    name = name or config.search_provider
+    key = _instance_key(name, config)
+    provider = _INSTANCES.get(key)
+    if provider is not None:
+        return provider
+
+    with _INSTANCES_LOCK:
+        provider = _INSTANCES.get(key)
+        if provider is not None:
+            return provider
+
+        cls = _REGISTRY.get(name)
+        if cls is None:
+            raise SearchProviderUnavailable(f"Unknown search provider: {name}")
+        try:
+            provider = cls(config)
+        except ImportError as e:
+            print(f"Warning: {cls.label or name} unavailable: {e}")
+            if cls.fallback is None:
+                raise SearchProviderUnavailable(str(e)) from e
+            print(f"Falling back to {cls.fallback}...")
+            FALLBACKS.labels(component="search_provider", kind=f"{name}->{cls.fallback}").inc()
+            provider = get_search_provider(config, cls.fallback)
+
+        _INSTANCES[key] = provider
+        return provider
+
+
+def clear_provider_cache() -> None:
+    """Drop all cached provider instances (mainly for tests and reconfiguration)."""
+    with _INSTANCES_LOCK:
+        _INSTANCES.clear()
+
+
+def _snippet_results(text: str, query: str, max_results: int, title: str, url: str) -> List[Dict[str, Any]]:
+    """Turn newline-separated snippet text into structured results."""
+    snippets = text.split('\n')[:max_results]
+    return [
+        {
+            "title": f"{title} {i+1}: {query}",
+            "content": snippet.strip(),
+            "url": url,
+            "raw_content": snippet.strip()
+        }
+        for i, snippet in enumerate(snippets)
+        if snippet.strip()
+    ]
+
+
+@register_provider("tavily")
+class TavilyProvider(SearchProvider):
+    """Tavily API (paid, high quality)."""
+
+    label = "Tavily"
+    search_depth = "advanced"
+    requests_per_minute = 100
+
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        from langchain_community.tools.tavily_search import TavilySearchResults
+
+        self.tool = TavilySearchResults(
+            max_results=config.max_search_results,
+            search_depth=self.search_depth,
+            include_raw_content=True
+        )
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        results = await self.tool.ainvoke(query)
+        if isinstance(results, list):
+            return results
+        if isinstance(results, dict):
+            return [results]
+        return []
+
+
+@register_provider("google_adk")
+class GoogleADKProvider(SearchProvider):
+    """Google ADK google_search (free with Gemini 2+)."""
+
+    label = "Google ADK"
+    fallback = "tavily"
+
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        from langchain_google_genai import GoogleSearchAPIWrapper
+
+        self.client = GoogleSearchAPIWrapper()
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        # Google search returns string, need to structure it
+        result_text = await self.client.arun(query)
+        return [{
+            "title": f"Google Search: {query}",
+            "content": result_text[:1000],  # Limit content
+            "url": f"https://www.google.com/search?q={query.replace(' ', '+')}",
+            "raw_content": result_text
+        }]
+
+
+@register_provider("hybrid")
+class HybridProvider(SearchProvider):
+    """
+    Tavily for the first half of the queries, Google ADK for the rest.
+
+    Both halves run at the same time, each with its own concurrency limit.
+    Without langchain-google-genai every query goes to Tavily.
+    """
+
+    label = "Hybrid"
+
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        self.primary = get_search_provider(config, "tavily")
+        try:
+            self.secondary = GoogleADKProvider(config)
+        except ImportError:
+            print("Warning: langchain-google-genai not installed for hybrid mode")
+            self.secondary = self.primary
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        return await self.primary.search(query)
+
+    async def search_each(
+        self,
+        queries: List[str],
+        max_results: Optional[int] = None,
+        stop: Optional[EarlyStop] = None
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        # Both halves share ``stop``: coverage reached in one half skips
+        # the other half's unsent queries too
+        mid_point = len(queries) // 2
+        first, second = await asyncio.gather(
+            self.primary.search_each(queries[:mid_point], max_results, stop),
+            self.secondary.search_each(queries[mid_point:], max_results, stop)
+        )
+        return first + second
+
+
+@register_provider("serpapi")
+class SerpAPIProvider(SearchProvider):
+    """SerpAPI (Google results scraping, paid). Synchronous SDK."""
+
+    label = "SerpAPI"
+    fallback = "duckduckgo"
+
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        from langchain_community.utilities import SerpAPIWrapper
+
+        self.client = SerpAPIWrapper()
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        results = await run_blocking(self.client.results, query)
+        # SerpAPI returns dict with 'organic_results'
+        organic = results.get("organic_results", [])
+        return [
+            {
+                "title": item.get("title", ""),
+                "content": item.get("snippet", ""),
+                "url": item.get("link", ""),
+                "raw_content": item.get("snippet", "")
+            }
+            for item in organic[:self.max_results]
+        ]
+
+
+@register_provider("bing")
+class BingProvider(SearchProvider):
+    """Bing Search API (free tier available). Synchronous SDK."""
+
+    label = "Bing"
+    fallback = "duckduckgo"
+    requests_per_minute = 180
+
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        from langchain_community.utilities import BingSearchAPIWrapper
+
+        self.client = BingSearchAPIWrapper(k=config.max_search_results)
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        # Bing returns list of dicts
+        results = await run_blocking(self.client.results, query, num_results=self.max_results)
+        return [
+            {
+                "title": item.get("title", ""),
+                "content": item.get("snippet", ""),
+                "url": item.get("link", ""),
+                "raw_content": item.get("snippet", "")
+            }
+            for item in results
+        ]
+
+
+@register_provider("duckduckgo")
+class DuckDuckGoProvider(SearchProvider):
+    """DuckDuckGo (free, no API key, rate limited). Synchronous SDK."""
+
+    label = "DuckDuckGo"
+    requests_per_minute = 20
+
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+
+        self.client = DuckDuckGoSearchAPIWrapper()
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        # DuckDuckGo returns string, need to parse
+        result_text = await run_blocking(self.client.run, query)
+        return _snippet_results(
+            result_text, query, self.max_results,
+            title="DuckDuckGo Result",
+            url=f"https://duckduckgo.com/?q={query.replace(' ', '+')}"
+        )
+
+
+@register_provider("brave")
+class BraveProvider(SearchProvider):
+    """Brave Search API (free tier available). Synchronous SDK."""
+
+    label = "Brave"
+    fallback = "duckduckgo"
+    requests_per_minute = 60
+
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        from langchain_community.utilities import BraveSearchWrapper
+
+        self.client = BraveSearchWrapper(search_kwargs={"count": config.max_search_results})
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        result_text = await run_blocking(self.client.run, query)
+        return _snippet_results(
+            result_text, query, self.max_results,
+            title="Brave Result",
+            url=f"https://search.brave.com/search?q={query.replace(' ', '+')}"
+        )
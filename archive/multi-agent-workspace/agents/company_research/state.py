@@ -25,6 +25,8 @@ class ResearchState(TypedDict):
     research_queries: List[str]
     search_results: List[Dict[str, Any]]
     research_notes: str
+    # Queries run so far with their result fingerprints (see query_memory.py)
+    executed_queries: List[Dict[str, Any]]
 
     # Extraction phase
     extracted_data: Dict[str, Any]
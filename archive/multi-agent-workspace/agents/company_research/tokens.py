@@ -0,0 +1,59 @@
+"""
+Token counting helpers.
+
+Used to bound prompt sections (source packing, extraction chunks) by token
+budget. When ``tiktoken`` is installed, counts come from a real BPE
+tokenizer that is loaded once per process; otherwise a Hangul-aware
+estimate is used.
+
+The encoding can be chosen with the TOKENIZER_ENCODING environment variable
+(default: cl100k_base). Claude and DeepSeek use their own tokenizers, so
+counts are a close approximation for them rather than exact; budgets
+should keep some headroom.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+# Hangul syllables tokenize at roughly one token per character, while
+# Latin text averages about four characters per token.
+_HANGUL = re.compile(r"[가-힣]")
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> Optional[Any]:
+    """Load the tokenizer once; None when tiktoken is unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(os.getenv("TOKENIZER_ENCODING", "cl100k_base"))
+    except Exception as e:
+        print(f"Warning: could not load tokenizer ({e}), using estimates")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens without a tokenizer."""
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    """Count LLM tokens in ``text`` (cached per distinct string)."""
+    return count_tokens_uncached(text)
+
+
+def count_tokens_uncached(text: str) -> int:
+    """Count LLM tokens without caching (for throwaway strings, e.g. substrings)."""
+    if not text:
+        return 0
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, disallowed_special=()))
@@ -0,0 +1,28 @@
+from src.agents.company_research.query_memory import QueryFilter, QuerySignature
+
+
+def test_reordered_and_particle_variants_are_duplicates():
+    query_filter = QueryFilter("삼성전자", [])
+    kept, dropped = query_filter.filter(["삼성전자 영업이익률 추이", "영업이익률은 추이 삼성전자"])
+    assert kept == ["삼성전자 영업이익률 추이"]
+    assert dropped[0]["duplicate_of"] == "삼성전자 영업이익률 추이"
+
+
+def test_queries_differing_in_year_are_kept():
+    query_filter = QueryFilter("삼성전자", [])
+    kept, dropped = query_filter.filter(["삼성전자 매출 2023", "삼성전자 매출 2024", "매출 2023 삼성전자"])
+    assert kept == ["삼성전자 매출 2023", "삼성전자 매출 2024"]
+    assert dropped == [{"query": "매출 2023 삼성전자", "duplicate_of": "삼성전자 매출 2023"}]
+
+
+def test_year_change_is_not_redundant_with_exhausted_query():
+    executed = [{"query": "삼성전자 매출 2023", "results": 5, "new_results": 0}]
+    query_filter = QueryFilter("삼성전자", executed)
+    assert query_filter.match("삼성전자 매출 2024") is None
+    assert query_filter.match("삼성전자 매출 2023") == "삼성전자 매출 2023"
+
+
+def test_province_names_keep_trailing_syllable():
+    signature = QuerySignature("현대자동차 경기도 공장", "현대자동차")
+    assert "경기도" in signature.tokens
+    assert QuerySignature("현대자동차 경기 공장", "현대자동차").similarity(signature) < 1.0
@@ -0,0 +1,23 @@
+from src.agents.company_research.extraction import split_notes
+from src.agents.company_research.tokens import count_tokens
+
+
+def test_notes_within_budget_stay_whole():
+    notes = "## Overview\nSmall company.\n\n## Revenue\n100억 원"
+    assert split_notes(notes, 1000) == [notes]
+
+
+def test_paragraphs_are_packed_within_budget():
+    notes = "\n\n".join(f"Paragraph {i}: " + "word " * 40 for i in range(20))
+    chunks = split_notes(notes, 120)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 120 for chunk in chunks)
+
+
+def test_single_huge_line_is_split_within_budget():
+    # Scraped content or long Korean text without any newline
+    notes = "삼성전자매출액과영업이익" * 500 + " " + "revenue growth " * 2000
+    chunks = split_notes(notes, 200)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 200 for chunk in chunks)
+    assert "".join(chunks).replace(" ", "") == notes.replace(" ", "")